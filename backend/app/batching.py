@@ -0,0 +1,149 @@
+"""Group commit for high-rate notification creation.
+
+Callers hand a row to ``NotificationBatcher.submit`` and wait on the returned
+Future. A single writer thread collects rows for up to
+``notification_batch_flush_ms`` (or ``notification_batch_max_rows``), checks the
+users with one SELECT and writes the batch with one multi-row INSERT and one
+commit, so a burst of N creations costs one round trip and one fsync instead of N.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .config import settings
+from .db import SessionLocal
+from .schemas import NotificationRead
+
+logger = logging.getLogger("uvicorn.error")
+
+Pending = Tuple[dict, Future]
+
+
+class NotificationBatcher(threading.Thread):
+    """Writer thread that flushes queued notification rows as one transaction."""
+
+    def __init__(self, max_rows: Optional[int] = None, flush_ms: Optional[float] = None):
+        super().__init__(name="notification-batcher", daemon=True)
+        self.max_rows = max_rows or settings.notification_batch_max_rows
+        self.flush_seconds = (flush_ms if flush_ms is not None else settings.notification_batch_flush_ms) / 1000
+        self._queue: "queue.Queue[Optional[Pending]]" = queue.Queue()
+        self._stopping = False
+
+    def submit(self, values: dict) -> Future:
+        """Queue one row; the Future resolves to a NotificationRead or raises LookupError/IntegrityError.
+
+        Cancelling the Future succeeds only while the row is still queued, in which
+        case it is never written.
+        """
+        future: Future = Future()
+        if self._stopping:
+            future.set_exception(RuntimeError("Notification batcher is stopped"))
+        else:
+            self._queue.put((values, future))
+        return future
+
+    def run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            # Callers that gave up before the batch was taken get nothing written; from
+            # here on their futures are running and can no longer be cancelled
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Pending]) -> None:
+        try:
+            self._write(batch)
+        except IntegrityError:
+            # One bad row (e.g. a user deleted meanwhile) must not fail its neighbours:
+            # retry one by one so each caller gets its own outcome
+            for item in batch:
+                try:
+                    self._write([item])
+                except Exception as exc:
+                    _fail(item[1], exc)
+        except Exception as exc:
+            logger.exception("Notification batch of %s rows failed", len(batch))
+            for _, future in batch:
+                _fail(future, exc)
+
+    def _write(self, batch: List[Pending]) -> None:
+        with SessionLocal() as db:
+            user_ids = {values["user_id"] for values, _ in batch}
+            existing = set(db.scalars(select(models.User.id).where(models.User.id.in_(user_ids))))
+            rows, waiting = [], []
+            for values, future in batch:
+                if values["user_id"] in existing:
+                    rows.append(values)
+                    waiting.append(future)
+                else:
+                    _fail(future, LookupError("User not found"))
+            if not rows:
+                return
+            created = db.scalars(
+                insert(models.Notification).returning(models.Notification, sort_by_parameter_order=True),
+                rows,
+            ).all()
+            results = [NotificationRead.model_validate(n) for n in created]
+            db.commit()
+        for future, result in zip(waiting, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued and stop the writer thread."""
+        self._stopping = True
+        self._queue.put(None)
+        self.join(timeout)
+
+
+def _fail(future: Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+_batcher: Optional[NotificationBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_notification_batcher() -> NotificationBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None or not _batcher.is_alive():
+            _batcher = NotificationBatcher()
+            _batcher.start()
+        return _batcher
+
+
+def stop_notification_batcher() -> None:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is not None:
+            _batcher.stop()
+            _batcher = None
@@ -0,0 +1,289 @@
+"""In-process caches and the invalidation bus that keeps them coherent across workers.
+
+Each worker keeps its own bounded LRU+TTL stores (``TTLCache``). Writes call
+``publish_invalidation(topic, arg)``: the handlers registered for the topic with
+``@on_invalidate(topic)`` run immediately in this process, and the event is sent
+on the bus so every other worker runs its handlers too.
+
+Buses:
+    LocalBus     in-memory fan-out between Invalidators of one process (single worker, tests)
+    PostgresBus  pg_notify / LISTEN on the application database, no extra service
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class TTLCache:
+    """Small thread-safe in-process cache where every entry carries its own expiry.
+
+    When ``max_entries`` is set, the least recently used entry is evicted to make room.
+    ``max_weight`` bounds the sum of the weights passed to ``set`` the same way (e.g.
+    rows held by cached reports); a value heavier than the whole budget is not stored.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_weight: Optional[int] = None):
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self._weight = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, weight: int = 1) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._drop(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            while self._data and (
+                (self.max_entries is not None and len(self._data) >= self.max_entries)
+                or (self.max_weight is not None and self._weight + weight > self.max_weight)
+            ):
+                self._drop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + ttl, value, weight)
+            self._weight += weight
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._weight = 0
+            else:
+                self._drop(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every key for which `predicate(key)` is true."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        # Callers hold the lock
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
+
+
+# Handlers receive the published argument, or None meaning "drop everything"
+# (sent after a bus reconnect, when events may have been missed).
+Handler = Callable[[Any], None]
+
+
+class Invalidator:
+    """Topic -> local handlers, plus the bus that carries events to other workers."""
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.bus: Optional["InvalidationBus"] = None
+
+    def on(self, topic: str) -> Callable[[Handler], Handler]:
+        def decorator(func: Handler) -> Handler:
+            self._handlers.setdefault(topic, []).append(func)
+            return func
+        return decorator
+
+    def publish(self, topic: str, arg: Any = None) -> None:
+        self._run(topic, arg)
+        if self.bus is not None:
+            self.bus.publish({"origin": self.origin, "topic": topic, "arg": arg})
+
+    def deliver(self, message: dict) -> None:
+        """Called by the bus for events from any worker; our own echoes are skipped."""
+        if message.get("origin") != self.origin:
+            self._run(message["topic"], message.get("arg"))
+
+    def reset(self) -> None:
+        """Drop everything: run every handler with None."""
+        for topic in list(self._handlers):
+            self._run(topic, None)
+
+    def _run(self, topic: str, arg: Any) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(arg)
+            except Exception:
+                logger.exception("Cache invalidation handler for %r failed", topic)
+
+
+class InvalidationBus(ABC):
+    @abstractmethod
+    def subscribe(self, invalidator: Invalidator) -> None:
+        ...
+
+    @abstractmethod
+    def publish(self, message: dict) -> None:
+        ...
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class LocalBus(InvalidationBus):
+    """Synchronous in-memory bus; several Invalidators on one LocalBus behave like separate workers."""
+
+    def __init__(self):
+        self._subscribers: List[Invalidator] = []
+
+    def subscribe(self, invalidator: Invalidator) -> None:
+        self._subscribers.append(invalidator)
+        invalidator.bus = self
+
+    def publish(self, message: dict) -> None:
+        for invalidator in list(self._subscribers):
+            invalidator.deliver(message)
+
+
+class PostgresBus(InvalidationBus):
+    """Events travel as NOTIFY payloads on one channel of the application database.
+
+    Publishing is queued to a sender thread so request handlers never wait on it;
+    a listener thread holds a dedicated autocommit connection in LISTEN mode and
+    reconnects (resetting every cache) if that connection drops.
+    """
+
+    def __init__(self, channel: Optional[str] = None):
+        self.channel = channel or settings.cache_invalidation_channel
+        self._subscribers: List[Invalidator] = []
+        self._outbox: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def subscribe(self, invalidator: Invalidator) -> None:
+        self._subscribers.append(invalidator)
+        invalidator.bus = self
+
+    def publish(self, message: dict) -> None:
+        self._outbox.put(message)
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._send_loop, name="cache-bus-sender", daemon=True),
+            threading.Thread(target=self._listen_loop, name="cache-bus-listener", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        self._outbox.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _send_loop(self) -> None:
+        from sqlalchemy import text
+
+        from .db import get_engine
+
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            batch = [message]
+            # Send whatever piled up meanwhile in the same transaction
+            while not self._outbox.empty() and len(batch) < 100:
+                item = self._outbox.get_nowait()
+                if item is None:
+                    self._outbox.put(None)
+                    break
+                batch.append(item)
+            try:
+                with get_engine().begin() as conn:
+                    conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        [{"channel": self.channel, "payload": json.dumps(m)} for m in batch],
+                    )
+            except Exception:
+                logger.exception("Could not publish %s cache invalidation events", len(batch))
+
+    def _listen_loop(self) -> None:
+        import psycopg
+
+        from .db import get_engine
+
+        conninfo = get_engine().url.set(drivername="postgresql").render_as_string(hide_password=False)
+        first = True
+        while not self._stop_event.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute(f'LISTEN "{self.channel}"')
+                    if not first:
+                        # Events published while we were disconnected are lost
+                        for invalidator in self._subscribers:
+                            invalidator.reset()
+                    first = False
+                    while not self._stop_event.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._dispatch(notify.payload)
+            except Exception:
+                logger.exception("Cache invalidation listener lost its connection; reconnecting")
+                self._stop_event.wait(settings.cache_invalidation_reconnect_seconds)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation event %r", payload[:200])
+            return
+        for invalidator in self._subscribers:
+            invalidator.deliver(message)
+
+
+invalidator = Invalidator()
+
+
+def on_invalidate(topic: str) -> Callable[[Handler], Handler]:
+    """Register a local handler for invalidation events on `topic`."""
+    return invalidator.on(topic)
+
+
+def publish_invalidation(topic: str, arg: Any = None) -> None:
+    """Evict locally now and tell the other workers. `arg` must be JSON serializable."""
+    invalidator.publish(topic, arg)
+
+
+def start_invalidation_bus() -> Optional[InvalidationBus]:
+    """Connect this worker to the bus chosen by settings.cache_invalidation_bus."""
+    from .db import get_engine
+
+    mode = settings.cache_invalidation_bus
+    if mode == "auto":
+        mode = "postgres" if get_engine().dialect.name == "postgresql" else "local"
+    bus: InvalidationBus = PostgresBus() if mode == "postgres" else LocalBus()
+    bus.subscribe(invalidator)
+    bus.start()
+    return bus
+
+
+def stop_invalidation_bus() -> None:
+    if invalidator.bus is not None:
+        invalidator.bus.stop()
+        invalidator.bus = None
@@ -0,0 +1,88 @@
+"""Compression helpers: stored text bodies (see models.SubmissionBody) and HTTP responses."""
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, zlib is always available
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency, responses fall back to gzip
+    brotli = None
+
+from .config import settings
+
+
+def compress_text(value: str) -> Tuple[str, bytes]:
+    """Compress text with the configured codec. Returns (codec, data)."""
+    raw = value.encode("utf-8")
+    if settings.submission_compression == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == "zlib":
+        raw = zlib.decompress(data)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed bodies")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    return raw.decode("utf-8")
+
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None for identity."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def encode_body(body: bytes, encoding: str) -> bytes:
+    """Compress a whole response body with "br" or "gzip"."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.response_brotli_quality)
+    # wbits=31 produces the gzip container
+    compressor = zlib.compressobj(settings.response_gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor for streamed responses."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.response_brotli_quality)
+        else:
+            self._gz = zlib.compressobj(settings.response_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush()
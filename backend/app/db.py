@@ -1,5 +1,13 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import DateTime, create_engine, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 from .config import settings
 
 
@@ -7,14 +15,157 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.database_url, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Bump whenever models.py changes tables or indexes, then run `python -m backend.app.manage init-db`.
+SCHEMA_VERSION = 7
+
+_engine = None
+_read_engine = None
+_engine_lock = threading.Lock()
+# Last replica health check: (monotonic time, usable)
+_replica_status = (0.0, False)
+
+# Zero when the replica has replayed everything it received (or is not a standby at all),
+# otherwise seconds since the last replayed transaction.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+_sessionmaker = sessionmaker(autoflush=False, autocommit=False, future=True)
+
+
+def get_engine() -> Engine:
+    """Create the engine on first use so importing the app does not touch the database driver."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(settings.database_url, echo=False, future=True)
+    return _engine
+
+
+def get_read_engine() -> Optional[Engine]:
+    """Engine for the read replica, or None when no read_database_url is configured."""
+    global _read_engine
+    if not settings.read_database_url:
+        return None
+    if _read_engine is None:
+        with _engine_lock:
+            if _read_engine is None:
+                options = {}
+                if settings.read_database_url.startswith("postgresql"):
+                    # Any accidental write on a read session fails loudly, even against a non-standby
+                    options["postgresql_readonly"] = True
+                _read_engine = create_engine(
+                    settings.read_database_url, echo=False, future=True, execution_options=options
+                )
+    return _read_engine
+
+
+def _replica_usable(engine: Engine) -> bool:
+    global _replica_status
+    checked_at, usable = _replica_status
+    now = time.monotonic()
+    if now - checked_at < settings.replica_health_check_seconds:
+        return usable
+    try:
+        with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+            else:
+                conn.execute(text("SELECT 1"))
+                lag = 0
+        usable = lag is not None and float(lag) <= settings.replica_max_lag_seconds
+    except OperationalError:
+        usable = False
+    _replica_status = (now, usable)
+    return usable
+
+
+def mark_replica_down() -> None:
+    """Route reads to the primary until the next health check."""
+    global _replica_status
+    _replica_status = (time.monotonic(), False)
+
+
+def SessionLocal() -> Session:
+    return _sessionmaker(bind=get_engine())
+
+
+def ReadSessionLocal() -> Session:
+    """Session on the replica when it is configured and healthy, otherwise on the primary."""
+    engine = get_read_engine()
+    if engine is not None and _replica_usable(engine):
+        return _sessionmaker(bind=engine)
+    return SessionLocal()
+
+
+def __getattr__(name):
+    # Backwards compatible access to `db.engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    """create_all never alters existing tables; add columns introduced after a table was created.
+
+    NOT NULL timestamp columns are backfilled with the time of the upgrade.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if not column.nullable and isinstance(column.type, DateTime):
+                    ddl += f" DEFAULT '{datetime.utcnow():%Y-%m-%d %H:%M:%S}' NOT NULL"
+                conn.execute(text(ddl))
 
 
 def init_db():
+    """Create missing tables, columns and indexes and record the schema version. Run once per deploy."""
     # Import models to register metadata
-    from . import models  # noqa: F401
+    from . import models
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    # create_all skips indexes added to tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    with SessionLocal() as db:
+        row = db.get(models.SchemaVersion, 1)
+        if row is None:
+            db.add(models.SchemaVersion(id=1, version=SCHEMA_VERSION, applied_at=datetime.utcnow()))
+        else:
+            row.version = SCHEMA_VERSION
+            row.applied_at = datetime.utcnow()
+        db.commit()
+
+
+def verify_schema():
+    """Cheap startup check: compare the stored schema version with the one this code expects."""
+    from . import models
+    with SessionLocal() as db:
+        try:
+            stored = db.execute(
+                select(models.SchemaVersion.version).where(models.SchemaVersion.id == 1)
+            ).scalar_one_or_none()
+        except Exception as exc:
+            raise RuntimeError(
+                "Schema version table not found; run `python -m backend.app.manage init-db`"
+            ) from exc
+    if stored != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {stored} does not match expected {SCHEMA_VERSION}; "
+            "run `python -m backend.app.manage init-db`"
+        )
 
 
 def get_db_session():
@@ -23,3 +174,23 @@ def get_db_session():
         yield db
     finally:
         db.close()
+
+
+def get_read_db_session(request: Request):
+    """Session for read-only endpoints.
+
+    Clients that need to see their own just-committed writes can send
+    `X-Read-Primary: 1` to skip the replica for that request.
+    """
+    if request.headers.get("x-read-primary"):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    except OperationalError:
+        if db.get_bind() is not get_engine():
+            mark_replica_down()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,116 @@
+"""Serialized-fragment cache for the objects embedded in list responses.
+
+List pages repeat the same few courses and users in every row (an enrollment page
+of one course embeds that course and its teacher hundreds of times). A
+``FragmentSpec`` describes how to render one schema: its own scalar fields are
+dumped through a "shell" model, and each embedded object is rendered by its own
+spec and spliced in as already-serialized JSON. Embedded fragments are kept in a
+bounded LRU keyed by (type, id, updated_at, ...), so a changed row simply stops
+matching its old key; nothing has to be invalidated, in this worker or any other.
+
+Counts attached by the routers (``enrollment_count`` and friends) are not covered
+by ``updated_at``, so they are part of the key too, as are the keys of nested
+fragments (a course embeds its teacher).
+"""
+import json
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, create_model
+
+from .cache import TTLCache
+from .config import settings
+from .schemas import AssignmentRead, CourseRead, EnrollmentRead, SubmissionSummary, UserRead
+
+FRAGMENT_CACHE = TTLCache(max_entries=settings.fragment_cache_max_entries)
+
+
+def _shell_model(schema: Type[BaseModel], exclude: Iterable[str]) -> Type[BaseModel]:
+    """`schema` without the embedded fields, so only the row's own columns are dumped."""
+    fields = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name not in exclude
+    }
+    return create_model(
+        f"{schema.__name__}Shell", __config__=ConfigDict(from_attributes=True), **fields
+    )
+
+
+class FragmentSpec:
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        embedded: Optional[Dict[str, "FragmentSpec"]] = None,
+        extra_key: Optional[Callable[[Any], Tuple]] = None,
+        cached: bool = True,
+    ):
+        self.schema = schema
+        self.embedded = embedded or {}
+        self.extra_key = extra_key
+        # Top-level rows are rendered every time; only what they embed is worth keeping
+        self.cached = cached
+        self.shell = _shell_model(schema, self.embedded)
+        self._prefixes = {name: b"," + json.dumps(name).encode() + b":" for name in self.embedded}
+
+    def key(self, obj: Any) -> Hashable:
+        parts = [self.schema.__name__, obj.id, obj.updated_at]
+        if self.extra_key is not None:
+            parts.extend(self.extra_key(obj))
+        for name, spec in self.embedded.items():
+            child = getattr(obj, name)
+            parts.append(None if child is None else spec.key(child))
+        return tuple(parts)
+
+    def render(self, obj: Any) -> bytes:
+        if obj is None:
+            return b"null"
+        use_cache = self.cached and settings.fragment_cache_enabled
+        if use_cache:
+            key = self.key(obj)
+            hit = FRAGMENT_CACHE.get(key)
+            if hit is not None:
+                return hit
+        shell = self.shell.model_validate(obj).model_dump_json().encode()
+        parts = [shell[:-1]]
+        for name, spec in self.embedded.items():
+            parts.append(self._prefixes[name])
+            parts.append(spec.render(getattr(obj, name)))
+        parts.append(b"}")
+        fragment = b"".join(parts)
+        if use_cache:
+            FRAGMENT_CACHE.set(key, fragment, ttl=settings.fragment_cache_seconds)
+        return fragment
+
+
+def _counts(*names: str) -> Callable[[Any], Tuple]:
+    # Same defaults as the schemas when a router did not attach the counts
+    return lambda obj: tuple(getattr(obj, name, 0) for name in names)
+
+
+USER_FRAGMENT = FragmentSpec(UserRead)
+COURSE_FRAGMENT = FragmentSpec(
+    CourseRead,
+    embedded={"teacher": USER_FRAGMENT},
+    extra_key=_counts("enrollment_count", "assignment_count"),
+)
+ASSIGNMENT_FRAGMENT = FragmentSpec(
+    AssignmentRead,
+    embedded={"course": COURSE_FRAGMENT},
+    extra_key=_counts("submission_count"),
+)
+ENROLLMENT_ROW = FragmentSpec(
+    EnrollmentRead, embedded={"student": USER_FRAGMENT, "course": COURSE_FRAGMENT}, cached=False
+)
+SUBMISSION_SUMMARY_ROW = FragmentSpec(
+    SubmissionSummary, embedded={"assignment": ASSIGNMENT_FRAGMENT, "student": USER_FRAGMENT}, cached=False
+)
+
+
+def render_list(spec: FragmentSpec, rows: Iterable[Any]) -> bytes:
+    return b"[" + b",".join(spec.render(row) for row in rows) + b"]"
+
+
+def fragment_list_response(spec: FragmentSpec, rows: Iterable[Any]) -> Response:
+    """JSON array response built from fragments (same body the response_model would produce)."""
+    return Response(content=render_list(spec, rows), media_type="application/json")
@@ -0,0 +1,209 @@
+"""Persistent background jobs backed by the `jobs` table.
+
+Workers claim due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of
+threads or processes can poll the same table without a broker. Failed jobs are
+retried with exponential backoff until ``max_attempts``.
+
+Handlers are registered with ``@job_handler("kind")`` (see app.tasks) and receive
+the worker's session plus the job payload; their return value is stored as the
+job result. Handlers commit their own work or leave it to the worker, which
+commits after marking the job done.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .db import SessionLocal
+
+logger = logging.getLogger("uvicorn.error")
+
+Handler = Callable[[Session, dict], Optional[dict]]
+
+HANDLERS: Dict[str, Handler] = {}
+# kind -> callable returning the interval in seconds (<= 0 disables the schedule)
+PERIODIC: Dict[str, Callable[[], float]] = {}
+
+
+def job_handler(kind: str, every: Optional[Callable[[], float]] = None):
+    """Register a handler for `kind`; with `every`, the job also re-enqueues itself periodically."""
+    def decorator(func: Handler) -> Handler:
+        HANDLERS[kind] = func
+        if every is not None:
+            PERIODIC[kind] = every
+        return func
+    return decorator
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+    unique_key: Optional[str] = None,
+) -> Optional[models.Job]:
+    """Add a job to the queue in the caller's transaction.
+
+    With `unique_key`, returns None instead when a pending job with that key already exists.
+    """
+    job = models.Job(
+        kind=kind,
+        payload=payload or {},
+        run_at=run_at or datetime.utcnow(),
+        unique_key=unique_key,
+    )
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    if unique_key is None:
+        db.add(job)
+        db.flush()
+        return job
+    try:
+        with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        return None
+    return job
+
+
+def ensure_periodic_jobs(db: Session) -> None:
+    """Make sure every enabled periodic job has one pending run."""
+    for kind, every in PERIODIC.items():
+        if every() > 0:
+            enqueue(db, kind, unique_key=f"periodic:{kind}")
+    db.commit()
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = settings.job_retry_base_seconds * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.job_retry_max_seconds))
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[models.Job]:
+    """Lock the next due job (or one abandoned by a dead worker) and mark it running."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.job_lock_timeout_seconds)
+    job = db.execute(
+        select(models.Job)
+        .where(
+            or_(
+                and_(models.Job.status == "queued", models.Job.run_at <= now),
+                and_(models.Job.status == "running", models.Job.locked_at < stale),
+            )
+        )
+        .order_by(models.Job.run_at, models.Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if job is None:
+        db.rollback()
+        return None
+    job.status = "running"
+    job.locked_by = worker_id
+    job.locked_at = now
+    job.attempts += 1
+    db.commit()
+    return job
+
+
+def run_next(worker_id: str) -> bool:
+    """Claim and run one job. Returns False when nothing was due."""
+    with SessionLocal() as db:
+        job = claim_next(db, worker_id)
+        if job is None:
+            return False
+
+        handler = HANDLERS.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job.kind!r}")
+            result = handler(db, dict(job.payload or {}))
+        except Exception:
+            db.rollback()
+            error = traceback.format_exc(limit=5)
+            logger.warning("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            job.last_error = error
+            job.locked_by = None
+            job.locked_at = None
+            if job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.run_at = datetime.utcnow() + _backoff(job.attempts)
+            else:
+                job.status = "failed"
+                _finish(db, job)
+            db.commit()
+            return True
+
+        job.status = "done"
+        job.result = result
+        job.last_error = None
+        _finish(db, job)
+        db.commit()
+        return True
+
+
+def _finish(db: Session, job: models.Job) -> None:
+    job.locked_by = None
+    job.locked_at = None
+    if job.unique_key is not None:
+        job.unique_key = None
+        db.flush()
+    every = PERIODIC.get(job.kind)
+    if every is not None and every() > 0:
+        enqueue(
+            db,
+            job.kind,
+            run_at=datetime.utcnow() + timedelta(seconds=every()),
+            unique_key=f"periodic:{job.kind}",
+        )
+
+
+class JobWorker(threading.Thread):
+    """Polls the jobs table and runs due jobs until stopped."""
+
+    def __init__(self, name: str):
+        super().__init__(name=name, daemon=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{name}"
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                ran = run_next(self.worker_id)
+            except Exception:
+                logger.exception("Job worker %s crashed while polling", self.worker_id)
+                ran = False
+            if not ran:
+                self._stop_event.wait(settings.jobs_poll_interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_workers(count: int) -> List[JobWorker]:
+    # Register the built-in handlers
+    from . import tasks  # noqa: F401
+
+    with SessionLocal() as db:
+        ensure_periodic_jobs(db)
+    workers = [JobWorker(f"job-worker-{i}") for i in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def stop_workers(workers: List[JobWorker], timeout: float = 10.0) -> None:
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        worker.join(timeout)
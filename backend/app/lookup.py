@@ -0,0 +1,32 @@
+"""Helpers for the `/batch` fetch-by-ids endpoints."""
+from typing import Any, Callable, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from .config import settings
+
+
+def check_batch_size(ids: List[int]) -> List[int]:
+    if len(ids) > settings.batch_lookup_max_ids:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.batch_lookup_max_ids} ids per request",
+        )
+    return ids
+
+
+def parse_id_list(raw: str) -> List[int]:
+    """Parse `?ids=1,2,3` into a list of ints, keeping order and duplicates."""
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be a comma separated list of integers")
+    return check_batch_size(ids)
+
+
+def in_request_order(
+    ids: List[int], rows: Iterable[Any], key: Callable[[Any], int] = lambda row: row.id
+) -> List[Optional[Any]]:
+    """Line rows up with the requested ids; ids that were not found become None."""
+    by_id = {key(row): row for row in rows}
+    return [by_id.get(i) for i in ids]
@@ -1,14 +1,32 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from .batching import stop_notification_batcher
+from .cache import start_invalidation_bus, stop_invalidation_bus
 from .config import settings
-from .db import init_db
+from .db import init_db, verify_schema
+from .jobs import start_workers, stop_workers
+from .middleware import CoalescingMiddleware, CompressionMiddleware, LoadSheddingMiddleware
 from . import routers
 from .schemas import HealthResponse
 
+logger = logging.getLogger("uvicorn.error")
+
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Semillero Digital Backend", version="0.1.0")
 
+    # Middleware added first runs innermost: coalescing sits closest to the routes and
+    # replays precompressed bytes that compression passes through; everything is inside
+    # CORS so 429/503 responses still get CORS headers
+    app.add_middleware(CoalescingMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(LoadSheddingMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
@@ -19,7 +37,27 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     def on_startup():
-        init_db()
+        if settings.startup_schema_mode == "create":
+            init_db()
+        elif settings.startup_schema_mode == "verify":
+            verify_schema()
+        start_invalidation_bus()
+        app.state.job_workers = []
+        if settings.jobs_inprocess_workers > 0:
+            app.state.job_workers = start_workers(settings.jobs_inprocess_workers)
+        app.state.startup_ms = (time.perf_counter() - _IMPORT_STARTED) * 1000
+        logger.info(
+            "Worker %s ready in %.1f ms (import to ready, schema mode %s)",
+            os.getpid(),
+            app.state.startup_ms,
+            settings.startup_schema_mode,
+        )
+
+    @app.on_event("shutdown")
+    def on_shutdown():
+        stop_workers(getattr(app.state, "job_workers", []))
+        stop_notification_batcher()
+        stop_invalidation_bus()
 
     @app.get("/health", response_model=HealthResponse)
     def health():
@@ -31,6 +69,10 @@ def create_app() -> FastAPI:
     app.include_router(routers.assignments_router)
     app.include_router(routers.announcements_router)
     app.include_router(routers.notifications_router)
+    app.include_router(routers.calendar_router)
+    app.include_router(routers.reports_router)
+    app.include_router(routers.jobs_router)
+    app.include_router(routers.changes_router)
 
     return app
 
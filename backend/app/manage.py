@@ -0,0 +1,40 @@
+"""One-shot management commands.
+
+Usage:
+    python -m backend.app.manage init-db    # create tables/indexes and store the schema version
+    python -m backend.app.manage check-db   # verify the stored schema version
+    python -m backend.app.manage backfill-rollups   # rebuild the activity rollups from all submissions
+"""
+import argparse
+import sys
+
+from .db import SCHEMA_VERSION, SessionLocal, init_db, verify_schema
+from .rollups import refresh_activity_rollups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Semillero Digital backend management commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("init-db", help="Create missing tables and indexes (DDL) and record the schema version")
+    sub.add_parser("check-db", help="Exit non-zero if the database schema version is out of date")
+    sub.add_parser("backfill-rollups", help="Recompute the activity rollups from existing submissions")
+    args = parser.parse_args(argv)
+
+    if args.command == "init-db":
+        init_db()
+        print(f"Database schema at version {SCHEMA_VERSION}")
+    elif args.command == "check-db":
+        try:
+            verify_schema()
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+        print(f"Database schema at version {SCHEMA_VERSION}")
+    elif args.command == "backfill-rollups":
+        with SessionLocal() as db:
+            result = refresh_activity_rollups(db, full=True)
+        print(f"Activity rollups rebuilt up to {result['watermark']}")
+
+
+if __name__ == "__main__":
+    main()
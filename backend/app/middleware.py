@@ -0,0 +1,422 @@
+"""ASGI middleware for protecting the database under bursts of traffic."""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from .cache import on_invalidate, publish_invalidation
+from .compression import StreamCompressor, encode_body, is_compressible, negotiate_encoding
+from .config import settings
+
+# Paths that are never limited
+EXEMPT_PATHS = ("/health", "/users/health")
+
+
+class LoadSheddingMiddleware:
+    """Per-client token buckets plus a concurrency cap per expensive route group.
+
+    - Every request spends one token from its client address's bucket (refilled at
+      ``rate_limit_per_second`` up to ``rate_limit_burst``); an empty bucket gets 429.
+    - Requests whose path starts with a prefix in ``route_concurrency_limits`` share a
+      limited number of slots; waiting longer than ``shed_queue_timeout_ms`` for one
+      gets 503. Both responses carry Retry-After.
+    """
+
+    def __init__(self, app, max_tracked_clients: int = 10000):
+        self.app = app
+        self.max_tracked_clients = max_tracked_clients
+        # client address -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.load_shedding_enabled
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        wait = self._take_token(self._client_key(scope))
+        if wait > 0:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        semaphore = self._semaphore_for(scope["path"])
+        if semaphore is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=settings.shed_queue_timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                {"detail": "Server busy, try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(settings.shed_retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
+
+    def _client_key(self, scope) -> str:
+        """The caller's address: the peer, or the X-Forwarded-For hop in front of our trusted proxies.
+
+        Query parameters and other client-supplied ids are not used; anyone could pick them.
+        """
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        trusted = settings.trusted_proxy_ips
+        if address in trusted:
+            forwarded = Headers(scope=scope).get("x-forwarded-for", "")
+            # Walk from the nearest hop back past every trusted proxy
+            for hop in reversed([h.strip() for h in forwarded.split(",") if h.strip()]):
+                address = hop
+                if hop not in trusted:
+                    break
+        return address
+
+    def _take_token(self, key: str) -> float:
+        """Spend one token. Returns 0 on success, otherwise seconds until a token is available."""
+        rate = settings.rate_limit_per_second
+        burst = float(settings.rate_limit_burst)
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate if rate > 0 else float(settings.shed_retry_after_seconds)
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_tracked_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def _semaphore_for(self, path: str) -> Optional[asyncio.Semaphore]:
+        for prefix, limit in settings.route_concurrency_limits.items():
+            if path.startswith(prefix):
+                semaphore = self._semaphores.get(prefix)
+                if semaphore is None:
+                    semaphore = self._semaphores[prefix] = asyncio.Semaphore(limit)
+                return semaphore
+        return None
+
+
+# Write path prefix -> GET path prefixes whose cached responses it makes stale
+COALESCE_INVALIDATES = {
+    "/announcements": ("/announcements",),
+    "/courses": ("/courses", "/assignments", "/enrollments"),
+    "/enrollments": ("/enrollments", "/courses"),
+    "/assignments": ("/assignments", "/courses"),
+    "/users": ("/users", "/courses", "/assignments", "/enrollments"),
+    "/notifications": ("/notifications",),
+}
+
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# POST endpoints that only read (fetch by ids in the body) and never invalidate anything
+READ_ONLY_POST_SUFFIXES = ("/batch",)
+
+
+def vary_on_encoding(headers: MutableHeaders) -> None:
+    """Add Accept-Encoding to Vary once (both compression layers may see a response)."""
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in [v.strip().lower() for v in vary.split(",")]:
+        headers.add_vary_header("Accept-Encoding")
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    """An encoded body is not byte-identical to the identity one, so its ETag must not be strong."""
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["etag"] = "W/" + etag
+
+
+def affected_prefixes(path: str) -> Tuple[str, ...]:
+    """Path prefixes whose coalesced GETs a write to `path` can change."""
+    for write_prefix, affected in COALESCE_INVALIDATES.items():
+        if path.startswith(write_prefix):
+            return affected
+    return ()
+
+
+def mark_write_unchanged(request) -> None:
+    """Tell CoalescingMiddleware that this (successful) write changed nothing.
+
+    For idempotent endpoints hit on every page load, such as POST /users/resolve.
+    """
+    request.state.write_unchanged = True
+
+
+class CapturedResponse:
+    """Status, headers and body of a finished response, replayable to other clients.
+
+    Compressed variants are built once per encoding and kept alongside the body, so
+    hot cached payloads are not recompressed for every client.
+    """
+
+    def __init__(self):
+        self.status = 200
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+        self._variants: Dict[str, Tuple[List[Tuple[bytes, bytes]], bytes]] = {}
+
+    def _variant(self, encoding: str) -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+        """Headers and body for "br", "gzip" or "identity" (which only gains the Vary header)."""
+        variant = self._variants.get(encoding)
+        if variant is None:
+            headers = MutableHeaders(raw=list(self.headers))
+            vary_on_encoding(headers)
+            body = self.body
+            if encoding != "identity":
+                body = encode_body(self.body, encoding)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+                weaken_etag(headers)
+            variant = self._variants[encoding] = (headers.raw, body)
+        return variant
+
+    async def replay(self, send, accept_encoding: str = ""):
+        headers, body = self.headers, self.body
+        if (
+            settings.response_compression_enabled
+            and is_compressible(Headers(raw=headers).get("content-type", ""))
+            and "content-encoding" not in Headers(raw=headers)
+        ):
+            encoding = negotiate_encoding(accept_encoding)
+            if encoding is None or len(body) < settings.response_compression_min_size:
+                encoding = "identity"
+            headers, body = self._variant(encoding)
+        await send({"type": "http.response.start", "status": self.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class CoalescingMiddleware:
+    """Single-flight for hot identical GETs.
+
+    For paths listed in ``coalesce_paths``, concurrent requests with the same path and
+    query string share one downstream computation and its serialized bytes. Successful
+    responses are then kept for ``coalesce_ttl_ms``. Any successful write under a
+    related prefix (see COALESCE_INVALIDATES), in this worker or another one, drops
+    cached entries and detaches in-flight ones. Writes that cannot affect a coalesced
+    path, /batch lookups and writes marked with ``mark_write_unchanged`` publish nothing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._inflight: Dict[Tuple[str, bytes], asyncio.Future] = {}
+        self._cache: Dict[Tuple[str, bytes], Tuple[float, CapturedResponse]] = {}
+        self._generation = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        on_invalidate("http.write")(self._on_remote_write)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._loop = asyncio.get_running_loop()
+        if scope["method"] != "GET":
+            await self._forward_write(scope, receive, send)
+            return
+        if scope["path"] not in settings.coalesce_paths or self._bypass(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], scope.get("query_string", b""))
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            await cached[1].replay(send, accept_encoding)
+            return
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            captured = await asyncio.shield(inflight)
+            if captured is not None:
+                await captured.replay(send, accept_encoding)
+                return
+            # The leader failed; compute our own response
+            await self.app(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        captured = CapturedResponse()
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured.status = message["status"]
+                captured.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        captured.body = b"".join(chunks)
+        future.set_result(captured)
+        if captured.status == 200 and generation == self._generation and settings.coalesce_ttl_ms > 0:
+            self._store(key, captured)
+
+    async def _forward_write(self, scope, receive, send) -> None:
+        """Run a non-GET request and, if it changed something, invalidate everywhere."""
+        path = scope["path"]
+        if (
+            scope["method"] not in WRITE_METHODS
+            or path.rstrip("/").endswith(READ_ONLY_POST_SUFFIXES)
+            or not any(p.startswith(affected_prefixes(path)) for p in settings.coalesce_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def track(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, track)
+        # Failed or no-op writes changed nothing; each publish costs a NOTIFY and flushes every worker
+        if 200 <= status < 300 and not scope.get("state", {}).get("write_unchanged"):
+            publish_invalidation("http.write", path)
+
+    def _bypass(self, scope) -> bool:
+        for name, _ in scope.get("headers", []):
+            if name == b"x-read-primary":
+                return True
+        return False
+
+    def _store(self, key, captured: CapturedResponse) -> None:
+        now = time.monotonic()
+        for stale in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[stale]
+        self._cache[key] = (now + settings.coalesce_ttl_ms / 1000, captured)
+
+    def _on_remote_write(self, path: Optional[str]) -> None:
+        # Bus events arrive on the listener thread; the caches belong to the event loop
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop or loop.is_closed():
+            self.invalidate_for_write(path)
+        else:
+            loop.call_soon_threadsafe(self.invalidate_for_write, path)
+
+    def invalidate_for_write(self, path: Optional[str]) -> None:
+        """Drop entries affected by a write to `path`; None drops everything."""
+        if path is None:
+            self._generation += 1
+            self._cache.clear()
+            self._inflight.clear()
+            return
+        prefixes = affected_prefixes(path)
+        if not prefixes:
+            return
+        self._generation += 1
+        for key in [k for k in self._cache if k[0].startswith(prefixes)]:
+            del self._cache[key]
+        for key in [k for k in self._inflight if k[0].startswith(prefixes)]:
+            # Requests arriving from now on start a fresh computation
+            del self._inflight[key]
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression with a minimum size and configurable level.
+
+    Responses that already carry Content-Encoding (e.g. precompressed replays from
+    CoalescingMiddleware) pass through untouched. Streamed responses are compressed
+    incrementally. Compressible responses always carry ``Vary: Accept-Encoding`` and
+    encoded ones get a weak ETag, since their bytes differ from the identity body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.response_compression_enabled:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start_message = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def compress_send(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk tells us the size
+                start_message = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                data = compressor.compress(body)
+                if not more_body:
+                    data += compressor.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            compressible = "content-encoding" not in headers and is_compressible(headers.get("content-type", ""))
+            if compressible:
+                # Identity answers vary on Accept-Encoding too, or a shared cache could
+                # hand them (or a compressed one) to the wrong clients
+                vary_on_encoding(headers)
+            if (
+                not compressible
+                or encoding is None
+                or (not more_body and len(body) < settings.response_compression_min_size)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["content-encoding"] = encoding
+            weaken_etag(headers)
+            if more_body:
+                compressor = StreamCompressor(encoding)
+                del headers["content-length"]
+                await send(start_message)
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            else:
+                data = encode_body(body, encoding)
+                headers["content-length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data})
+
+        await self.app(scope, receive, compress_send)
@@ -1,8 +1,19 @@
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Boolean, Float
+from sqlalchemy import String, Integer, DateTime, Date, Text, ForeignKey, Boolean, Float, Index, LargeBinary, JSON, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from .db import Base
+from .config import settings
+from .compression import compress_text, decompress_text
+
+
+class SchemaVersion(Base):
+    """Single-row table written by `manage init-db` and checked on startup."""
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
 
 class User(Base):
@@ -23,6 +34,9 @@ class User(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_updated_at", "updated_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -40,11 +54,17 @@ class Course(Base):
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        Index("ix_enrollments_course_student", "course_id", "student_id"),
+        Index("ix_enrollments_student", "student_id"),
+        Index("ix_enrollments_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     course_id: Mapped[int] = mapped_column(Integer, ForeignKey("courses.id"), nullable=False)
     enrolled_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
     student: Mapped["User"] = relationship("User", back_populates="enrollments")
@@ -53,6 +73,10 @@ class Enrollment(Base):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_course_active", "course_id", "is_active"),
+        Index("ix_assignments_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -71,23 +95,81 @@ class Assignment(Base):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_assignment_student", "assignment_id", "student_id"),
+        Index("ix_submissions_updated_at", "updated_at"),
+        # Grading queue: only ungraded rows are indexed, so it stays small as graded history grows
+        Index(
+            "ix_submissions_ungraded",
+            "submitted_at",
+            "id",
+            postgresql_include=["assignment_id"],
+            postgresql_where=text("score IS NULL"),
+            sqlite_where=text("score IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    assignment_id: Mapped[int] = mapped_column(Integer, ForeignKey("assignments.id"), nullable=False)
+    # active_history: the rollup listeners need the old value even when the row was
+    # expired (e.g. after a commit) before being changed
+    assignment_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("assignments.id"), nullable=False, active_history=True
+    )
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
-    content: Mapped[Optional[str]] = mapped_column(Text)
+    # Bodies are deferred: list queries never load them. Large content lives compressed
+    # in submission_bodies; use the `content` property to read or write it.
+    _content: Mapped[Optional[str]] = mapped_column("content", Text, deferred=True)
     score: Mapped[Optional[float]] = mapped_column(Float)
-    feedback: Mapped[Optional[str]] = mapped_column(Text)
-    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    feedback: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, active_history=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
     assignment: Mapped["Assignment"] = relationship("Assignment", back_populates="submissions")
     student: Mapped["User"] = relationship("User", back_populates="submissions")
+    body: Mapped[Optional["SubmissionBody"]] = relationship(
+        "SubmissionBody", back_populates="submission", uselist=False, cascade="all, delete-orphan"
+    )
+
+    @property
+    def content(self) -> Optional[str]:
+        if self.body is not None:
+            return decompress_text(self.body.codec, self.body.data)
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        if value is not None and len(value) >= settings.submission_compress_min_chars:
+            codec, data = compress_text(value)
+            if self.body is None:
+                self.body = SubmissionBody(codec=codec, data=data)
+            else:
+                self.body.codec = codec
+                self.body.data = data
+            self._content = None
+        else:
+            self.body = None
+            self._content = value
+
+
+class SubmissionBody(Base):
+    """Compressed storage for large Submission.content values."""
+    __tablename__ = "submission_bodies"
+
+    submission_id: Mapped[int] = mapped_column(Integer, ForeignKey("submissions.id"), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    submission: Mapped["Submission"] = relationship("Submission", back_populates="body")
 
 
 class Announcement(Base):
     __tablename__ = "announcements"
+    __table_args__ = (
+        # Serves the "visible right now" lookup
+        Index("ix_announcements_visibility", "is_active", "start_at", "end_at"),
+        Index("ix_announcements_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -105,6 +187,13 @@ class Announcement(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        Index("ix_notifications_user_read", "user_id", "is_read"),
+        # Lets the retention job find old read rows without scanning the table
+        Index("ix_notifications_read_created", "is_read", "created_at"),
+        Index("ix_notifications_user_updated", "user_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -120,3 +209,108 @@ class Notification(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="notifications")
     related_assignment: Mapped[Optional["Assignment"]] = relationship("Assignment")
+
+
+class Tombstone(Base):
+    """Record of a hard-deleted row, so the change feed can report deletions."""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entity: Mapped[str] = mapped_column(String(50), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # User the deleted row belonged to (student or notification recipient), for per-user feeds
+    user_id: Mapped[Optional[int]] = mapped_column(Integer)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class NotificationArchive(Base):
+    """Cold copy of notifications moved out by the retention job (see app.retention)."""
+    __tablename__ = "notifications_archive"
+    __table_args__ = (
+        Index("ix_notifications_archive_user_created", "user_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    content: Mapped[Optional[str]] = mapped_column(Text)
+    category: Mapped[str] = mapped_column(String(50), nullable=False, default="general")
+    is_read: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    related_assignment_id: Mapped[Optional[int]] = mapped_column(Integer)
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class Job(Base):
+    """Unit of background work, claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED (see app.jobs)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[Optional[dict]] = mapped_column(JSON)
+    # queued | running | done | failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    run_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set while a job is pending so periodic jobs are enqueued at most once; cleared when it finishes
+    unique_key: Mapped[Optional[str]] = mapped_column(String(100), unique=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100))
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    result: Mapped[Optional[dict]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class CourseDailyActivity(Base):
+    """Submission activity per course and day, maintained by app.rollups."""
+    __tablename__ = "course_daily_activity"
+
+    course_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    submissions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    on_time: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    late: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    graded: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Distinct students who submitted something that day
+    active_students: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CourseWeeklyActivity(Base):
+    """Same as CourseDailyActivity per ISO week (Monday), since distinct students don't add up across days."""
+    __tablename__ = "course_weekly_activity"
+
+    course_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    submissions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    on_time: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    late: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    graded: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    active_students: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RollupDirtyKey(Base):
+    """(course, day) whose rollups must be recomputed for a change the watermark can't see (deletes, moves)."""
+    __tablename__ = "rollup_dirty_keys"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    course_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class RollupWatermark(Base):
+    """How far each rollup has consumed the source tables' updated_at."""
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,101 @@
+"""Retention job for the notifications table.
+
+Read notifications older than ``notification_retention_days`` are archived (or
+deleted) in small batches, each in its own short transaction, so the hot table
+stays small without holding long locks.
+
+Usage:
+    python -m backend.app.retention [--days N] [--batch-size N] [--mode archive|delete]
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .db import SessionLocal
+from .tombstones import record_deletions_from
+
+ARCHIVED_COLUMNS = [
+    "id",
+    "user_id",
+    "title",
+    "content",
+    "category",
+    "is_read",
+    "related_assignment_id",
+    "due_date",
+    "created_at",
+    "updated_at",
+]
+
+
+def purge_read_notifications(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    mode: Optional[str] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Move or delete old read notifications batch by batch. Returns the number of rows removed."""
+    days = settings.notification_retention_days if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.notification_retention_batch_size
+    mode = mode or settings.notification_retention_mode
+    if mode not in ("archive", "delete"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    n = models.Notification
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = db.execute(
+            select(n.id)
+            .where(n.is_read == True, n.created_at < cutoff)  # noqa: E712
+            .order_by(n.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        if mode == "archive":
+            source = select(
+                *[getattr(n, c) for c in ARCHIVED_COLUMNS],
+                literal(datetime.utcnow()).label("archived_at"),
+            ).where(n.id.in_(ids))
+            db.execute(
+                insert(models.NotificationArchive).from_select(ARCHIVED_COLUMNS + ["archived_at"], source)
+            )
+        # Archived or not, the rows leave the hot table, so change-feed clients must drop them
+        record_deletions_from(db, "notification", select(n.id, n.user_id).where(n.id.in_(ids)))
+        db.execute(delete(n).where(n.id.in_(ids)))
+        db.commit()
+
+        total += len(ids)
+        batches += 1
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive or delete old read notifications.")
+    parser.add_argument("--days", type=int, default=None, help="Retention window in days")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--mode", choices=["archive", "delete"], default=None)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        removed = purge_read_notifications(db, args.days, args.batch_size, args.mode)
+    finally:
+        db.close()
+    print(f"Removed {removed} notifications from the hot table")
+
+
+if __name__ == "__main__":
+    main()
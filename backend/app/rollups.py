@@ -0,0 +1,189 @@
+"""Incrementally maintained submission activity rollups for the reports endpoints.
+
+``course_daily_activity`` and ``course_weekly_activity`` hold per-course counts
+(submissions, on time, late, graded, active students). Each refresh reads the
+(course, day) keys touched since the last watermark -- submissions or their
+assignments with a newer ``updated_at``, plus keys queued in ``rollup_dirty_keys`` --
+and recomputes only those rows from the source tables.
+
+``updated_at`` only reveals where a submission is now. The ORM listeners below queue
+the key it is leaving: the old day or assignment of a moved submission, and the day
+of a deleted one (including cascades). Submissions are never deleted or moved with
+bulk Core statements; code that starts doing so must queue the keys itself.
+
+Usage:
+    python -m backend.app.manage backfill-rollups   # rebuild everything from scratch
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import Date, and_, case, cast, delete, event, func, insert, inspect, select, tuple_
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+WATERMARK_NAME = "course_activity"
+# Keys per DELETE/INSERT statement
+KEY_CHUNK = 500
+
+Key = Tuple[int, date]
+
+
+def _queue_key(connection, assignment_id: Optional[int], submitted_at: Optional[datetime]) -> None:
+    """Queue (course of assignment_id, day of submitted_at) in the flushing transaction."""
+    if assignment_id is None or submitted_at is None:
+        return
+    a = models.Assignment
+    course_id = connection.execute(select(a.course_id).where(a.id == assignment_id)).scalar()
+    if course_id is not None:
+        connection.execute(insert(models.RollupDirtyKey).values(course_id=course_id, day=submitted_at.date()))
+
+
+@event.listens_for(models.Submission, "before_update")
+def _submission_moving(mapper, connection, target) -> None:
+    state = inspect(target)
+    day = state.attrs.submitted_at.history
+    assignment = state.attrs.assignment_id.history
+    if not (day.deleted or assignment.deleted):
+        return
+    old_day = day.deleted[0] if day.deleted else target.submitted_at
+    old_assignment = assignment.deleted[0] if assignment.deleted else target.assignment_id
+    _queue_key(connection, old_assignment, old_day)
+
+
+@event.listens_for(models.Submission, "before_delete")
+def _submission_deleted(mapper, connection, target) -> None:
+    state = inspect(target)
+    # The committed values, in case the row was also modified before being deleted
+    day = state.attrs.submitted_at.history
+    assignment = state.attrs.assignment_id.history
+    _queue_key(
+        connection,
+        assignment.deleted[0] if assignment.deleted else target.assignment_id,
+        day.deleted[0] if day.deleted else target.submitted_at,
+    )
+
+
+def _day(column):
+    return func.date(column, type_=Date)
+
+
+def _week_start(db: Session, column):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column, "weekday 0", "-6 days", type_=Date)
+    return cast(func.date_trunc("week", column), Date)
+
+
+def _week_of(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _activity_columns(s, a):
+    late = and_(a.due_date.isnot(None), s.submitted_at > a.due_date)
+    return (
+        func.count(s.id),
+        func.coalesce(func.sum(case((late, 0), else_=1)), 0),
+        func.coalesce(func.sum(case((late, 1), else_=0)), 0),
+        func.count(s.score),
+        func.count(func.distinct(s.student_id)),
+    )
+
+
+ACTIVITY_COLUMNS = ["submissions", "on_time", "late", "graded", "active_students"]
+
+
+def _recompute(db: Session, table, bucket_column: str, bucket_expr, keys: Iterable[Key], span: timedelta) -> None:
+    """Replace the rollup rows for `keys` (course_id, bucket) with fresh aggregates."""
+    s, a = models.Submission, models.Assignment
+    keys = sorted(keys)
+    for i in range(0, len(keys), KEY_CHUNK):
+        chunk = keys[i:i + KEY_CHUNK]
+        key_columns = tuple_(table.course_id, getattr(table, bucket_column))
+        db.execute(delete(table).where(key_columns.in_(chunk)))
+        # The course/time range lets the planner use indexes before the exact key filter
+        source = (
+            select(a.course_id, bucket_expr, *_activity_columns(s, a))
+            .join(a, a.id == s.assignment_id)
+            .where(
+                a.course_id.in_({course_id for course_id, _ in chunk}),
+                s.submitted_at >= datetime.combine(min(b for _, b in chunk), datetime.min.time()),
+                s.submitted_at < datetime.combine(max(b for _, b in chunk) + span, datetime.min.time()),
+                tuple_(a.course_id, bucket_expr).in_(chunk),
+            )
+            .group_by(a.course_id, bucket_expr)
+        )
+        db.execute(insert(table).from_select(["course_id", bucket_column] + ACTIVITY_COLUMNS, source))
+
+
+def _rebuild_all(db: Session) -> None:
+    s, a = models.Submission, models.Assignment
+    for table, bucket_column, bucket_expr in (
+        (models.CourseDailyActivity, "day", _day(s.submitted_at)),
+        (models.CourseWeeklyActivity, "week_start", _week_start(db, s.submitted_at)),
+    ):
+        db.execute(delete(table))
+        source = (
+            select(a.course_id, bucket_expr, *_activity_columns(s, a))
+            .join(a, a.id == s.assignment_id)
+            .group_by(a.course_id, bucket_expr)
+        )
+        db.execute(insert(table).from_select(["course_id", bucket_column] + ACTIVITY_COLUMNS, source))
+    db.execute(delete(models.RollupDirtyKey))
+
+
+def _changed_keys(db: Session, since: datetime, until: datetime) -> Set[Key]:
+    s, a = models.Submission, models.Assignment
+    day = _day(s.submitted_at)
+    changed_submissions = (
+        select(a.course_id, day)
+        .join(a, a.id == s.assignment_id)
+        .where(s.updated_at > since, s.updated_at <= until)
+    )
+    # A new due_date or max_score changes the on-time/late split of every submission
+    changed_assignments = (
+        select(a.course_id, day)
+        .join(a, a.id == s.assignment_id)
+        .where(a.updated_at > since, a.updated_at <= until)
+    )
+    keys = set()
+    for q in (changed_submissions, changed_assignments):
+        keys.update((course_id, d) for course_id, d in db.execute(q.distinct()))
+    return keys
+
+
+def refresh_activity_rollups(db: Session, full: bool = False) -> dict:
+    """Bring the rollups up to date and commit. Returns what was recomputed."""
+    until = datetime.utcnow() - timedelta(seconds=settings.rollup_safety_seconds)
+    state = db.get(models.RollupWatermark, WATERMARK_NAME, with_for_update=True)
+    if state is None:
+        state = models.RollupWatermark(name=WATERMARK_NAME, watermark=datetime(1970, 1, 1))
+        db.add(state)
+        full = True
+
+    if full:
+        _rebuild_all(db)
+        days = weeks = None
+    else:
+        dirty = db.execute(select(models.RollupDirtyKey.id, models.RollupDirtyKey.course_id, models.RollupDirtyKey.day)).all()
+        day_keys = _changed_keys(db, state.watermark, until)
+        day_keys.update((course_id, d) for _, course_id, d in dirty)
+        week_keys = {(course_id, _week_of(d)) for course_id, d in day_keys}
+        s = models.Submission
+        _recompute(db, models.CourseDailyActivity, "day", _day(s.submitted_at), day_keys, timedelta(days=1))
+        _recompute(
+            db, models.CourseWeeklyActivity, "week_start", _week_start(db, s.submitted_at), week_keys, timedelta(days=7)
+        )
+        if dirty:
+            db.execute(delete(models.RollupDirtyKey).where(models.RollupDirtyKey.id.in_([row.id for row in dirty])))
+        days, weeks = len(day_keys), len(week_keys)
+
+    state.watermark = until
+    state.refreshed_at = datetime.utcnow()
+    db.commit()
+    return {"days": days, "weeks": weeks, "watermark": until.isoformat(), "full": full}
+
+
+def activity_watermark(db: Session) -> Optional[datetime]:
+    state = db.get(models.RollupWatermark, WATERMARK_NAME)
+    return state.watermark if state is not None else None
@@ -4,3 +4,7 @@ from .enrollments import router as enrollments_router
 from .assignments import router as assignments_router
 from .announcements import router as announcements_router
 from .notifications import router as notifications_router
+from .calendar import router as calendar_router
+from .reports import router as reports_router
+from .jobs import router as jobs_router
+from .changes import router as changes_router
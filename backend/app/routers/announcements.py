@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, or_
 from typing import List, Optional
-from ..db import get_db_session
+from datetime import datetime
+from ..db import get_db_session, get_read_db_session
 from .. import models
+from ..cache import TTLCache, on_invalidate, publish_invalidation
+from ..config import settings
 from ..schemas import (
     AnnouncementCreate,
     AnnouncementUpdate,
@@ -12,12 +16,47 @@ from ..schemas import (
 router = APIRouter(prefix="/announcements", tags=["announcements"])
 
 
+# Announcements visible right now. The entry expires at the next start_at/end_at
+# boundary and is dropped on every write in this router, in every worker.
+VISIBLE_CACHE = TTLCache()
+
+
+@on_invalidate("announcements")
+def _forget_visible(_arg) -> None:
+    VISIBLE_CACHE.invalidate()
+
+
+def _visible_filter(now: datetime):
+    return and_(
+        models.Announcement.is_active == True,  # noqa: E712
+        or_(models.Announcement.start_at.is_(None), models.Announcement.start_at <= now),
+        or_(models.Announcement.end_at.is_(None), models.Announcement.end_at > now),
+    )
+
+
+def _seconds_until_next_boundary(db: Session, now: datetime) -> float:
+    """Seconds until some active announcement starts or ends, capped by settings."""
+    next_start, next_end = (
+        db.query(
+            func.min(case((models.Announcement.start_at > now, models.Announcement.start_at))),
+            func.min(case((models.Announcement.end_at > now, models.Announcement.end_at))),
+        )
+        .filter(models.Announcement.is_active == True)  # noqa: E712
+        .one()
+    )
+    ttl = float(settings.announcements_cache_max_seconds)
+    for boundary in (next_start, next_end):
+        if boundary is not None:
+            ttl = min(ttl, (boundary - now).total_seconds())
+    return ttl
+
+
 @router.get("/", response_model=List[AnnouncementRead])
 def list_announcements(
     skip: int = 0,
     limit: int = 100,
     is_active: Optional[bool] = True,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
 ):
     q = db.query(models.Announcement)
     if is_active is not None:
@@ -25,8 +64,31 @@ def list_announcements(
     return q.order_by(models.Announcement.created_at.desc()).offset(skip).limit(limit).all()
 
 
+@router.get("/visible", response_model=List[AnnouncementRead])
+def list_visible_announcements(db: Session = Depends(get_db_session)):
+    """Active announcements whose [start_at, end_at) window contains the current time.
+
+    Reads the primary: a lagging replica right after an invalidating write would put
+    the old list back into VISIBLE_CACHE for minutes. Cache hits never touch either.
+    """
+    cached = VISIBLE_CACHE.get("visible")
+    if cached is not None:
+        return cached
+
+    now = datetime.utcnow()
+    rows = (
+        db.query(models.Announcement)
+        .filter(_visible_filter(now))
+        .order_by(models.Announcement.created_at.desc())
+        .all()
+    )
+    result = [AnnouncementRead.model_validate(a) for a in rows]
+    VISIBLE_CACHE.set("visible", result, _seconds_until_next_boundary(db, now))
+    return result
+
+
 @router.get("/{announcement_id}", response_model=AnnouncementRead)
-def get_announcement(announcement_id: int, db: Session = Depends(get_db_session)):
+def get_announcement(announcement_id: int, db: Session = Depends(get_read_db_session)):
     a = db.query(models.Announcement).filter(models.Announcement.id == announcement_id).first()
     if not a:
         raise HTTPException(status_code=404, detail="Announcement not found")
@@ -38,6 +100,7 @@ def create_announcement(payload: AnnouncementCreate, db: Session = Depends(get_d
     a = models.Announcement(**payload.dict())
     db.add(a)
     db.commit()
+    publish_invalidation("announcements")
     db.refresh(a)
     return a
 
@@ -51,6 +114,7 @@ def update_announcement(announcement_id: int, payload: AnnouncementUpdate, db: S
     for k, v in data.items():
         setattr(a, k, v)
     db.commit()
+    publish_invalidation("announcements")
     db.refresh(a)
     return a
 
@@ -63,4 +127,5 @@ def delete_announcement(announcement_id: int, db: Session = Depends(get_db_sessi
     # Soft delete
     a.is_active = False
     db.commit()
+    publish_invalidation("announcements")
     return {"message": "Announcement deactivated"}
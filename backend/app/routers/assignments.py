@@ -1,17 +1,75 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, joinedload, undefer
+from sqlalchemy import and_, func, tuple_
 from typing import List, Optional
 from datetime import datetime
-from ..db import get_db_session
+from ..db import get_db_session, get_read_db_session
+from ..fragments import ASSIGNMENT_FRAGMENT, SUBMISSION_SUMMARY_ROW, fragment_list_response
 from .. import models
+from ..lookup import check_batch_size, in_request_order, parse_id_list
+from ..tombstones import record_deletion
+from .calendar import invalidate_calendar_feeds
+from .reports import invalidate_missing_report
 from ..schemas import (
     AssignmentCreate, AssignmentUpdate, AssignmentRead,
-    SubmissionCreate, SubmissionRead, SubmissionUpdate
+    SubmissionCreate, SubmissionRead, SubmissionUpdate,
+    SubmissionSummary, SubmissionContent, GradingQueuePage,
+    BatchIdsRequest,
 )
 
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
+# Shared by the list and batch endpoints
+ASSIGNMENT_LOAD_OPTIONS = (
+    joinedload(models.Assignment.course).joinedload(models.Course.teacher),
+)
+SUBMISSION_LOAD_OPTIONS = (
+    joinedload(models.Submission.student),
+    joinedload(models.Submission.assignment)
+    .joinedload(models.Assignment.course)
+    .joinedload(models.Course.teacher),
+)
+
+
+def attach_submission_counts(db: Session, assignments: List[models.Assignment]) -> None:
+    """Set submission_count with one grouped query instead of loading every submission."""
+    ids = [a.id for a in assignments]
+    if not ids:
+        return
+    counts = dict(
+        db.query(models.Submission.assignment_id, func.count(models.Submission.id))
+        .filter(models.Submission.assignment_id.in_(ids))
+        .group_by(models.Submission.assignment_id)
+        .all()
+    )
+    for assignment in assignments:
+        assignment.submission_count = counts.get(assignment.id, 0)
+
+
+def _assignments_by_ids(db: Session, ids: List[int]) -> List[Optional[models.Assignment]]:
+    rows = []
+    if ids:
+        rows = (
+            db.query(models.Assignment)
+            .options(*ASSIGNMENT_LOAD_OPTIONS)
+            .filter(models.Assignment.id.in_(set(ids)))
+            .all()
+        )
+        attach_submission_counts(db, rows)
+    return in_request_order(ids, rows)
+
+
+def _submissions_by_ids(db: Session, ids: List[int]) -> List[Optional[models.Submission]]:
+    rows = []
+    if ids:
+        rows = (
+            db.query(models.Submission)
+            .options(*SUBMISSION_LOAD_OPTIONS)
+            .filter(models.Submission.id.in_(set(ids)))
+            .all()
+        )
+    return in_request_order(ids, rows)
+
 
 # Assignment endpoints
 @router.get("/", response_model=List[AssignmentRead])
@@ -20,10 +78,14 @@ def get_assignments(
     limit: int = 100,
     course_id: Optional[int] = None,
     is_active: Optional[bool] = True,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """Get all assignments with optional filtering."""
-    query = db.query(models.Assignment).filter(models.Assignment.is_active == is_active)
+    query = (
+        db.query(models.Assignment)
+        .options(*ASSIGNMENT_LOAD_OPTIONS)
+        .filter(models.Assignment.is_active == is_active)
+    )
 
     if course_id:
         query = query.filter(models.Assignment.course_id == course_id)
@@ -31,14 +93,67 @@ def get_assignments(
     assignments = query.offset(skip).limit(limit).all()
 
     # Add submission counts
-    for assignment in assignments:
-        assignment.submission_count = len(assignment.submissions)
+    attach_submission_counts(db, assignments)
+
+    return fragment_list_response(ASSIGNMENT_FRAGMENT, assignments)
+
+
+@router.get("/batch", response_model=List[Optional[AssignmentRead]])
+def get_assignments_batch(
+    ids: str = Query(..., description="Comma separated assignment ids"),
+    db: Session = Depends(get_read_db_session)
+):
+    """Get several assignments by ID in one query. Results follow the request order; misses are null."""
+    return _assignments_by_ids(db, parse_id_list(ids))
+
+
+@router.post("/batch", response_model=List[Optional[AssignmentRead]])
+def post_assignments_batch(payload: BatchIdsRequest, db: Session = Depends(get_read_db_session)):
+    """Same as GET /assignments/batch, for id lists too long for a query string."""
+    return _assignments_by_ids(db, check_batch_size(payload.ids))
+
+
+@router.get("/grading-queue", response_model=GradingQueuePage)
+def grading_queue(
+    teacher_id: int,
+    course_id: Optional[int] = None,
+    after_submitted_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db_session)
+):
+    """Ungraded submissions across the teacher's active courses, oldest first.
+
+    Keyset paginated on (submitted_at, id) and served by the partial index on
+    ungraded submissions.
+    """
+    query = (
+        db.query(models.Submission)
+        .options(*SUBMISSION_LOAD_OPTIONS)
+        .join(models.Assignment, models.Assignment.id == models.Submission.assignment_id)
+        .join(models.Course, models.Course.id == models.Assignment.course_id)
+        .filter(models.Submission.score.is_(None))
+        .filter(models.Course.teacher_id == teacher_id)
+        .filter(models.Course.is_active == True)  # noqa: E712
+        .filter(models.Assignment.is_active == True)  # noqa: E712
+    )
+    if course_id is not None:
+        query = query.filter(models.Course.id == course_id)
+    if after_submitted_at is not None and after_id is not None:
+        query = query.filter(
+            tuple_(models.Submission.submitted_at, models.Submission.id) > tuple_(after_submitted_at, after_id)
+        )
 
-    return assignments
+    rows = query.order_by(models.Submission.submitted_at, models.Submission.id).limit(limit + 1).all()
+    page = GradingQueuePage(items=rows[:limit])
+    if len(rows) > limit:
+        page.next_after_submitted_at = rows[limit - 1].submitted_at
+        page.next_after_id = rows[limit - 1].id
+    return page
 
 
 @router.get("/{assignment_id}", response_model=AssignmentRead)
-def get_assignment(assignment_id: int, db: Session = Depends(get_db_session)):
+def get_assignment(assignment_id: int, db: Session = Depends(get_read_db_session)):
     """Get a specific assignment by ID."""
     assignment = db.query(models.Assignment).filter(
         models.Assignment.id == assignment_id
@@ -62,6 +177,8 @@ def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db
     db_assignment = models.Assignment(**assignment.dict())
     db.add(db_assignment)
     db.commit()
+    invalidate_missing_report(assignment.course_id)
+    invalidate_calendar_feeds()
     db.refresh(db_assignment)
 
     db_assignment.submission_count = 0
@@ -88,6 +205,8 @@ def update_assignment(
         setattr(assignment, field, value)
 
     db.commit()
+    invalidate_missing_report(assignment.course_id)
+    invalidate_calendar_feeds()
     db.refresh(assignment)
 
     assignment.submission_count = len(assignment.submissions)
@@ -106,18 +225,20 @@ def delete_assignment(assignment_id: int, db: Session = Depends(get_db_session))
 
     assignment.is_active = False
     db.commit()
+    invalidate_missing_report(assignment.course_id)
+    invalidate_calendar_feeds()
 
     return {"message": "Assignment deactivated successfully"}
 
 
 # Submission endpoints
-@router.get("/submissions/", response_model=List[SubmissionRead])
+@router.get("/submissions/", response_model=List[SubmissionSummary])
 def get_submissions(
     skip: int = 0,
     limit: int = 100,
     assignment_id: Optional[str] = None,
     student_id: Optional[str] = None,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """Get all submissions with optional filtering."""
     # Coerce potentially empty string query params to proper types
@@ -136,7 +257,7 @@ def get_submissions(
         except (TypeError, ValueError):
             raise HTTPException(status_code=422, detail="student_id debe ser un entero válido")
 
-    query = db.query(models.Submission)
+    query = db.query(models.Submission).options(*SUBMISSION_LOAD_OPTIONS)
 
     if assignment_id_int is not None:
         query = query.filter(models.Submission.assignment_id == assignment_id_int)
@@ -145,21 +266,52 @@ def get_submissions(
         query = query.filter(models.Submission.student_id == student_id_int)
 
     submissions = query.offset(skip).limit(limit).all()
-    return submissions
+    return fragment_list_response(SUBMISSION_SUMMARY_ROW, submissions)
 
 
-@router.get("/submissions/{submission_id}", response_model=SubmissionRead)
-def get_submission(submission_id: int, db: Session = Depends(get_db_session)):
-    """Get a specific submission by ID."""
-    submission = db.query(models.Submission).filter(
-        models.Submission.id == submission_id
-    ).first()
+@router.get("/submissions/batch", response_model=List[Optional[SubmissionSummary]])
+def get_submissions_batch(
+    ids: str = Query(..., description="Comma separated submission ids"),
+    db: Session = Depends(get_read_db_session)
+):
+    """Get several submissions (without bodies) by ID in one query. Misses are null."""
+    return _submissions_by_ids(db, parse_id_list(ids))
+
+
+@router.post("/submissions/batch", response_model=List[Optional[SubmissionSummary]])
+def post_submissions_batch(payload: BatchIdsRequest, db: Session = Depends(get_read_db_session)):
+    """Same as GET /assignments/submissions/batch, for id lists too long for a query string."""
+    return _submissions_by_ids(db, check_batch_size(payload.ids))
+
+
+def _get_submission_with_body(db: Session, submission_id: int) -> models.Submission:
+    submission = (
+        db.query(models.Submission)
+        .options(
+            undefer(models.Submission._content),
+            undefer(models.Submission.feedback),
+            joinedload(models.Submission.body),
+        )
+        .filter(models.Submission.id == submission_id)
+        .first()
+    )
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
-
     return submission
 
 
+@router.get("/submissions/{submission_id}", response_model=SubmissionRead)
+def get_submission(submission_id: int, db: Session = Depends(get_read_db_session)):
+    """Get a specific submission by ID."""
+    return _get_submission_with_body(db, submission_id)
+
+
+@router.get("/submissions/{submission_id}/body", response_model=SubmissionContent)
+def get_submission_body(submission_id: int, db: Session = Depends(get_read_db_session)):
+    """Get only the content and feedback of a submission."""
+    return _get_submission_with_body(db, submission_id)
+
+
 @router.post("/submissions/", response_model=SubmissionRead)
 def create_submission(submission: SubmissionCreate, db: Session = Depends(get_db_session)):
     """Create a new submission."""
@@ -188,6 +340,7 @@ def create_submission(submission: SubmissionCreate, db: Session = Depends(get_db
     db_submission = models.Submission(**submission.dict())
     db.add(db_submission)
     db.commit()
+    invalidate_missing_report(assignment.course_id)
     db.refresh(db_submission)
 
     return db_submission
@@ -226,7 +379,10 @@ def delete_submission(submission_id: int, db: Session = Depends(get_db_session))
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
 
+    course_id = submission.assignment.course_id
+    record_deletion(db, "submission", submission.id, submission.student_id)
     db.delete(submission)
     db.commit()
+    invalidate_missing_report(course_id)
 
     return {"message": "Submission deleted successfully"}
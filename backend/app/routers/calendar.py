@@ -0,0 +1,165 @@
+import hashlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..cache import TTLCache, on_invalidate, publish_invalidation
+from ..config import settings
+from ..db import get_db_session
+from .. import models
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+# user_id -> (etag, rendered feed bytes)
+ICS_CACHE = TTLCache(max_entries=settings.calendar_cache_max_entries)
+# user_id -> current etag, so polls answered with 304 do not reach the database.
+# Dropped on enrollment, assignment and course writes, in every worker.
+FEED_VERSION_CACHE = TTLCache(max_entries=settings.calendar_cache_max_entries)
+
+
+@on_invalidate("calendar")
+def _forget_feed_versions(user_ids: Optional[List[int]]) -> None:
+    if user_ids is None:
+        FEED_VERSION_CACHE.invalidate()
+    else:
+        for user_id in user_ids:
+            FEED_VERSION_CACHE.invalidate(user_id)
+
+
+def invalidate_calendar_feeds(user_ids: Optional[List[int]] = None) -> None:
+    """Forget cached feed versions of these students (everyone when None), in every worker."""
+    publish_invalidation("calendar", user_ids)
+
+
+def _feed_version(db: Session, user_id: int) -> str:
+    """Fingerprint of everything the feed is built from, computed in one aggregate query."""
+    row = (
+        db.query(
+            func.count(func.distinct(models.Enrollment.id)),
+            func.coalesce(func.sum(func.distinct(models.Enrollment.id)), 0),
+            func.max(models.Course.updated_at),
+            func.count(models.Assignment.id),
+            func.max(models.Assignment.updated_at),
+        )
+        .select_from(models.Enrollment)
+        .join(models.Course, models.Course.id == models.Enrollment.course_id)
+        .outerjoin(models.Assignment, models.Assignment.course_id == models.Enrollment.course_id)
+        .filter(models.Enrollment.student_id == user_id)
+        .one()
+    )
+    raw = f"{user_id}:" + ":".join("" if v is None else str(v) for v in row)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold content lines longer than 75 octets as required by RFC 5545."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts: List[str] = []
+    current = ""
+    limit = 75
+    for ch in line:
+        if len((current + ch).encode("utf-8")) > limit:
+            parts.append(current)
+            current = ""
+            limit = 74  # continuation lines start with a space
+        current += ch
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _render(rows, now: datetime) -> Iterator[str]:
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//Semillero Digital//Deadlines//ES\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield _fold("X-WR-CALNAME:Entregas Semillero Digital")
+    for assignment, course_name in rows:
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:assignment-{assignment.id}@semillero-digital",
+            f"DTSTAMP:{_ics_time(assignment.updated_at or now)}",
+            f"DTSTART:{_ics_time(assignment.due_date)}",
+            f"DTEND:{_ics_time(assignment.due_date)}",
+            f"SUMMARY:{_escape(f'{assignment.title} ({course_name})')}",
+        ]
+        if assignment.description:
+            lines.append(f"DESCRIPTION:{_escape(assignment.description)}")
+        lines.append("END:VEVENT")
+        yield "".join(_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
+
+
+def _stream_and_cache(user_id: int, etag: str, rows, now: datetime) -> Iterator[bytes]:
+    chunks: List[bytes] = []
+    for chunk in _render(rows, now):
+        data = chunk.encode("utf-8")
+        chunks.append(data)
+        yield data
+    ICS_CACHE.set(user_id, (etag, b"".join(chunks)), settings.calendar_cache_seconds)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison: compressed responses carry the same tag as W/"..."
+    return header.strip() == "*" or etag in [v.strip().removeprefix("W/") for v in header.split(",")]
+
+
+@router.get("/users/{user_id}/deadlines.ics")
+def user_deadlines_feed(user_id: int, request: Request, db: Session = Depends(get_db_session)):
+    """iCalendar feed with the due dates of active assignments in the user's enrolled courses.
+
+    Uses the primary: a version read from a lagging replica would stay cached after
+    the invalidation that was meant to replace it.
+    """
+    etag = FEED_VERSION_CACHE.get(user_id)
+    if etag is None:
+        etag = _feed_version(db, user_id)
+        FEED_VERSION_CACHE.set(user_id, etag, settings.calendar_cache_seconds)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    cached = ICS_CACHE.get(user_id)
+    if cached is not None and cached[0] == etag:
+        return Response(content=cached[1], media_type=ICS_MEDIA_TYPE, headers=headers)
+
+    rows = (
+        db.query(models.Assignment, models.Course.name)
+        .join(models.Course, models.Course.id == models.Assignment.course_id)
+        .join(models.Enrollment, models.Enrollment.course_id == models.Assignment.course_id)
+        .filter(models.Enrollment.student_id == user_id)
+        .filter(models.Course.is_active == True)  # noqa: E712
+        .filter(models.Assignment.is_active == True)  # noqa: E712
+        .filter(models.Assignment.due_date.isnot(None))
+        .order_by(models.Assignment.due_date)
+        .all()
+    )
+    return StreamingResponse(
+        _stream_and_cache(user_id, etag, rows, datetime.utcnow()),
+        media_type=ICS_MEDIA_TYPE,
+        headers=headers,
+    )
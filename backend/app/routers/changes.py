@@ -0,0 +1,114 @@
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from ..config import settings
+from ..db import get_db_session
+from .. import models
+from ..schemas import ChangeFeed, DeletedRef
+from .assignments import ASSIGNMENT_LOAD_OPTIONS, SUBMISSION_LOAD_OPTIONS, attach_submission_counts
+from .courses import COURSE_LOAD_OPTIONS, attach_course_counts
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+# (updated_at or deleted_at, id) of the last row sent for an entity that hit the limit
+Position = Tuple[datetime, int]
+
+ENROLLMENT_LOAD_OPTIONS = (
+    joinedload(models.Enrollment.student),
+    joinedload(models.Enrollment.course).joinedload(models.Course.teacher),
+)
+
+
+def _encode_cursor(watermark: datetime, after: Dict[str, Position]) -> str:
+    state = {"w": watermark.isoformat(), "a": {name: [ts.isoformat(), row_id] for name, (ts, row_id) in after.items()}}
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(raw: str) -> Tuple[datetime, Dict[str, Position]]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(raw.encode()))
+        after = {name: (datetime.fromisoformat(ts), int(row_id)) for name, (ts, row_id) in state["a"].items()}
+        return datetime.fromisoformat(state["w"]), after
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+@router.get("/", response_model=ChangeFeed)
+def get_changes(
+    since: Optional[datetime] = Query(None, description="Start of the first sync; later calls pass cursor instead"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous call"),
+    user_id: Optional[int] = Query(None, description="Only include this user's notifications"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum rows per entity"),
+    db: Session = Depends(get_db_session),
+):
+    """Everything created, updated, soft-deleted or deleted since the previous call.
+
+    Rows come from `updated_at` (soft deletes show up with is_active=false) and hard
+    deletes from tombstones. Clients patch their local state and pass the returned
+    cursor next time. Each entity is read in (updated_at, id) order and the cursor
+    keeps the position of every entity that hit the limit, so pages advance even
+    when many rows share one timestamp (bulk updates, clones).
+
+    Read from the primary: a lagging replica could be missing rows older than the
+    watermark, and once the cursor has moved past them they would never be sent.
+    """
+    if cursor is not None:
+        since, after = _decode_cursor(cursor)
+    elif since is not None:
+        after = {}
+    else:
+        raise HTTPException(status_code=422, detail="Pass since or cursor")
+
+    # Only rows older than the safety margin are read, so rows from transactions that
+    # commit slightly late are picked up by the next call instead of being skipped
+    until = max(since, datetime.utcnow() - timedelta(seconds=settings.change_feed_safety_seconds))
+    feed = ChangeFeed(watermark=until, cursor="")
+    next_after: Dict[str, Position] = {}
+
+    def page(name, query, model, ts_column):
+        position = after.get(name)
+        if position is not None:
+            query = query.filter(tuple_(ts_column, model.id) > tuple_(*position))
+        else:
+            query = query.filter(ts_column > since)
+        rows = query.filter(ts_column <= until).order_by(ts_column, model.id).limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            feed.has_more = True
+            next_after[name] = (getattr(rows[-1], ts_column.key), rows[-1].id)
+        return rows
+
+    def changed(name, model, *options, extra_filter=None):
+        q = db.query(model).options(*options)
+        if extra_filter is not None:
+            q = q.filter(extra_filter)
+        return page(name, q, model, model.updated_at)
+
+    courses = changed("courses", models.Course, *COURSE_LOAD_OPTIONS)
+    attach_course_counts(db, courses)
+    assignments = changed("assignments", models.Assignment, *ASSIGNMENT_LOAD_OPTIONS)
+    attach_submission_counts(db, assignments)
+
+    feed.courses = courses
+    feed.assignments = assignments
+    feed.enrollments = changed("enrollments", models.Enrollment, *ENROLLMENT_LOAD_OPTIONS)
+    feed.submissions = changed("submissions", models.Submission, *SUBMISSION_LOAD_OPTIONS)
+    feed.announcements = changed("announcements", models.Announcement)
+    feed.notifications = changed(
+        "notifications",
+        models.Notification,
+        extra_filter=(models.Notification.user_id == user_id) if user_id is not None else None,
+    )
+
+    t = models.Tombstone
+    tombstones = db.query(t)
+    if user_id is not None:
+        tombstones = tombstones.filter((t.entity != "notification") | (t.user_id == user_id))
+    rows: List[models.Tombstone] = page("deleted", tombstones, t, t.deleted_at)
+    feed.deleted = [DeletedRef(entity=r.entity, id=r.entity_id, deleted_at=r.deleted_at) for r in rows]
+    feed.cursor = _encode_cursor(until, next_after)
+    return feed
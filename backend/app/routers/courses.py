@@ -1,17 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, delete, exists, func, insert, literal, select, union_all
 from typing import List, Optional
-from ..db import get_db_session
+from datetime import datetime
+from ..db import get_db_session, get_read_db_session
+from ..fragments import COURSE_FRAGMENT, fragment_list_response
 from .. import models
+from ..lookup import check_batch_size, in_request_order, parse_id_list
+from ..tombstones import record_deletions_from
+from .calendar import invalidate_calendar_feeds
+from .reports import invalidate_missing_report
 from ..schemas import (
     CourseCreate, CourseUpdate, CourseRead,
     EnrollmentCreate, EnrollmentRead,
-    AssignmentCreate, AssignmentUpdate, AssignmentRead
+    AssignmentCreate, AssignmentUpdate, AssignmentRead,
+    BatchIdsRequest,
+    RosterUpdate, RosterResult,
+    CourseCloneRequest, CourseCloneResult,
 )
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+# Shared by the list and batch endpoints
+COURSE_LOAD_OPTIONS = (joinedload(models.Course.teacher),)
+
+
+def attach_course_counts(db: Session, courses: List[models.Course]) -> None:
+    """Set enrollment_count/assignment_count with two grouped queries instead of loading collections."""
+    ids = [c.id for c in courses]
+    if not ids:
+        return
+    enrollment_counts = dict(
+        db.query(models.Enrollment.course_id, func.count(models.Enrollment.id))
+        .filter(models.Enrollment.course_id.in_(ids))
+        .group_by(models.Enrollment.course_id)
+        .all()
+    )
+    assignment_counts = dict(
+        db.query(models.Assignment.course_id, func.count(models.Assignment.id))
+        .filter(models.Assignment.course_id.in_(ids))
+        .group_by(models.Assignment.course_id)
+        .all()
+    )
+    for course in courses:
+        course.enrollment_count = enrollment_counts.get(course.id, 0)
+        course.assignment_count = assignment_counts.get(course.id, 0)
+
+
+def _courses_by_ids(db: Session, ids: List[int]) -> List[Optional[models.Course]]:
+    rows = []
+    if ids:
+        rows = (
+            db.query(models.Course)
+            .options(*COURSE_LOAD_OPTIONS)
+            .filter(models.Course.id.in_(set(ids)))
+            .all()
+        )
+        attach_course_counts(db, rows)
+    return in_request_order(ids, rows)
+
+
+def _shift_days(db: Session, column, days: int):
+    if days == 0:
+        return column
+    if db.get_bind().dialect.name == "sqlite":
+        return func.datetime(column, f"{days:+d} days", type_=column.type)
+    return column + func.make_interval(0, 0, 0, days)
+
 
 # Course endpoints
 @router.get("/", response_model=List[CourseRead])
@@ -20,10 +75,14 @@ def get_courses(
     limit: int = 100,
     teacher_id: Optional[int] = None,
     is_active: Optional[bool] = True,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """Get all courses with optional filtering."""
-    query = db.query(models.Course).filter(models.Course.is_active == is_active)
+    query = (
+        db.query(models.Course)
+        .options(*COURSE_LOAD_OPTIONS)
+        .filter(models.Course.is_active == is_active)
+    )
 
     if teacher_id:
         query = query.filter(models.Course.teacher_id == teacher_id)
@@ -31,15 +90,101 @@ def get_courses(
     courses = query.offset(skip).limit(limit).all()
 
     # Add enrollment and assignment counts
-    for course in courses:
-        course.enrollment_count = len(course.enrollments)
-        course.assignment_count = len(course.assignments)
+    attach_course_counts(db, courses)
+
+    return fragment_list_response(COURSE_FRAGMENT, courses)
+
+
+@router.get("/batch", response_model=List[Optional[CourseRead]])
+def get_courses_batch(
+    ids: str = Query(..., description="Comma separated course ids"),
+    db: Session = Depends(get_read_db_session)
+):
+    """Get several courses by ID in one query. Results follow the request order; misses are null."""
+    return _courses_by_ids(db, parse_id_list(ids))
+
 
-    return courses
+@router.post("/batch", response_model=List[Optional[CourseRead]])
+def post_courses_batch(payload: BatchIdsRequest, db: Session = Depends(get_read_db_session)):
+    """Same as GET /courses/batch, for id lists too long for a query string."""
+    return _courses_by_ids(db, check_batch_size(payload.ids))
+
+
+@router.post("/clone", response_model=List[CourseCloneResult])
+def clone_courses(payload: CourseCloneRequest, db: Session = Depends(get_db_session)):
+    """Copy courses and their active assignments for a new term.
+
+    One multi-row INSERT for the courses and one INSERT ... SELECT for the assignments,
+    whatever the number of courses, in one transaction.
+    Enrollments and submissions are not copied.
+    """
+    source_ids = sorted(set(check_batch_size(payload.course_ids)))
+    if not source_ids:
+        return []
+    c, a = models.Course, models.Assignment
+    active_counts = (
+        select(a.course_id, func.count(a.id).label("n"))
+        .where(a.is_active == True)  # noqa: E712
+        .group_by(a.course_id)
+        .subquery()
+    )
+    sources = {
+        row.id: row
+        for row in db.execute(
+            select(c.id, c.name, c.description, c.teacher_id, func.coalesce(active_counts.c.n, 0).label("assignments"))
+            .outerjoin(active_counts, active_counts.c.course_id == c.id)
+            .where(c.id.in_(source_ids))
+        )
+    }
+    missing = [i for i in source_ids if i not in sources]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Courses not found: {missing}")
+    if payload.teacher_id is not None and db.get(models.User, payload.teacher_id) is None:
+        raise HTTPException(status_code=404, detail="Teacher not found")
+
+    now = datetime.utcnow()
+    new_courses = [
+        {
+            "name": sources[i].name + payload.name_suffix,
+            "description": sources[i].description,
+            "teacher_id": payload.teacher_id if payload.teacher_id is not None else sources[i].teacher_id,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in source_ids
+    ]
+    # sort_by_parameter_order returns the new ids in the order of new_courses, whatever
+    # order the database hands out serial values in
+    new_ids = db.scalars(insert(c).returning(c.id, sort_by_parameter_order=True), new_courses).all()
+    mapping = dict(zip(source_ids, new_ids))
+
+    assignment_source = select(
+        a.title,
+        a.description,
+        case(mapping, value=a.course_id),
+        _shift_days(db, a.due_date, payload.due_date_offset_days),
+        a.max_score,
+        literal(True, a.is_active.type),
+        literal(now, a.created_at.type),
+        literal(now, a.updated_at.type),
+    ).where(a.course_id.in_(source_ids), a.is_active == True)  # noqa: E712
+    db.execute(
+        insert(a).from_select(
+            ["title", "description", "course_id", "due_date", "max_score", "is_active", "created_at", "updated_at"],
+            assignment_source,
+        )
+    )
+    db.commit()
+
+    return [
+        CourseCloneResult(source_course_id=i, course_id=mapping[i], assignments=sources[i].assignments)
+        for i in source_ids
+    ]
 
 
 @router.get("/{course_id}", response_model=CourseRead)
-def get_course(course_id: int, db: Session = Depends(get_db_session)):
+def get_course(course_id: int, db: Session = Depends(get_read_db_session)):
     """Get a specific course by ID."""
     course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if not course:
@@ -106,6 +251,7 @@ def update_course(
         setattr(course, field, value)
 
     db.commit()
+    invalidate_calendar_feeds()
     db.refresh(course)
 
     course.enrollment_count = len(course.enrollments)
@@ -123,5 +269,73 @@ def delete_course(course_id: int, db: Session = Depends(get_db_session)):
 
     course.is_active = False
     db.commit()
+    invalidate_calendar_feeds()
 
     return {"message": "Course deactivated successfully"}
+
+
+def _roster_diff(db: Session, course_id: int, desired: set):
+    """Course existence and the roster diff in one round trip.
+
+    Rows are (kind, student_id, enrollment_id) with kind one of "course" (the course
+    exists), "keep", "remove" (current enrollments) or "add" (existing users in the
+    desired set who are not enrolled yet).
+    """
+    e, u = models.Enrollment, models.User
+    course_row = select(literal("course"), models.Course.id, literal(None)).where(models.Course.id == course_id)
+    current = select(
+        case((e.student_id.in_(desired), "keep"), else_="remove") if desired else literal("remove"),
+        e.student_id,
+        e.id,
+    ).where(e.course_id == course_id)
+    parts = [course_row, current]
+    if desired:
+        already = exists().where(e.course_id == course_id, e.student_id == u.id)
+        parts.append(select(literal("add"), u.id, literal(None)).where(u.id.in_(desired), ~already))
+    return db.execute(union_all(*parts)).all()
+
+
+@router.put("/{course_id}/roster", response_model=RosterResult)
+def reconcile_roster(course_id: int, payload: RosterUpdate, db: Session = Depends(get_db_session)):
+    """Make the course's enrollments match `student_ids`, inserting and deleting only the difference."""
+    desired = set(payload.student_ids)
+    rows = _roster_diff(db, course_id, desired)
+    if not any(kind == "course" for kind, _, _ in rows):
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    keep = {student_id for kind, student_id, _ in rows if kind == "keep"}
+    add = [student_id for kind, student_id, _ in rows if kind == "add"]
+    remove = [enrollment_id for kind, _, enrollment_id in rows if kind == "remove"]
+    removed_students = [student_id for kind, student_id, _ in rows if kind == "remove"]
+    unknown = desired - keep - set(add)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Students not found: {sorted(unknown)}")
+    if not add and not remove:
+        return RosterResult(added=0, removed=0, unchanged=len(keep))
+
+    e = models.Enrollment
+    now = datetime.utcnow()
+    added = 0
+    if add:
+        # NOT EXISTS keeps this idempotent if someone enrolled the student since the read
+        source = select(
+            models.User.id,
+            literal(course_id, e.course_id.type),
+            literal(now, e.enrolled_at.type),
+            literal(now, e.updated_at.type),
+        ).where(
+            models.User.id.in_(add),
+            ~exists().where(e.course_id == course_id, e.student_id == models.User.id),
+        )
+        added = db.execute(
+            insert(e).from_select(["student_id", "course_id", "enrolled_at", "updated_at"], source)
+        ).rowcount
+    removed = 0
+    if remove:
+        record_deletions_from(db, "enrollment", select(e.id, e.student_id).where(e.id.in_(remove)))
+        removed = db.execute(delete(e).where(e.id.in_(remove))).rowcount
+    db.commit()
+    invalidate_missing_report(course_id)
+    invalidate_calendar_feeds(add + removed_students)
+
+    return RosterResult(added=added, removed=removed, unchanged=len(keep))
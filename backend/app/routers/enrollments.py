@@ -2,9 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List
-from ..db import get_db_session
+from ..db import get_db_session, get_read_db_session
+from ..fragments import ENROLLMENT_ROW, fragment_list_response
 from .. import models
 from ..schemas import EnrollmentCreate, EnrollmentRead
+from ..tombstones import record_deletion
+from .calendar import invalidate_calendar_feeds
+from .reports import invalidate_missing_report
 
 router = APIRouter(prefix="/enrollments", tags=["enrollments"])
 
@@ -15,7 +19,7 @@ def get_enrollments(
     limit: int = 100,
     student_id: int = None,
     course_id: int = None,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_read_db_session)
 ):
     """Get all enrollments with optional filtering."""
     query = db.query(models.Enrollment)
@@ -27,11 +31,11 @@ def get_enrollments(
         query = query.filter(models.Enrollment.course_id == course_id)
 
     enrollments = query.offset(skip).limit(limit).all()
-    return enrollments
+    return fragment_list_response(ENROLLMENT_ROW, enrollments)
 
 
 @router.get("/{enrollment_id}", response_model=EnrollmentRead)
-def get_enrollment(enrollment_id: int, db: Session = Depends(get_db_session)):
+def get_enrollment(enrollment_id: int, db: Session = Depends(get_read_db_session)):
     """Get a specific enrollment by ID."""
     enrollment = db.query(models.Enrollment).filter(
         models.Enrollment.id == enrollment_id
@@ -68,6 +72,8 @@ def create_enrollment(enrollment: EnrollmentCreate, db: Session = Depends(get_db
     db_enrollment = models.Enrollment(**enrollment.dict())
     db.add(db_enrollment)
     db.commit()
+    invalidate_missing_report(enrollment.course_id)
+    invalidate_calendar_feeds([enrollment.student_id])
     db.refresh(db_enrollment)
 
     return db_enrollment
@@ -82,7 +88,11 @@ def delete_enrollment(enrollment_id: int, db: Session = Depends(get_db_session))
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
 
+    course_id, student_id = enrollment.course_id, enrollment.student_id
+    record_deletion(db, "enrollment", enrollment.id, enrollment.student_id)
     db.delete(enrollment)
     db.commit()
+    invalidate_missing_report(course_id)
+    invalidate_calendar_feeds([student_id])
 
     return {"message": "Student unenrolled successfully"}
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from ..db import get_db_session, get_read_db_session
+from .. import models, tasks  # noqa: F401  (tasks registers the built-in handlers)
+from ..jobs import HANDLERS, enqueue
+from ..schemas import JobCreate, JobRead
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/", response_model=List[JobRead])
+def list_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    db: Session = Depends(get_read_db_session),
+):
+    q = db.query(models.Job)
+    if status is not None:
+        q = q.filter(models.Job.status == status)
+    if kind is not None:
+        q = q.filter(models.Job.kind == kind)
+    return q.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(job_id: int, db: Session = Depends(get_read_db_session)):
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/", response_model=JobRead, status_code=202)
+def create_job(payload: JobCreate, db: Session = Depends(get_db_session)):
+    if payload.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {payload.kind}")
+    job = enqueue(db, payload.kind, payload.payload, payload.run_at, payload.max_attempts)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=JobRead)
+def retry_job(job_id: int, db: Session = Depends(get_db_session)):
+    """Put a failed job back in the queue."""
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=400, detail="Only failed jobs can be retried")
+    job.status = "queued"
+    job.attempts = 0
+    # run_at still holds the last backoff; a manual retry should not wait for it
+    job.run_at = datetime.utcnow()
+    db.commit()
+    db.refresh(job)
+    return job
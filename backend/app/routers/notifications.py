@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from itertools import groupby
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime, timedelta
-from ..db import get_db_session
+from ..db import ReadSessionLocal, SessionLocal, get_db_session, get_engine, get_read_db_session, mark_replica_down
 from .. import models
+from ..batching import get_notification_batcher
+from ..config import settings
+from ..jobs import enqueue
+from ..lookup import check_batch_size, in_request_order, parse_id_list
+from ..tombstones import record_deletion, record_deletions_from
 from ..schemas import (
+    BatchIdsRequest,
     NotificationCreate,
     NotificationUpdate,
     NotificationRead,
     MarkReadRequest,
+    BulkMarkReadRequest,
+    BulkDeleteRequest,
+    BulkResult,
+    JobRead,
+    NotificationFanoutRequest,
 )
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -21,7 +38,7 @@ def list_notifications(
     user_id: Optional[int] = None,
     is_read: Optional[bool] = None,
     category: Optional[str] = None,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
 ):
     q = db.query(models.Notification)
     if user_id is not None:
@@ -33,8 +50,91 @@ def list_notifications(
     return q.order_by(models.Notification.created_at.desc()).offset(skip).limit(limit).all()
 
 
+def _bulk_query(db: Session, user_id: int, ids: Optional[List[int]], category: Optional[str]):
+    q = db.query(models.Notification).filter(models.Notification.user_id == user_id)
+    if ids is not None:
+        q = q.filter(models.Notification.id.in_(ids))
+    if category is not None:
+        q = q.filter(models.Notification.category == category)
+    return q
+
+
+@router.patch("/bulk/read", response_model=BulkResult)
+def bulk_mark_read(payload: BulkMarkReadRequest, db: Session = Depends(get_db_session)):
+    """Mark a user's notifications read/unread with a single UPDATE."""
+    if payload.ids is not None and not payload.ids:
+        return BulkResult(affected=0)
+    affected = (
+        _bulk_query(db, payload.user_id, payload.ids, payload.category)
+        # Rows already in the requested state are left untouched
+        .filter(models.Notification.is_read != payload.is_read)
+        .update(
+            {models.Notification.is_read: payload.is_read, models.Notification.updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return BulkResult(affected=affected)
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+def bulk_delete(payload: BulkDeleteRequest, db: Session = Depends(get_db_session)):
+    """Delete a user's notifications with a single DELETE."""
+    if payload.ids is not None and not payload.ids:
+        return BulkResult(affected=0)
+    q = _bulk_query(db, payload.user_id, payload.ids, payload.category)
+    if payload.is_read is not None:
+        q = q.filter(models.Notification.is_read == payload.is_read)
+    record_deletions_from(
+        db, "notification", q.with_entities(models.Notification.id, models.Notification.user_id).statement
+    )
+    affected = q.delete(synchronize_session=False)
+    db.commit()
+    return BulkResult(affected=affected)
+
+
+def _notifications_by_ids(db: Session, ids: List[int]) -> List[Optional[models.Notification]]:
+    rows = []
+    if ids:
+        rows = db.query(models.Notification).filter(models.Notification.id.in_(set(ids))).all()
+    return in_request_order(ids, rows)
+
+
+@router.get("/batch", response_model=List[Optional[NotificationRead]])
+def get_notifications_batch(
+    ids: str = Query(..., description="Comma separated notification ids"),
+    db: Session = Depends(get_read_db_session),
+):
+    """Get several notifications by ID in one query. Results follow the request order; misses are null."""
+    return _notifications_by_ids(db, parse_id_list(ids))
+
+
+@router.post("/batch", response_model=List[Optional[NotificationRead]])
+def post_notifications_batch(payload: BatchIdsRequest, db: Session = Depends(get_read_db_session)):
+    """Same as GET /notifications/batch, for id lists too long for a query string."""
+    return _notifications_by_ids(db, check_batch_size(payload.ids))
+
+
+@router.get("/archive", response_model=List[NotificationRead])
+def list_archived_notifications(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db_session),
+):
+    """Notifications moved out of the hot table by the retention job."""
+    return (
+        db.query(models.NotificationArchive)
+        .filter(models.NotificationArchive.user_id == user_id)
+        .order_by(models.NotificationArchive.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
 @router.get("/{notification_id}", response_model=NotificationRead)
-def get_notification(notification_id: int, db: Session = Depends(get_db_session)):
+def get_notification(notification_id: int, db: Session = Depends(get_read_db_session)):
     n = db.query(models.Notification).filter(models.Notification.id == notification_id).first()
     if not n:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -43,6 +143,22 @@ def get_notification(notification_id: int, db: Session = Depends(get_db_session)
 
 @router.post("/", response_model=NotificationRead)
 def create_notification(payload: NotificationCreate, db: Session = Depends(get_db_session)):
+    if settings.notification_batching_enabled:
+        # Group commit: wait for the batcher to write this row together with concurrent ones
+        future = get_notification_batcher().submit(payload.dict())
+        try:
+            try:
+                return future.result(timeout=settings.notification_batch_timeout_seconds)
+            except FutureTimeoutError:
+                if future.cancel():
+                    # Still queued, so nothing was written and a retry cannot duplicate it
+                    raise HTTPException(status_code=503, detail="Notification write timed out")
+                # The batcher is already writing this row; wait for its outcome
+                return future.result()
+        except LookupError:
+            raise HTTPException(status_code=404, detail="User not found")
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Notification conflicts with existing data")
     # Ensure user exists
     u = db.query(models.User).filter(models.User.id == payload.user_id).first()
     if not u:
@@ -54,6 +170,17 @@ def create_notification(payload: NotificationCreate, db: Session = Depends(get_d
     return n
 
 
+@router.post("/fanout", response_model=JobRead, status_code=202)
+def fanout_notification(payload: NotificationFanoutRequest, db: Session = Depends(get_db_session)):
+    """Queue a background job that sends one notification to a course's students and/or a user list."""
+    if payload.course_id is None and not payload.user_ids:
+        raise HTTPException(status_code=400, detail="course_id or user_ids is required")
+    job = enqueue(db, "notifications.fanout", payload.model_dump(mode="json"))
+    db.commit()
+    db.refresh(job)
+    return job
+
+
 @router.put("/{notification_id}", response_model=NotificationRead)
 def update_notification(notification_id: int, payload: NotificationUpdate, db: Session = Depends(get_db_session)):
     n = db.query(models.Notification).filter(models.Notification.id == notification_id).first()
@@ -83,6 +210,7 @@ def delete_notification(notification_id: int, db: Session = Depends(get_db_sessi
     n = db.query(models.Notification).filter(models.Notification.id == notification_id).first()
     if not n:
         raise HTTPException(status_code=404, detail="Notification not found")
+    record_deletion(db, "notification", n.id, n.user_id)
     db.delete(n)
     db.commit()
     return {"message": "Notification deleted"}
@@ -92,7 +220,7 @@ def delete_notification(notification_id: int, db: Session = Depends(get_db_sessi
 def alerts_upcoming(
     user_id: int = Query(..., description="Student user id"),
     within_hours: int = 48,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
 ):
     """
     Generate (non-persistent) upcoming assignment alerts for a student based on enrollments.
@@ -163,7 +291,7 @@ def alerts_upcoming(
 @router.get("/alerts/overdue", response_model=List[NotificationRead])
 def alerts_overdue(
     user_id: int = Query(..., description="Student user id"),
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
 ):
     """
     Generate (non-persistent) overdue assignment alerts for a student based on enrollments.
@@ -208,3 +336,84 @@ def alerts_overdue(
         )
 
     return alerts
+
+
+def _alerts_stream(stmt, now: datetime, read_primary: bool) -> Iterator[bytes]:
+    # The request's dependency session is closed before a streamed body is sent,
+    # so the generator owns its own session for the lifetime of the stream.
+    db = SessionLocal() if read_primary else ReadSessionLocal()
+    try:
+        rows = db.execute(stmt.execution_options(yield_per=500))
+        for user_id, group in groupby(rows, key=lambda row: row.student_id):
+            alerts = []
+            for row in group:
+                overdue = row.due_date < now
+                alerts.append(
+                    NotificationRead(
+                        id=0,
+                        user_id=user_id,
+                        title=f"{'Entrega vencida' if overdue else 'Entrega próxima'}: {row.title}",
+                        content=(row.description or "")[:500],
+                        category="deadline_overdue" if overdue else "deadline",
+                        is_read=False,
+                        related_assignment_id=row.id,
+                        due_date=row.due_date,
+                        created_at=now,
+                        updated_at=now,
+                    ).model_dump(mode="json")
+                )
+            yield (json.dumps({"user_id": user_id, "alerts": alerts}) + "\n").encode("utf-8")
+    except OperationalError:
+        if db.get_bind() is not get_engine():
+            mark_replica_down()
+        raise
+    finally:
+        db.close()
+
+
+@router.get("/alerts/batch")
+def alerts_batch(
+    request: Request,
+    user_ids: Optional[str] = Query(None, description="Comma separated student ids"),
+    course_id: Optional[int] = None,
+    kind: str = Query("all", pattern="^(upcoming|overdue|all)$"),
+    within_hours: int = 48,
+):
+    """
+    Deadline alerts for many students at once, from one enrollments x assignments join.
+    Streams NDJSON: one line per student that has alerts, {"user_id": ..., "alerts": [...]},
+    ordered by user id; each alert has the same shape as /alerts/upcoming and /alerts/overdue.
+    """
+    if user_ids is None and course_id is None:
+        raise HTTPException(status_code=400, detail="user_ids or course_id is required")
+
+    now = datetime.utcnow()
+    until = now + timedelta(hours=within_hours)
+    stmt = (
+        select(
+            models.Enrollment.student_id,
+            models.Assignment.id,
+            models.Assignment.title,
+            models.Assignment.description,
+            models.Assignment.due_date,
+        )
+        .join(models.Assignment, models.Assignment.course_id == models.Enrollment.course_id)
+        .where(models.Assignment.is_active == True)  # noqa: E712
+        .where(models.Assignment.due_date.isnot(None))
+        .order_by(models.Enrollment.student_id, models.Assignment.due_date, models.Assignment.id)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(models.Enrollment.student_id.in_(set(parse_id_list(user_ids))))
+    if course_id is not None:
+        stmt = stmt.where(models.Enrollment.course_id == course_id)
+    if kind == "upcoming":
+        stmt = stmt.where(models.Assignment.due_date >= now, models.Assignment.due_date <= until)
+    elif kind == "overdue":
+        stmt = stmt.where(models.Assignment.due_date < now)
+    else:
+        stmt = stmt.where(models.Assignment.due_date <= until)
+
+    return StreamingResponse(
+        _alerts_stream(stmt, now, bool(request.headers.get("x-read-primary"))),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,257 @@
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, select
+from typing import Iterator, Optional
+from datetime import date, datetime, timedelta
+from ..cache import TTLCache, on_invalidate, publish_invalidation
+from ..config import settings
+from ..db import ReadSessionLocal, SessionLocal, get_db_session, get_engine, get_read_db_session, mark_replica_down
+from .. import models
+from ..rollups import activity_watermark
+from ..schemas import (
+    ActivityPoint,
+    ActivitySeries,
+    MissingSubmission,
+    MissingSubmissionsPage,
+    StudentCourseProgress,
+    StudentProgressPage,
+)
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+# ("assignment" | "course", course_id, assignment_id | None) -> list of missing rows
+MISSING_CACHE = TTLCache(
+    max_entries=settings.missing_report_cache_max_entries, max_weight=settings.missing_report_cache_max_rows
+)
+
+
+@on_invalidate("missing_report")
+def _forget_missing_report(course_id: Optional[int]) -> None:
+    if course_id is None:
+        MISSING_CACHE.invalidate()
+    else:
+        MISSING_CACHE.invalidate_where(lambda key: key[1] == course_id)
+
+
+def invalidate_missing_report(course_id: int) -> None:
+    """Forget cached missing-submission reports for a course and its assignments, in every worker."""
+    publish_invalidation("missing_report", course_id)
+
+
+def _missing_rows(db: Session, course_id: int, assignment_id: Optional[int] = None):
+    """Enrolled students without a submission, as an anti-join of enrollments against submissions."""
+    e, a, s = models.Enrollment, models.Assignment, models.Submission
+    q = (
+        select(a.id, a.title, a.course_id, e.student_id, models.User.email, a.due_date)
+        .select_from(e)
+        .join(a, a.course_id == e.course_id)
+        .join(models.User, models.User.id == e.student_id)
+        .outerjoin(s, and_(s.assignment_id == a.id, s.student_id == e.student_id))
+        .where(e.course_id == course_id, s.id.is_(None))
+    )
+    if assignment_id is not None:
+        q = q.where(a.id == assignment_id)
+    else:
+        q = q.where(a.is_active == True)  # noqa: E712
+    return db.execute(q.order_by(a.id, e.student_id)).all()
+
+
+def _missing_page(rows, overdue_only: bool, skip: int, limit: int) -> MissingSubmissionsPage:
+    now = datetime.utcnow()
+    items = [
+        MissingSubmission(
+            assignment_id=r[0],
+            assignment_title=r[1],
+            course_id=r[2],
+            student_id=r[3],
+            student_email=r[4],
+            due_date=r[5],
+            is_overdue=r[5] is not None and r[5] < now,
+        )
+        for r in rows
+    ]
+    if overdue_only:
+        items = [i for i in items if i.is_overdue]
+    return MissingSubmissionsPage(total=len(items), items=items[skip:skip + limit])
+
+
+def _progress_stream(stmt, limit: int, read_primary: bool) -> Iterator[bytes]:
+    # Same shape as StudentProgressPage, written as the rows arrive; the cursor goes last.
+    # Owns its session because the request's one is closed before the body is sent.
+    db = SessionLocal() if read_primary else ReadSessionLocal()
+    try:
+        yield b'{"items":['
+        students = 0
+        last_student = None
+        first = True
+        result = db.execute(stmt.execution_options(yield_per=1000))
+        for partition in result.partitions():
+            chunk = []
+            for row in partition:
+                if row.student_id != last_student:
+                    students += 1
+                    last_student = row.student_id
+                chunk.append(StudentCourseProgress(**row._mapping).model_dump_json())
+            yield ("" if first else ",").encode() + ",".join(chunk).encode("utf-8")
+            first = False
+        next_after = last_student if students == limit else None
+        yield ('],"next_after_student_id":' + json.dumps(next_after) + "}").encode()
+    except OperationalError:
+        if db.get_bind() is not get_engine():
+            mark_replica_down()
+        raise
+    finally:
+        db.close()
+
+
+@router.get("/progress", response_model=StudentProgressPage)
+def student_progress(
+    request: Request,
+    course_id: Optional[int] = None,
+    after_student_id: int = 0,
+    limit: int = Query(500, ge=1, le=5000, description="Students per page"),
+):
+    """Per student and course: assigned / submitted / graded / late / missing counts and average score.
+
+    Computed with a single grouped query: enrollments joined to the course's active
+    assignments, left-joined to the student's submissions (rows without a submission
+    are the anti-join side). Paginated by student id. The page is streamed as it is
+    read, so memory does not grow with the number of rows.
+    """
+    e, a, s = models.Enrollment, models.Assignment, models.Submission
+    now = datetime.utcnow()
+
+    students = select(e.student_id).where(e.student_id > after_student_id)
+    if course_id is not None:
+        students = students.where(e.course_id == course_id)
+    students = students.group_by(e.student_id).order_by(e.student_id).limit(limit)
+
+    late = and_(s.id.isnot(None), a.due_date.isnot(None), s.submitted_at > a.due_date)
+    missing = and_(a.id.isnot(None), s.id.is_(None), a.due_date.isnot(None), a.due_date < now)
+    q = (
+        select(
+            e.student_id,
+            e.course_id,
+            func.count(a.id).label("assigned"),
+            func.count(s.id).label("submitted"),
+            func.count(s.score).label("graded"),
+            func.coalesce(func.sum(case((late, 1), else_=0)), 0).label("late"),
+            func.coalesce(func.sum(case((missing, 1), else_=0)), 0).label("missing"),
+            func.avg(case((a.max_score > 0, s.score / a.max_score))).label("average_score"),
+        )
+        .select_from(e)
+        .outerjoin(a, and_(a.course_id == e.course_id, a.is_active == True))  # noqa: E712
+        .outerjoin(s, and_(s.assignment_id == a.id, s.student_id == e.student_id))
+        .where(e.student_id.in_(students.scalar_subquery()))
+        .group_by(e.student_id, e.course_id)
+        .order_by(e.student_id, e.course_id)
+    )
+    if course_id is not None:
+        q = q.where(e.course_id == course_id)
+
+    return StreamingResponse(
+        _progress_stream(q, limit, bool(request.headers.get("x-read-primary"))),
+        media_type="application/json",
+    )
+
+
+@router.get("/assignments/{assignment_id}/missing", response_model=MissingSubmissionsPage)
+def assignment_missing_submissions(
+    assignment_id: int,
+    overdue_only: bool = False,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db_session),
+):
+    """Students enrolled in the assignment's course who have not submitted it.
+
+    Reads the primary: right after an invalidation a lagging replica would put the
+    pre-write report back in the cache for missing_report_cache_seconds.
+    """
+    assignment = db.query(models.Assignment).filter(models.Assignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    key = ("assignment", assignment.course_id, assignment_id)
+    rows = MISSING_CACHE.get(key)
+    if rows is None:
+        rows = _missing_rows(db, assignment.course_id, assignment_id)
+        MISSING_CACHE.set(key, rows, settings.missing_report_cache_seconds, weight=max(len(rows), 1))
+    return _missing_page(rows, overdue_only, skip, limit)
+
+
+@router.get("/courses/{course_id}/missing", response_model=MissingSubmissionsPage)
+def course_missing_submissions(
+    course_id: int,
+    overdue_only: bool = False,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db_session),
+):
+    """Missing (student, assignment) pairs across the course's active assignments (read from the primary)."""
+    key = ("course", course_id, None)
+    rows = MISSING_CACHE.get(key)
+    if rows is None:
+        course = db.query(models.Course.id).filter(models.Course.id == course_id).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        rows = _missing_rows(db, course_id)
+        MISSING_CACHE.set(key, rows, settings.missing_report_cache_seconds, weight=max(len(rows), 1))
+    return _missing_page(rows, overdue_only, skip, limit)
+
+
+@router.get("/courses/{course_id}/activity", response_model=ActivitySeries)
+def course_activity(
+    course_id: int,
+    granularity: str = Query("day", pattern="^(day|week)$"),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: Session = Depends(get_read_db_session),
+):
+    """Submissions, on-time vs late, graded and active students per day or ISO week.
+
+    Served from the rollup tables (see app.rollups), so the cost does not grow with
+    history; `as_of` says how fresh they are. Buckets without activity are zeros.
+    """
+    until = until or datetime.utcnow().date()
+    if granularity == "day":
+        table, bucket, step = models.CourseDailyActivity, models.CourseDailyActivity.day, timedelta(days=1)
+        since = since or until - timedelta(days=29)
+    else:
+        table, bucket, step = models.CourseWeeklyActivity, models.CourseWeeklyActivity.week_start, timedelta(days=7)
+        until = until - timedelta(days=until.weekday())
+        since = since or until - timedelta(weeks=11)
+        since = since - timedelta(days=since.weekday())
+    if since > until:
+        raise HTTPException(status_code=422, detail="since must not be after until")
+    if (until - since) / step > settings.activity_series_max_points:
+        raise HTTPException(
+            status_code=422, detail=f"At most {settings.activity_series_max_points} points per request"
+        )
+
+    rows = {
+        getattr(row, bucket.key): row
+        for row in db.query(table).filter(table.course_id == course_id, bucket >= since, bucket <= until)
+    }
+    points = []
+    current = since
+    while current <= until:
+        row = rows.get(current)
+        if row is None:
+            points.append(ActivityPoint(start=current))
+        else:
+            points.append(
+                ActivityPoint(
+                    start=current,
+                    submissions=row.submissions,
+                    on_time=row.on_time,
+                    late=row.late,
+                    graded=row.graded,
+                    active_students=row.active_students,
+                )
+            )
+        current += step
+    return ActivitySeries(course_id=course_id, granularity=granularity, as_of=activity_watermark(db), points=points)
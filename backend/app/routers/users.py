@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from ..db import get_db_session
+from typing import List, Optional
+from ..db import get_db_session, get_read_db_session
 from .. import models
-from ..schemas import UserRead, ResolveRoleRequest
+from ..cache import TTLCache
+from ..lookup import check_batch_size, in_request_order, parse_id_list
+from ..middleware import mark_write_unchanged
+from ..schemas import UserRead, ResolveRoleRequest, BatchIdsRequest
 from ..config import settings
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -13,13 +17,16 @@ ROLE_TEACHER = "teacher"
 ROLE_COORDINATOR = "coordinator"
 
 
-EMAIL_ROLE_CACHE = {}
+# Roles come only from this process's settings, which do not change without a restart,
+# so the cache never needs invalidating (the TTL just bounds memory for one-off emails)
+EMAIL_ROLE_CACHE = TTLCache(max_entries=settings.role_cache_max_entries)
 
 
 def resolve_role_by_email(email: str) -> str:
     email_l = email.lower()
-    if email_l in EMAIL_ROLE_CACHE:
-        return EMAIL_ROLE_CACHE[email_l]
+    cached = EMAIL_ROLE_CACHE.get(email_l)
+    if cached is not None:
+        return cached
 
     coordinator_set = {e.strip().lower() for e in settings.coordinator_emails}
     teacher_set = {e.strip().lower() for e in settings.teacher_emails}
@@ -31,7 +38,7 @@ def resolve_role_by_email(email: str) -> str:
     else:
         role = ROLE_STUDENT
 
-    EMAIL_ROLE_CACHE[email_l] = role
+    EMAIL_ROLE_CACHE.set(email_l, role, settings.role_cache_seconds)
     return role
 
 
@@ -40,8 +47,28 @@ def health():
     return {"status": "ok", "service": "users"}
 
 
+def _users_by_ids(db: Session, ids: List[int]) -> List[Optional[models.User]]:
+    rows = db.query(models.User).filter(models.User.id.in_(set(ids))).all() if ids else []
+    return in_request_order(ids, rows)
+
+
+@router.get("/batch", response_model=List[Optional[UserRead]])
+def get_users_batch(
+    ids: str = Query(..., description="Comma separated user ids"),
+    db: Session = Depends(get_read_db_session),
+):
+    """Get several users by ID in one query. Results follow the request order; misses are null."""
+    return _users_by_ids(db, parse_id_list(ids))
+
+
+@router.post("/batch", response_model=List[Optional[UserRead]])
+def post_users_batch(payload: BatchIdsRequest, db: Session = Depends(get_read_db_session)):
+    """Same as GET /users/batch, for id lists too long for a query string."""
+    return _users_by_ids(db, check_batch_size(payload.ids))
+
+
 @router.post("/resolve", response_model=UserRead)
-def resolve_user(req: ResolveRoleRequest, db: Session = Depends(get_db_session)):
+def resolve_user(req: ResolveRoleRequest, request: Request, db: Session = Depends(get_db_session)):
     email = req.email.lower()
     role = resolve_role_by_email(email)
 
@@ -51,11 +78,13 @@ def resolve_user(req: ResolveRoleRequest, db: Session = Depends(get_db_session))
         db.add(user)
         db.commit()
         db.refresh(user)
+    elif user.role != role:
+        user.role = role
+        db.commit()
+        db.refresh(user)
     else:
-        if user.role != role:
-            user.role = role
-            db.commit()
-            db.refresh(user)
+        # Sent on every page load; an existing user with the same role changes nothing
+        mark_write_unchanged(request)
 
     return user
 
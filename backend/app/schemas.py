@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 
 class UserBase(BaseModel):
@@ -23,6 +23,10 @@ class ResolveRoleRequest(BaseModel):
     email: EmailStr
 
 
+class BatchIdsRequest(BaseModel):
+    ids: List[int]
+
+
 class HealthResponse(BaseModel):
     status: str = "ok"
     service: str = "backend"
@@ -142,6 +146,37 @@ class SubmissionRead(SubmissionBase):
         from_attributes = True
 
 
+class SubmissionSummary(BaseModel):
+    """Submission without its content/feedback bodies, used by list endpoints."""
+    id: int
+    assignment_id: int
+    student_id: int
+    score: Optional[float] = None
+    submitted_at: datetime
+    updated_at: datetime
+    assignment: AssignmentRead
+    student: UserRead
+
+    class Config:
+        from_attributes = True
+
+
+class GradingQueuePage(BaseModel):
+    items: List[SubmissionSummary]
+    # Pass both as after_submitted_at / after_id to fetch the next page; null on the last page
+    next_after_submitted_at: Optional[datetime] = None
+    next_after_id: Optional[int] = None
+
+
+class SubmissionContent(BaseModel):
+    id: int
+    content: Optional[str] = None
+    feedback: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Announcement schemas
 class AnnouncementBase(BaseModel):
     title: str
@@ -208,3 +243,161 @@ class NotificationRead(NotificationBase):
 
 class MarkReadRequest(BaseModel):
     is_read: bool = True
+
+
+class BulkMarkReadRequest(BaseModel):
+    user_id: int
+    # Narrow the update to these ids and/or this category; neither means all of the user's notifications
+    ids: Optional[List[int]] = None
+    category: Optional[str] = None
+    is_read: bool = True
+
+
+class BulkDeleteRequest(BaseModel):
+    user_id: int
+    ids: Optional[List[int]] = None
+    category: Optional[str] = None
+    is_read: Optional[bool] = None
+
+
+class BulkResult(BaseModel):
+    affected: int
+
+
+class CourseCloneRequest(BaseModel):
+    course_ids: List[int]
+    # Added to every due_date of the copied assignments (e.g. 182 for the next semester)
+    due_date_offset_days: int = 0
+    # Appended to the copied course names, e.g. " (2026-2)"
+    name_suffix: str = ""
+    # Teacher of the new courses; defaults to each source course's teacher
+    teacher_id: Optional[int] = None
+
+
+class CourseCloneResult(BaseModel):
+    source_course_id: int
+    course_id: int
+    assignments: int
+
+
+class RosterUpdate(BaseModel):
+    # The complete set of students that should be enrolled in the course
+    student_ids: List[int]
+
+
+class RosterResult(BaseModel):
+    added: int
+    removed: int
+    unchanged: int
+
+
+# Report schemas
+class StudentCourseProgress(BaseModel):
+    student_id: int
+    course_id: int
+    assigned: int
+    submitted: int
+    graded: int
+    late: int
+    # Not submitted and already past due_date
+    missing: int
+    # Mean of score / max_score over graded submissions, 0..1
+    average_score: Optional[float] = None
+
+
+class StudentProgressPage(BaseModel):
+    items: List[StudentCourseProgress]
+    # Pass as after_student_id to fetch the next page; null on the last page
+    next_after_student_id: Optional[int] = None
+
+
+class ActivityPoint(BaseModel):
+    # First day of the bucket (the Monday for weekly series)
+    start: date
+    submissions: int = 0
+    on_time: int = 0
+    late: int = 0
+    graded: int = 0
+    active_students: int = 0
+
+
+class ActivitySeries(BaseModel):
+    course_id: int
+    granularity: str
+    # Submissions changed after this moment are not reflected yet
+    as_of: Optional[datetime] = None
+    points: List[ActivityPoint]
+
+
+class MissingSubmission(BaseModel):
+    assignment_id: int
+    assignment_title: str
+    course_id: int
+    student_id: int
+    student_email: str
+    due_date: Optional[datetime] = None
+    is_overdue: bool
+
+
+class MissingSubmissionsPage(BaseModel):
+    total: int
+    items: List[MissingSubmission]
+
+
+# Job schemas
+class JobCreate(BaseModel):
+    kind: str
+    payload: Optional[dict] = None
+    run_at: Optional[datetime] = None
+    max_attempts: Optional[int] = None
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    payload: Optional[dict] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationFanoutRequest(BaseModel):
+    # Recipients: every student enrolled in course_id, and/or these users
+    course_id: Optional[int] = None
+    user_ids: Optional[List[int]] = None
+    title: str
+    content: Optional[str] = None
+    category: str = "general"
+    related_assignment_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+
+
+# Change feed schemas
+class DeletedRef(BaseModel):
+    entity: str
+    id: int
+    deleted_at: datetime
+
+
+class ChangeFeed(BaseModel):
+    # Changes up to this moment are included (or pending, when has_more)
+    watermark: datetime
+    # Pass as `cursor` on the next call
+    cursor: str
+    # True when some entity hit the limit; call again with the new cursor
+    has_more: bool = False
+    courses: List[CourseRead] = []
+    enrollments: List[EnrollmentRead] = []
+    assignments: List[AssignmentRead] = []
+    submissions: List[SubmissionSummary] = []
+    announcements: List[AnnouncementRead] = []
+    notifications: List[NotificationRead] = []
+    deleted: List[DeletedRef] = []
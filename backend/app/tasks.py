@@ -0,0 +1,124 @@
+"""Built-in background job handlers (see app.jobs)."""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, exists, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .jobs import job_handler
+from .retention import purge_read_notifications
+from .rollups import refresh_activity_rollups
+
+NOTIFICATION_COLUMNS = [
+    "user_id",
+    "title",
+    "content",
+    "category",
+    "is_read",
+    "related_assignment_id",
+    "due_date",
+    "created_at",
+    "updated_at",
+]
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+@job_handler("notifications.fanout")
+def notifications_fanout(db: Session, payload: dict) -> dict:
+    """Create the same notification for every student of a course and/or a list of users.
+
+    One INSERT ... SELECT, whatever the number of recipients.
+    """
+    n = models.Notification
+    recipients = []
+    if payload.get("course_id") is not None:
+        recipients.append(
+            models.User.id.in_(
+                select(models.Enrollment.student_id).where(
+                    models.Enrollment.course_id == payload["course_id"]
+                )
+            )
+        )
+    if payload.get("user_ids"):
+        recipients.append(models.User.id.in_(payload["user_ids"]))
+    if not recipients:
+        return {"created": 0}
+
+    now = datetime.utcnow()
+    source = select(
+        models.User.id,
+        literal(payload["title"], n.title.type),
+        literal(payload.get("content"), n.content.type),
+        literal(payload.get("category") or "general", n.category.type),
+        literal(False, n.is_read.type),
+        literal(payload.get("related_assignment_id"), n.related_assignment_id.type),
+        literal(_parse_datetime(payload.get("due_date")), n.due_date.type),
+        literal(now, n.created_at.type),
+        literal(now, n.updated_at.type),
+    ).where(or_(*recipients))
+    result = db.execute(insert(n).from_select(NOTIFICATION_COLUMNS, source))
+    return {"created": result.rowcount}
+
+
+@job_handler(
+    "notifications.retention",
+    every=lambda: settings.notification_retention_interval_hours * 3600,
+)
+def notifications_retention(db: Session, payload: dict) -> dict:
+    return {"removed": purge_read_notifications(db, payload.get("days"), payload.get("batch_size"))}
+
+
+@job_handler(
+    "reports.activity_rollups",
+    every=lambda: settings.activity_rollup_interval_minutes * 60,
+)
+def activity_rollups(db: Session, payload: dict) -> dict:
+    return refresh_activity_rollups(db, full=bool(payload.get("full")))
+
+
+@job_handler(
+    "alerts.materialize",
+    every=lambda: settings.alerts_materialize_interval_minutes * 60,
+)
+def alerts_materialize(db: Session, payload: dict) -> dict:
+    """Persist "deadline" notifications for assignments due soon, once per student and assignment."""
+    n, e, a = models.Notification, models.Enrollment, models.Assignment
+    now = datetime.utcnow()
+    until = now + timedelta(hours=payload.get("within_hours", 48))
+    already_sent = exists().where(
+        and_(
+            n.user_id == e.student_id,
+            n.related_assignment_id == a.id,
+            n.category == "deadline",
+        )
+    )
+    source = (
+        select(
+            e.student_id,
+            literal("Entrega próxima: ", n.title.type).concat(a.title),
+            a.description,
+            literal("deadline", n.category.type),
+            literal(False, n.is_read.type),
+            a.id,
+            a.due_date,
+            literal(now, n.created_at.type),
+            literal(now, n.updated_at.type),
+        )
+        .join(a, a.course_id == e.course_id)
+        .where(
+            a.is_active == True,  # noqa: E712
+            a.due_date.isnot(None),
+            a.due_date >= now,
+            a.due_date <= until,
+            ~already_sent,
+        )
+    )
+    result = db.execute(insert(n).from_select(NOTIFICATION_COLUMNS, source))
+    return {"created": result.rowcount}
@@ -0,0 +1,24 @@
+"""Deletion records for the change feed (see routers.changes)."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from . import models
+
+
+def record_deletion(db: Session, entity: str, entity_id: int, user_id: Optional[int] = None) -> None:
+    """Add a tombstone in the caller's transaction."""
+    db.add(models.Tombstone(entity=entity, entity_id=entity_id, user_id=user_id, deleted_at=datetime.utcnow()))
+
+
+def record_deletions_from(db: Session, entity: str, rows: Select) -> None:
+    """Add tombstones for every row of `rows` (selecting id and user id) with one INSERT ... SELECT.
+
+    Must run before the matching DELETE, in the same transaction.
+    """
+    t = models.Tombstone
+    source = rows.add_columns(literal(entity, t.entity.type), literal(datetime.utcnow(), t.deleted_at.type))
+    db.execute(insert(t).from_select(["entity_id", "user_id", "entity", "deleted_at"], source))
@@ -0,0 +1,31 @@
+"""Standalone background job worker.
+
+Usage:
+    python -m backend.app.worker [--concurrency N]
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from .jobs import start_workers, stop_workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table.")
+    parser.add_argument("--concurrency", type=int, default=2, help="Worker threads")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    workers = start_workers(args.concurrency)
+    logging.getLogger("uvicorn.error").info("Started %s job worker threads", len(workers))
+    stopping.wait()
+    stop_workers(workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare gzip levels and brotli qualities on a typical JSON list response.
+
+Usage: python -m backend.benchmarks.compression_bench [--rows 500] [--repeat 20]
+
+The payload mimics GET /enrollments/ with nested student/course objects. Use the
+numbers to pick RESPONSE_GZIP_LEVEL / RESPONSE_BROTLI_QUALITY: past a certain level
+the extra CPU per response buys very few bytes.
+"""
+import argparse
+import json
+import time
+import zlib
+from datetime import datetime, timedelta
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+def build_payload(rows: int) -> bytes:
+    base = datetime(2025, 3, 1, 9, 0, 0)
+    items = []
+    for i in range(rows):
+        created = (base + timedelta(minutes=i)).isoformat()
+        items.append({
+            "id": i + 1,
+            "student_id": 1000 + i,
+            "course_id": 10 + i % 12,
+            "enrolled_at": created,
+            "student": {
+                "id": 1000 + i,
+                "email": f"estudiante{i}@semillero.digital",
+                "name": f"Estudiante {i}",
+                "role": "student",
+                "created_at": created,
+            },
+            "course": {
+                "id": 10 + i % 12,
+                "name": f"Programación Web {i % 12}",
+                "description": "Curso introductorio de desarrollo web con proyectos semanales.",
+                "teacher_id": 5 + i % 4,
+                "is_active": True,
+                "created_at": base.isoformat(),
+            },
+        })
+    return json.dumps(items).encode("utf-8")
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def measure(name: str, fn, body: bytes, repeat: int) -> None:
+    started = time.process_time()
+    for _ in range(repeat):
+        out = fn(body)
+    per_call_ms = (time.process_time() - started) * 1000 / repeat
+    ratio = len(out) / len(body)
+    print(f"{name:<12} {len(out):>9} bytes  {ratio:6.1%}  {per_call_ms:8.2f} ms CPU")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = build_payload(args.rows)
+    print(f"payload: {args.rows} rows, {len(body)} bytes")
+    for level in (1, 3, 6, 9):
+        measure(f"gzip-{level}", lambda b, lv=level: _gzip(b, lv), body, args.repeat)
+    if brotli is None:
+        print("brotli not installed, skipping (pip install brotli)")
+        return
+    for quality in (1, 4, 6, 11):
+        measure(f"br-{quality}", lambda b, q=quality: brotli.compress(b, quality=q), body, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
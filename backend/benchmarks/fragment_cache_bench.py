@@ -0,0 +1,107 @@
+"""Serialization CPU of large list pages: response_model path vs spliced fragments.
+
+Usage: python -m backend.benchmarks.fragment_cache_bench [--rows 500] [--courses 12] [--repeat 20]
+
+Builds in-memory rows (no database) for an enrollments page and a submissions page
+and renders them the way FastAPI does for a response_model (validate from
+attributes, dump to JSON-able data, json.dumps) and through app.fragments, with a
+cold and a warm fragment cache. Every course/assignment repeats rows/courses times
+per page, which is where the warm cache saves its CPU.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.app import models
+from backend.app.fragments import ENROLLMENT_ROW, FRAGMENT_CACHE, SUBMISSION_SUMMARY_ROW, render_list
+from backend.app.schemas import EnrollmentRead, SubmissionSummary
+
+
+def build_rows(rows: int, courses: int):
+    base = datetime(2025, 3, 1, 9, 0, 0)
+    teachers = [
+        models.User(id=1 + i, email=f"docente{i}@semillero.digital", role="teacher", created_at=base, updated_at=base)
+        for i in range(4)
+    ]
+    course_rows = []
+    assignment_rows = []
+    for i in range(courses):
+        course = models.Course(
+            id=10 + i, name=f"Programación Web {i}",
+            description="Curso introductorio de desarrollo web con proyectos semanales.",
+            teacher_id=teachers[i % 4].id, is_active=True, created_at=base, updated_at=base,
+        )
+        course.teacher = teachers[i % 4]
+        course.enrollment_count = rows // courses
+        course.assignment_count = 1
+        assignment = models.Assignment(
+            id=100 + i, title=f"Proyecto {i}", description="Entrega semanal", course_id=course.id,
+            due_date=base + timedelta(days=7), max_score=10.0, is_active=True, created_at=base, updated_at=base,
+        )
+        assignment.course = course
+        assignment.submission_count = rows // courses
+        course_rows.append(course)
+        assignment_rows.append(assignment)
+
+    enrollments, submissions = [], []
+    for i in range(rows):
+        at = base + timedelta(minutes=i)
+        student = models.User(id=1000 + i, email=f"estudiante{i}@semillero.digital", role="student", created_at=at, updated_at=at)
+        course, assignment = course_rows[i % courses], assignment_rows[i % courses]
+        enrollment = models.Enrollment(id=i + 1, student_id=student.id, course_id=course.id, enrolled_at=at, updated_at=at)
+        enrollment.student, enrollment.course = student, course
+        submission = models.Submission(
+            id=i + 1, assignment_id=assignment.id, student_id=student.id, score=None, submitted_at=at, updated_at=at,
+        )
+        submission.student, submission.assignment = student, assignment
+        enrollments.append(enrollment)
+        submissions.append(submission)
+    return enrollments, submissions
+
+
+def response_model_body(adapter: TypeAdapter, rows) -> bytes:
+    # What fastapi.routing.serialize_response + JSONResponse.render do for List[schema]
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def measure(label: str, fn, repeat: int, before=None) -> float:
+    total = 0.0
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started = time.process_time()
+        body = fn()
+        total += time.process_time() - started
+    per_call_ms = total * 1000 / repeat
+    print(f"  {label:<16} {per_call_ms:8.2f} ms/page  {len(body) / 1024:7.1f} KiB")
+    return per_call_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    enrollments, submissions = build_rows(args.rows, args.courses)
+    for name, schema, spec, rows in (
+        ("enrollments", EnrollmentRead, ENROLLMENT_ROW, enrollments),
+        ("submissions", SubmissionSummary, SUBMISSION_SUMMARY_ROW, submissions),
+    ):
+        adapter = TypeAdapter(List[schema])
+        assert json.loads(response_model_body(adapter, rows)) == json.loads(render_list(spec, rows))
+        print(f"{name}: {args.rows} rows, {args.courses} courses")
+        baseline = measure("response_model", lambda: response_model_body(adapter, rows), args.repeat)
+        measure("fragments cold", lambda: render_list(spec, rows), args.repeat, before=FRAGMENT_CACHE.invalidate)
+        warm = measure("fragments warm", lambda: render_list(spec, rows), args.repeat)
+        print(f"  warm saves {100 * (1 - warm / baseline):.0f}% of the serialization CPU")
+
+
+if __name__ == "__main__":
+    main()
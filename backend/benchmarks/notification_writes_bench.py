@@ -0,0 +1,71 @@
+"""Notification creation throughput: one transaction per row vs group commit.
+
+Usage: python -m backend.benchmarks.notification_writes_bench [--rows 2000] [--threads 32]
+
+Writes to the database in DATABASE_URL (use a scratch database). Both modes run
+the same work as POST /notifications/: check the user, insert, commit, read back.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app import models
+from backend.app.batching import NotificationBatcher
+from backend.app.db import SessionLocal, init_db
+from backend.app.schemas import NotificationRead
+
+
+def _bench_user_id() -> int:
+    with SessionLocal() as db:
+        user = db.query(models.User).filter(models.User.email == "bench-notifications@example.com").first()
+        if user is None:
+            user = models.User(email="bench-notifications@example.com", role="student")
+            db.add(user)
+            db.commit()
+        return user.id
+
+
+def create_direct(values: dict) -> NotificationRead:
+    with SessionLocal() as db:
+        db.query(models.User).filter(models.User.id == values["user_id"]).one()
+        notification = models.Notification(**values)
+        db.add(notification)
+        db.commit()
+        db.refresh(notification)
+        return NotificationRead.model_validate(notification)
+
+
+def run(label: str, create, rows: int, threads: int, user_id: int) -> None:
+    payloads = [{"user_id": user_id, "title": f"bench {i}", "category": "bench"} for i in range(rows)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(create, payloads))
+    elapsed = time.perf_counter() - started
+    assert len({r.id for r in results}) == rows
+    print(f"{label:<14} {rows} rows in {elapsed:6.2f} s  {rows / elapsed:9.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    init_db()
+    user_id = _bench_user_id()
+    run("direct", create_direct, args.rows, args.threads, user_id)
+
+    batcher = NotificationBatcher()
+    batcher.start()
+    try:
+        run("group commit", lambda values: batcher.submit(values).result(), args.rows, args.threads, user_id)
+    finally:
+        batcher.stop()
+
+    with SessionLocal() as db:
+        db.query(models.Notification).filter(models.Notification.category == "bench").delete()
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""Query-plan snapshots for every GET endpoint.
+
+Calls each GET route of the app against a (seeded) Postgres database, records the
+SQL it runs and captures ``EXPLAIN (ANALYZE, BUFFERS)`` for every statement. Plans
+are flagged for sequential scans on large tables, sorts and hashes that spill to
+disk, and filters that look like a missing index, then compared against a
+checked-in baseline so index or query changes show up as a reviewable diff.
+
+Usage:
+    python -m backend.scripts.query_plans --seed [--scale 1]   # fill an empty database first
+    python -m backend.scripts.query_plans                      # report and diff against the baseline
+    python -m backend.scripts.query_plans --write-baseline     # accept the current plans
+
+Point DATABASE_URL at a scratch database: --seed inserts synthetic rows and
+EXPLAIN ANALYZE really executes every statement (inside a rolled back transaction).
+"""
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, func, text
+from sqlalchemy.engine import Engine
+
+from backend.app import models
+from backend.app.config import settings
+from backend.app.db import SessionLocal, get_engine, init_db
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "query_plans.json")
+
+# Query strings for routes that need (or are only realistic with) filters. Values
+# are formatted with the sample ids picked from the seeded data.
+ROUTE_QUERIES: Dict[str, Dict[str, str]] = {
+    "/users/batch": {"ids": "{user_ids}"},
+    "/users/me": {"email": "{user_email}"},
+    "/courses/batch": {"ids": "{course_ids}"},
+    "/enrollments/": {"student_id": "{user_id}"},
+    "/assignments/": {"course_id": "{course_id}"},
+    "/assignments/batch": {"ids": "{assignment_ids}"},
+    "/assignments/grading-queue": {"teacher_id": "{teacher_id}"},
+    "/assignments/submissions/": {"assignment_id": "{assignment_id}"},
+    "/assignments/submissions/batch": {"ids": "{submission_ids}"},
+    "/notifications/": {"user_id": "{user_id}"},
+    "/notifications/batch": {"ids": "{notification_ids}"},
+    "/notifications/archive": {"user_id": "{user_id}"},
+    "/notifications/alerts/upcoming": {"user_id": "{user_id}"},
+    "/notifications/alerts/overdue": {"user_id": "{user_id}"},
+    "/notifications/alerts/batch": {"course_id": "{course_id}"},
+    "/reports/progress": {"course_id": "{course_id}"},
+    "/changes/": {"since": "{since}", "user_id": "{user_id}"},
+}
+
+SEED_SQL = [
+    """INSERT INTO users (email, role, created_at, updated_at)
+       SELECT 'seed-teacher-' || g || '@example.com', 'teacher', :now, :now
+       FROM generate_series(1, :teachers) g""",
+    """INSERT INTO users (email, role, created_at, updated_at)
+       SELECT 'seed-student-' || g || '@example.com', 'student', :now, :now
+       FROM generate_series(1, :students) g""",
+    """INSERT INTO courses (name, description, teacher_id, is_active, created_at, updated_at)
+       SELECT 'Curso ' || g, 'Curso generado para pruebas de carga',
+              t.first_id + g % :teachers, g % 10 <> 0, :now, :now
+       FROM generate_series(1, :courses) g,
+            (SELECT min(id) AS first_id FROM users WHERE role = 'teacher') t""",
+    """INSERT INTO enrollments (student_id, course_id, enrolled_at, updated_at)
+       SELECT u.id, c.first_id + (u.id * 7 + k * 13) % :courses, :now, :now
+       FROM users u CROSS JOIN generate_series(0, 2) k,
+            (SELECT min(id) AS first_id FROM courses) c
+       WHERE u.role = 'student'""",
+    """INSERT INTO assignments (title, description, course_id, due_date, max_score, is_active, created_at, updated_at)
+       SELECT 'Tarea ' || k, 'Descripción de la tarea ' || k, c.id,
+              :now + make_interval(days => k * 4 - 60), 100, true, :now, :now
+       FROM courses c CROSS JOIN generate_series(1, 20) k""",
+    """INSERT INTO submissions (assignment_id, student_id, content, score, submitted_at, updated_at)
+       SELECT a.id, e.student_id, 'Entrega de prueba',
+              CASE WHEN (e.id + a.id) % 3 = 0 THEN NULL ELSE 60 + a.id % 40 END, :now, :now
+       FROM enrollments e JOIN assignments a ON a.course_id = e.course_id
+       WHERE (e.id * 31 + a.id) % 10 < 6""",
+    """INSERT INTO notifications (user_id, title, content, category, is_read, created_at, updated_at)
+       SELECT u.id, 'Notificación ' || k, 'Contenido de prueba',
+              (ARRAY['general', 'assignment', 'announcement'])[k % 3 + 1], k % 4 <> 0,
+              :now - make_interval(days => k * 3), :now - make_interval(days => k * 3)
+       FROM users u CROSS JOIN generate_series(1, 50) k
+       WHERE u.role = 'student'""",
+    """INSERT INTO announcements (title, content, is_active, start_at, end_at, created_at, updated_at)
+       SELECT 'Anuncio ' || g, 'Contenido de prueba', g % 2 = 0,
+              :now - make_interval(days => g), :now + make_interval(days => 30 - g % 60), :now, :now
+       FROM generate_series(1, 200) g""",
+]
+
+
+def seed(scale: float) -> None:
+    """Fill an empty database with synthetic rows in set-based inserts."""
+    params = {
+        "now": datetime.utcnow(),
+        "teachers": max(int(200 * scale), 1),
+        "students": max(int(20000 * scale), 1),
+        # at least 30 courses so the three enrollments per student never collide
+        "courses": max(int(300 * scale), 30),
+    }
+    with get_engine().begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM users")).scalar():
+            raise SystemExit("refusing to seed: the users table is not empty")
+        for sql in SEED_SQL:
+            conn.execute(text(sql), params)
+        conn.execute(text("ANALYZE"))
+
+
+def _sample_values(db) -> Dict[str, object]:
+    """Representative ids for path and query parameters (the busiest student, course, ...)."""
+    def busiest(column, group_by):
+        return db.query(group_by).group_by(group_by).order_by(func.count(column).desc(), group_by).limit(1).scalar()
+
+    def first_ids(column, n=50):
+        return ",".join(str(v) for (v,) in db.query(column).order_by(column).limit(n))
+
+    user_id = busiest(models.Enrollment.id, models.Enrollment.student_id)
+    return {
+        "user_id": user_id,
+        "user_email": db.query(models.User.email).filter(models.User.id == user_id).scalar(),
+        "course_id": busiest(models.Enrollment.id, models.Enrollment.course_id),
+        "teacher_id": busiest(models.Course.id, models.Course.teacher_id),
+        "assignment_id": busiest(models.Submission.id, models.Submission.assignment_id),
+        "submission_id": db.query(func.min(models.Submission.id)).scalar(),
+        "enrollment_id": db.query(func.min(models.Enrollment.id)).scalar(),
+        "announcement_id": db.query(func.min(models.Announcement.id)).scalar(),
+        "notification_id": db.query(func.min(models.Notification.id)).scalar(),
+        "job_id": db.query(func.min(models.Job.id)).scalar() or 1,
+        "user_ids": first_ids(models.User.id),
+        "course_ids": first_ids(models.Course.id),
+        "assignment_ids": first_ids(models.Assignment.id),
+        "submission_ids": first_ids(models.Submission.id),
+        "notification_ids": first_ids(models.Notification.id),
+        "since": (datetime.utcnow() - timedelta(days=7)).isoformat(),
+    }
+
+
+class StatementRecorder:
+    """Collects the SELECT statements issued while `recording` is set."""
+
+    def __init__(self):
+        self.recording = False
+        self.statements: List[Tuple[str, object]] = []
+        self._lock = threading.Lock()
+        event.listen(Engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if not self.recording or executemany:
+            return
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            with self._lock:
+                self.statements.append((statement, parameters))
+
+    def take(self) -> List[Tuple[str, object]]:
+        with self._lock:
+            statements, self.statements = self.statements, []
+        return statements
+
+
+def _walk(node: dict, depth: int = 0) -> Iterator[Tuple[int, dict]]:
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from _walk(child, depth + 1)
+
+
+def plan_shape(plan: dict) -> List[str]:
+    """Node types, relations and indexes only: stable across runs, unlike timings."""
+    lines = []
+    for depth, node in _walk(plan):
+        line = "  " * depth + node["Node Type"]
+        if node.get("Relation Name"):
+            line += f" on {node['Relation Name']}"
+        if node.get("Index Name"):
+            line += f" using {node['Index Name']}"
+        lines.append(line)
+    return lines
+
+
+# Quoted constants in filters (timestamps, sample ids) change between runs
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def plan_flags(plan: dict, table_rows: Dict[str, int], large_rows: int) -> List[str]:
+    flags = []
+    for _, node in _walk(plan):
+        kind = node["Node Type"]
+        relation = node.get("Relation Name")
+        if kind == "Seq Scan" and table_rows.get(relation, 0) >= large_rows:
+            if node.get("Filter"):
+                condition = _LITERAL.sub("?", node["Filter"])
+                flags.append(f"missing index? seq scan on {relation} filtered by {condition}")
+            else:
+                flags.append(f"seq scan on large table {relation}")
+        if kind in ("Sort", "Incremental Sort") and node.get("Sort Space Type") == "Disk":
+            flags.append(f"sort spilled to disk ({node.get('Sort Space Used')} kB)")
+        if kind == "Hash" and node.get("Hash Batches", 1) > 1:
+            flags.append(f"hash spilled to disk ({node['Hash Batches']} batches)")
+    return flags
+
+
+def explain(statement: str, parameters) -> dict:
+    conn = get_engine().connect()
+    try:
+        result = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters)
+        data = result.scalar()
+    finally:
+        conn.rollback()
+        conn.close()
+    if isinstance(data, str):
+        data = json.loads(data)
+    return data[0]
+
+
+def _table_rows() -> Dict[str, int]:
+    with get_engine().connect() as conn:
+        rows = conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        ))
+        return {name: count for name, count in rows}
+
+
+def snapshot(large_rows: int, only: Optional[str] = None) -> Dict[str, dict]:
+    """Run every GET route once and return {"GET /path #n": plan summary}."""
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+
+    from backend.app.main import app
+
+    # The snapshot hammers every route from one client; don't let the limiter interfere
+    settings.load_shedding_enabled = False
+    recorder = StatementRecorder()
+    client = TestClient(app)
+    db = SessionLocal()
+    try:
+        samples = _sample_values(db)
+    finally:
+        db.close()
+    table_rows = _table_rows()
+
+    results: Dict[str, dict] = {}
+    routes = [r for r in app.routes if isinstance(r, APIRoute) and "GET" in r.methods]
+    for route in sorted(routes, key=lambda r: r.path):
+        if only and not route.path.startswith(only):
+            continue
+        url = route.path.format(**{p.name: samples.get(p.name) for p in route.dependant.path_params})
+        params = {k: v.format(**samples) for k, v in ROUTE_QUERIES.get(route.path, {}).items()}
+        recorder.take()
+        recorder.recording = True
+        try:
+            # X-Read-Primary bypasses request coalescing and the replica
+            response = client.get(url, params=params, headers={"X-Read-Primary": "1"})
+        finally:
+            recorder.recording = False
+        if response.status_code >= 400:
+            print(f"warning: GET {url} returned {response.status_code}", file=sys.stderr)
+        for i, (statement, parameters) in enumerate(recorder.take(), start=1):
+            output = explain(statement, parameters)
+            plan = output["Plan"]
+            results[f"GET {route.path} #{i}"] = {
+                "sql": " ".join(statement.split()),
+                "plan": plan_shape(plan),
+                "flags": plan_flags(plan, table_rows, large_rows),
+                "execution_ms": round(output.get("Execution Time", 0.0), 3),
+                "shared_hit": plan.get("Shared Hit Blocks", 0),
+                "shared_read": plan.get("Shared Read Blocks", 0),
+            }
+    return results
+
+
+def diff_against(baseline: Dict[str, dict], current: Dict[str, dict]) -> List[str]:
+    """Human readable differences in plan shape and flags; empty when nothing changed."""
+    lines: List[str] = []
+    for key in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(key), current.get(key)
+        if old is None:
+            lines.append(f"+ new query {key}: {new['sql'][:120]}")
+            continue
+        if new is None:
+            lines.append(f"- query gone {key}: {old['sql'][:120]}")
+            continue
+        if old["plan"] != new["plan"]:
+            lines.append(f"~ plan changed {key}")
+            lines.extend(
+                "    " + line
+                for line in difflib.unified_diff(old["plan"], new["plan"], "baseline", "current", lineterm="")
+            )
+        for flag in sorted(set(new["flags"]) - set(old["flags"])):
+            lines.append(f"! new flag {key}: {flag}")
+    return lines
+
+
+def _baseline_entry(entry: dict) -> dict:
+    # Timings and buffer counts are too noisy to review; keep them out of the file
+    return {"sql": entry["sql"], "plan": entry["plan"], "flags": entry["flags"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture and diff EXPLAIN ANALYZE plans for every GET route.")
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic data into an empty database first")
+    parser.add_argument("--scale", type=float, default=1.0, help="Seed size multiplier (1 = 20k students, ~1M notifications)")
+    parser.add_argument("--large-rows", type=int, default=10000, help="Tables with at least this many rows count as large")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: %(default)s)")
+    parser.add_argument("--write-baseline", action="store_true", help="Overwrite the baseline with the current plans")
+    parser.add_argument("--only", help="Only routes whose path starts with this prefix")
+    parser.add_argument("--show-plans", action="store_true", help="Print the plan shape of every query")
+    args = parser.parse_args(argv)
+
+    if get_engine().dialect.name != "postgresql":
+        parser.error("query plan snapshots need a Postgres DATABASE_URL")
+
+    init_db()
+    if args.seed:
+        seed(args.scale)
+
+    current = snapshot(args.large_rows, args.only)
+    flagged = 0
+    for key, entry in current.items():
+        print(f"{key}  {entry['execution_ms']:.2f} ms  hit={entry['shared_hit']} read={entry['shared_read']}")
+        if args.show_plans:
+            for line in entry["plan"]:
+                print("    " + line)
+        for flag in entry["flags"]:
+            flagged += 1
+            print(f"    ! {flag}")
+    print(f"{len(current)} queries, {flagged} flags")
+
+    if args.write_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({k: _baseline_entry(v) for k, v in current.items()}, fh, indent=2, ensure_ascii=False, sort_keys=True)
+            fh.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        # Without a baseline nothing can be compared; that must not pass as "no changes"
+        print(f"No baseline at {args.baseline}; run with --write-baseline to create it", file=sys.stderr)
+        sys.exit(2)
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if args.only:
+        baseline = {k: v for k, v in baseline.items() if k.split(" ", 2)[1].startswith(args.only)}
+    changes = diff_against(baseline, current)
+    if changes:
+        print("\nDifferences against the baseline:")
+        print("\n".join(changes))
+        sys.exit(1)
+    print("Plans match the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Shared fixtures: every test starts with an empty SQLite database and cold caches.
+
+Run from the repository root: python -m pytest backend/tests
+"""
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="semillero-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "test.db")
+os.environ.pop("READ_DATABASE_URL", None)
+os.environ["CACHE_INVALIDATION_BUS"] = "local"
+os.environ["LOAD_SHEDDING_ENABLED"] = "false"
+os.environ["JOBS_INPROCESS_WORKERS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from backend.app import db as db_module
+from backend.app.cache import invalidator
+from backend.app.config import settings
+from backend.app.db import Base, SessionLocal, get_engine, init_db
+from backend.app.main import app
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    Base.metadata.drop_all(get_engine())
+    init_db()
+    # Drops every registered cache, including the coalescing middleware's
+    invalidator.reset()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(client):
+    def make(email: str) -> dict:
+        return client.post("/users/resolve", json={"email": email}).json()
+    return make
+
+
+@pytest.fixture
+def teacher(make_user):
+    return make_user("docente@semillero.digital")
+
+
+@pytest.fixture
+def course(client, teacher):
+    return client.post("/courses/", json={"name": "Programación Web", "teacher_id": teacher["id"]}).json()
+
+
+@pytest.fixture
+def enroll(client):
+    def enroll_student(student: dict, course: dict) -> dict:
+        return client.post("/enrollments/", json={"student_id": student["id"], "course_id": course["id"]}).json()
+    return enroll_student
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """An empty database standing in for a replica that has not replayed anything yet."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    monkeypatch.setattr(settings, "read_database_url", url)
+    monkeypatch.setattr(db_module, "_read_engine", None)
+    monkeypatch.setattr(db_module, "_replica_status", (0.0, False))
+    return url
@@ -0,0 +1,60 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _lines(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _key(alert):
+    return alert["related_assignment_id"], alert["title"], alert["category"]
+
+
+@pytest.fixture
+def students(client, make_user, course, enroll):
+    students = [make_user(f"estudiante{i}@semillero.digital") for i in range(3)]
+    for student in students[:2]:
+        enroll(student, course)
+    now = datetime.utcnow()
+    for title, due in (("vencida", now - timedelta(days=1)), ("pronto", now + timedelta(hours=12)),
+                       ("lejos", now + timedelta(days=10))):
+        client.post("/assignments/", json={"title": title, "course_id": course["id"], "due_date": due.isoformat()})
+    client.post("/assignments/", json={"title": "sin fecha", "course_id": course["id"]})
+    return students
+
+
+def test_matches_the_per_student_endpoints(client, students):
+    ids = ",".join(str(s["id"]) for s in students)
+    lines = _lines(client.get("/notifications/alerts/batch", params={"user_ids": ids}))
+    # The third student has no enrollments, so no line
+    assert [line["user_id"] for line in lines] == [s["id"] for s in students[:2]]
+    for line in lines:
+        upcoming = client.get("/notifications/alerts/upcoming", params={"user_id": line["user_id"]}).json()
+        overdue = client.get("/notifications/alerts/overdue", params={"user_id": line["user_id"]}).json()
+        assert sorted(map(_key, line["alerts"])) == sorted(map(_key, upcoming + overdue))
+
+
+@pytest.mark.parametrize("kind,titles", [
+    ("upcoming", ["Entrega próxima: pronto"]),
+    ("overdue", ["Entrega vencida: vencida"]),
+    ("all", ["Entrega vencida: vencida", "Entrega próxima: pronto"]),
+])
+def test_kind_filters_and_orders_by_due_date(client, students, course, kind, titles):
+    lines = _lines(client.get("/notifications/alerts/batch", params={"course_id": course["id"], "kind": kind}))
+    assert len(lines) == 2
+    assert [a["title"] for a in lines[0]["alerts"]] == titles
+
+
+def test_within_hours_widens_the_window(client, students, course):
+    lines = _lines(client.get("/notifications/alerts/batch", params={
+        "course_id": course["id"], "kind": "upcoming", "within_hours": 24 * 30,
+    }))
+    assert [a["title"] for a in lines[0]["alerts"]] == ["Entrega próxima: pronto", "Entrega próxima: lejos"]
+
+
+def test_requires_a_filter(client):
+    assert client.get("/notifications/alerts/batch").status_code == 400
+    assert client.get("/notifications/alerts/batch", params={"course_id": 1, "kind": "never"}).status_code == 422
@@ -0,0 +1,111 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app import cache
+from backend.app.config import settings
+from backend.app.routers import announcements
+from backend.app.routers.announcements import VISIBLE_CACHE
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+class Clock:
+    """Moves the router's utcnow and the caches' monotonic clock together."""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def advance(self, seconds: float) -> None:
+        self.offset += seconds
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.offset
+
+    def utcnow(self) -> datetime:
+        return NOW + timedelta(seconds=self.offset)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock.utcnow()
+
+    monkeypatch.setattr(announcements, "datetime", FrozenDatetime)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock.monotonic))
+    # Only VISIBLE_CACHE under test, not the middleware's short-lived copy
+    monkeypatch.setattr(settings, "coalesce_paths", [])
+    return clock
+
+
+def _post(client, title, start=None, end=None, **extra):
+    body = {"title": title, **extra}
+    if start is not None:
+        body["start_at"] = (NOW + timedelta(seconds=start)).isoformat()
+    if end is not None:
+        body["end_at"] = (NOW + timedelta(seconds=end)).isoformat()
+    return client.post("/announcements/", json=body).json()
+
+
+def _visible(client):
+    return sorted(a["title"] for a in client.get("/announcements/visible").json())
+
+
+def _ttl():
+    expires_at, _, _ = VISIBLE_CACHE._data["visible"]
+    return expires_at - cache.time.monotonic()
+
+
+def test_only_active_announcements_inside_their_window(client, clock):
+    _post(client, "sin ventana")
+    _post(client, "en curso", start=-60, end=60)
+    _post(client, "futuro", start=60)
+    _post(client, "terminado", start=-120, end=-60)
+    _post(client, "inactivo", is_active=False)
+    assert _visible(client) == ["en curso", "sin ventana"]
+
+
+def test_ttl_stops_at_the_next_start(client, clock):
+    _post(client, "ahora")
+    _post(client, "pronto", start=90)
+    assert _visible(client) == ["ahora"]
+    assert 85 <= _ttl() <= 90
+
+    clock.advance(89)
+    assert _visible(client) == ["ahora"]
+    clock.advance(2)
+    assert _visible(client) == ["ahora", "pronto"]
+
+
+def test_ttl_stops_at_the_next_end(client, clock):
+    _post(client, "corto", end=30)
+    assert _visible(client) == ["corto"]
+    assert 25 <= _ttl() <= 30
+    clock.advance(31)
+    assert _visible(client) == []
+
+
+def test_ttl_is_capped_without_boundaries(client, clock):
+    _post(client, "permanente")
+    _visible(client)
+    assert settings.announcements_cache_max_seconds - 5 <= _ttl() <= settings.announcements_cache_max_seconds
+
+
+def test_writes_drop_the_cached_list(client, clock):
+    first = _post(client, "uno")
+    assert _visible(client) == ["uno"]
+    _post(client, "dos")
+    assert _visible(client) == ["dos", "uno"]
+    client.put(f"/announcements/{first['id']}", json={"title": "uno editado"})
+    assert _visible(client) == ["dos", "uno editado"]
+    client.put(f"/announcements/{first['id']}", json={"start_at": (NOW + timedelta(hours=1)).isoformat()})
+    assert _visible(client) == ["dos"]
+    client.delete(f"/announcements/{first['id']}")
+    client.delete(f"/announcements/{first['id'] + 1}")
+    assert _visible(client) == []
@@ -0,0 +1,38 @@
+import pytest
+
+from backend.app.config import settings
+
+
+@pytest.mark.parametrize("path", ["/users/batch", "/courses/batch", "/assignments/batch", "/notifications/batch"])
+def test_unknown_ids_come_back_as_null(client, path):
+    assert client.get(path, params={"ids": "998,999"}).json() == [None, None]
+
+
+def test_results_follow_request_order_with_duplicates(client, make_user):
+    a, b = make_user("a@semillero.digital"), make_user("b@semillero.digital")
+    r = client.get("/users/batch", params={"ids": f"{b['id']},999,{a['id']},{b['id']}"})
+    assert [u and u["email"] for u in r.json()] == ["b@semillero.digital", None, "a@semillero.digital", "b@semillero.digital"]
+
+
+def test_post_variant_matches_get(client, course):
+    by_get = client.get("/courses/batch", params={"ids": str(course["id"])}).json()
+    by_post = client.post("/courses/batch", json={"ids": [course["id"]]}).json()
+    assert by_get == by_post
+    assert by_post[0]["teacher"]["id"] == course["teacher_id"]
+
+
+def test_submission_batch_omits_bodies(client, course, make_user):
+    student = make_user("s@semillero.digital")
+    assignment = client.post("/assignments/", json={"title": "t", "course_id": course["id"]}).json()
+    submission = client.post("/assignments/submissions/", json={
+        "assignment_id": assignment["id"], "student_id": student["id"], "content": "cuerpo",
+    }).json()
+    [row] = client.get("/assignments/submissions/batch", params={"ids": str(submission["id"])}).json()
+    assert row["id"] == submission["id"] and "content" not in row
+
+
+def test_invalid_or_oversized_id_lists_are_rejected(client, monkeypatch):
+    assert client.get("/users/batch", params={"ids": "1,x"}).status_code == 422
+    monkeypatch.setattr(settings, "batch_lookup_max_ids", 2)
+    assert client.get("/users/batch", params={"ids": "1,2,3"}).status_code == 422
+    assert client.post("/users/batch", json={"ids": [1, 2, 3]}).status_code == 422
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from backend.app import cache
+from backend.app.cache import InvalidationBus, Invalidator, LocalBus, PostgresBus, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_their_own_ttl(clock):
+    store = TTLCache()
+    store.set("short", 1, ttl=5)
+    store.set("long", 2, ttl=60)
+    store.set("never", 3, ttl=0)
+    clock.now += 10
+    assert (store.get("short"), store.get("long"), store.get("never", "x")) == (None, 2, "x")
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    store = TTLCache(max_entries=2)
+    store.set("a", 1, ttl=60)
+    store.set("b", 2, ttl=60)
+    store.get("a")
+    store.set("c", 3, ttl=60)
+    assert (store.get("a"), store.get("b"), store.get("c")) == (1, None, 3)
+
+
+def test_total_weight_is_bounded(clock):
+    store = TTLCache(max_weight=10)
+    store.set("a", "aaaa", ttl=60, weight=4)
+    store.set("b", "bbbb", ttl=60, weight=4)
+    store.set("c", "cccc", ttl=60, weight=4)
+    store.set("huge", "x" * 11, ttl=60, weight=11)
+    assert (store.get("a"), store.get("b"), store.get("c"), store.get("huge")) == (None, "bbbb", "cccc", None)
+    store.invalidate("b")
+    store.set("d", "dddddd", ttl=60, weight=6)
+    assert (store.get("c"), store.get("d")) == ("cccc", "dddddd")
+
+
+def test_invalidate_one_some_or_all(clock):
+    store = TTLCache()
+    for key in (("course", 1), ("course", 2), ("user", 1)):
+        store.set(key, True, ttl=60)
+    store.invalidate(("user", 1))
+    assert store.get(("user", 1)) is None
+    store.invalidate_where(lambda key: key == ("course", 1))
+    assert (store.get(("course", 1)), store.get(("course", 2))) == (None, True)
+    store.invalidate()
+    assert store.get(("course", 2)) is None
+
+
+@pytest.fixture
+def workers():
+    """Two Invalidators on one LocalBus, like two workers; each records what its handler saw."""
+    bus = LocalBus()
+    pairs = []
+    for _ in range(2):
+        worker, seen = Invalidator(), []
+        worker.on("courses")(seen.append)
+        bus.subscribe(worker)
+        pairs.append((worker, seen))
+    return pairs
+
+
+def test_publish_runs_locally_once_and_remotely_once(workers):
+    (a, seen_a), (b, seen_b) = workers
+    a.publish("courses", 7)
+    assert seen_a == [7] and seen_b == [7]
+
+
+def test_unknown_topics_and_reset(workers):
+    (a, seen_a), (b, seen_b) = workers
+    a.publish("nothing-listens", 1)
+    b.reset()
+    assert seen_a == [] and seen_b == [None]
+
+
+def test_a_failing_handler_does_not_stop_the_others():
+    worker = Invalidator()
+    seen = []
+    worker.on("t")(lambda arg: 1 / 0)
+    worker.on("t")(seen.append)
+    worker.publish("t", "x")
+    assert seen == ["x"]
+
+
+def test_postgres_bus_dispatches_payloads_to_its_subscribers():
+    bus, worker, seen = PostgresBus(channel="test"), Invalidator(), []
+    worker.on("courses")(seen.append)
+    bus.subscribe(worker)
+    bus._dispatch(json.dumps({"origin": "other", "topic": "courses", "arg": 3}))
+    bus._dispatch(json.dumps({"origin": worker.origin, "topic": "courses", "arg": 4}))
+    bus._dispatch("not json")
+    worker.publish("courses", 5)
+    assert seen == [3, 5]
+    assert bus._outbox.get_nowait() == {"origin": worker.origin, "topic": "courses", "arg": 5}
+
+
+def test_bus_interface_is_abstract():
+    with pytest.raises(TypeError):
+        InvalidationBus()
+
+    class Incomplete(InvalidationBus):
+        def publish(self, message):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
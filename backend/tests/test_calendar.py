@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from backend.app.db import get_engine
+from backend.app.routers.calendar import _fold
+
+
+@pytest.fixture
+def feed(client, make_user, course, enroll):
+    student = make_user("estudiante@semillero.digital")
+    enroll(student, course)
+    due = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    assignment = client.post("/assignments/", json={
+        "title": "TP 1, parte; uno", "description": "linea1\nlinea2", "course_id": course["id"], "due_date": due,
+    }).json()
+    return f"/calendar/users/{student['id']}/deadlines.ics", assignment
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(*args):
+        executed.append(1)
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    yield executed
+    event.remove(get_engine(), "before_cursor_execute", count)
+
+
+def test_feed_lists_due_dates_escaped(client, feed):
+    url, assignment = feed
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/calendar")
+    assert f"UID:assignment-{assignment['id']}@semillero-digital" in r.text
+    assert "SUMMARY:TP 1\\, parte\\; uno (Programación Web)" in r.text
+    assert "DESCRIPTION:linea1\\nlinea2" in r.text
+
+
+def test_conditional_poll_answers_304_without_queries(client, feed, statements):
+    url, _ = feed
+    etag = client.get(url).headers["etag"]
+    statements.clear()
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert statements == []
+
+
+def test_assignment_and_course_writes_change_the_version(client, feed, course):
+    url, assignment = feed
+    etag = client.get(url).headers["etag"]
+    client.put(f"/assignments/{assignment['id']}", json={"title": "Nuevo título"})
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and "Nuevo título" in r.text
+
+    client.put(f"/courses/{course['id']}", json={"name": "Curso renombrado"})
+    r2 = client.get(url, headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 200 and "Curso renombrado" in r2.text
+
+
+def test_unenrolling_empties_the_feed(client, feed):
+    url, _ = feed
+    etag = client.get(url).headers["etag"]
+    enrollment = client.get("/enrollments/").json()[0]
+    client.delete(f"/enrollments/{enrollment['id']}")
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200 and "BEGIN:VEVENT" not in r.text
+
+
+def test_fold_splits_long_lines_at_75_octets():
+    folded = _fold("DESCRIPTION:" + "ñ" * 80)
+    lines = folded.rstrip("\r\n").split("\r\n")
+    assert len(lines) > 1
+    assert all(len(line.encode("utf-8")) <= 75 for line in lines)
+    assert all(line.startswith(" ") for line in lines[1:])
+
+
+def test_compressed_feed_has_a_weak_etag_that_still_matches(client, feed):
+    url, _ = feed
+    # The first request streams the feed, which is compressed whatever its size
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == "W/" + identity.headers["etag"]
+    assert identity.headers["vary"] == gzipped.headers["vary"] == "Accept-Encoding"
+    for etag in (identity.headers["etag"], gzipped.headers["etag"]):
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
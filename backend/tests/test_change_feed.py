@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import models
+from backend.app.config import settings
+from backend.app.retention import purge_read_notifications
+
+EPOCH = "2000-01-01T00:00:00"
+
+
+@pytest.fixture(autouse=True)
+def no_safety_margin(monkeypatch):
+    monkeypatch.setattr(settings, "change_feed_safety_seconds", 0)
+
+
+def _sync(client, limit, **params):
+    """Follow the cursor until has_more is false; returns every page."""
+    pages = [client.get("/changes/", params={"since": EPOCH, "limit": limit, **params}).json()]
+    while pages[-1]["has_more"]:
+        pages.append(client.get("/changes/", params={"cursor": pages[-1]["cursor"], "limit": limit, **params}).json())
+    return pages
+
+
+def test_pages_advance_through_rows_sharing_one_timestamp(client, make_user):
+    user = make_user("estudiante@semillero.digital")
+    for i in range(30):
+        client.post("/notifications/", json={"user_id": user["id"], "title": f"n{i}"})
+    # One UPDATE gives all 30 rows the same updated_at
+    client.patch("/notifications/bulk/read", json={"user_id": user["id"]})
+
+    pages = _sync(client, limit=10)
+    ids = [n["id"] for page in pages for n in page["notifications"]]
+    assert len(pages) == 3
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 30
+
+
+def test_next_call_only_returns_new_changes(client, course, teacher):
+    first = _sync(client, limit=100)[-1]
+    assert [c["id"] for c in first["courses"]] == [course["id"]]
+
+    client.put(f"/courses/{course['id']}", json={"name": "Renombrado"})
+    again = client.get("/changes/", params={"cursor": first["cursor"]}).json()
+    assert [c["name"] for c in again["courses"]] == ["Renombrado"]
+    assert again["enrollments"] == [] and again["has_more"] is False
+
+
+def test_rows_inside_the_safety_margin_wait_for_the_next_call(client, course, monkeypatch):
+    monkeypatch.setattr(settings, "change_feed_safety_seconds", 3600)
+    assert client.get("/changes/", params={"since": EPOCH}).json()["courses"] == []
+
+
+def test_hard_deletes_arrive_as_tombstones(client, db, make_user, course, enroll):
+    student = make_user("estudiante@semillero.digital")
+    enrollment = enroll(student, course)
+    cursor = _sync(client, limit=100)[-1]["cursor"]
+
+    client.delete(f"/enrollments/{enrollment['id']}")
+    old = datetime.utcnow() - timedelta(days=365)
+    db.add(models.Notification(user_id=student["id"], title="vieja", is_read=True, created_at=old))
+    db.commit()
+    purge_read_notifications(db, older_than_days=90)
+
+    deleted = client.get("/changes/", params={"cursor": cursor}).json()["deleted"]
+    assert {(d["entity"], d["id"]) for d in deleted} >= {("enrollment", enrollment["id"])}
+    assert [d["entity"] for d in deleted].count("notification") == 1
+
+
+def test_user_id_scopes_notifications(client, make_user):
+    a, b = make_user("a@semillero.digital"), make_user("b@semillero.digital")
+    for user in (a, b):
+        client.post("/notifications/", json={"user_id": user["id"], "title": "hola"})
+    feed = client.get("/changes/", params={"since": EPOCH, "user_id": a["id"]}).json()
+    assert {n["user_id"] for n in feed["notifications"]} == {a["id"]}
+
+
+def test_since_or_a_valid_cursor_is_required(client):
+    assert client.get("/changes/").status_code == 422
+    assert client.get("/changes/", params={"cursor": "not-a-cursor"}).status_code == 422
+
+
+def test_feed_reads_the_primary_even_with_a_replica(client, replica, course):
+    # The replica has replayed nothing; a feed read from it would move the cursor past the course
+    feed = client.get("/changes/", params={"since": EPOCH}).json()
+    assert [c["id"] for c in feed["courses"]] == [course["id"]]
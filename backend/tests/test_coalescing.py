@@ -0,0 +1,158 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from backend.app.cache import invalidator
+from backend.app.config import settings
+from backend.app.middleware import CoalescingMiddleware
+
+
+class Downstream:
+    """Fake app: counts calls per (method, path) and answers with a configurable status."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.status = {}
+
+    async def __call__(self, scope, receive, send):
+        key = (scope["method"], scope["path"])
+        self.calls[key] += 1
+        await asyncio.sleep(0.01)
+        status = self.status.get(key, 200)
+        if status is None:
+            raise RuntimeError("handler crashed")
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": f'{{"n":{self.calls[key]}}}'.encode()})
+
+
+@pytest.fixture
+def coalescing(monkeypatch):
+    monkeypatch.setattr(settings, "coalesce_paths", ["/courses/"])
+    monkeypatch.setattr(settings, "coalesce_ttl_ms", 60000)
+    downstream = Downstream()
+    middleware = CoalescingMiddleware(downstream)
+    yield middleware, downstream
+    invalidator._handlers["http.write"].remove(middleware._on_remote_write)
+
+
+async def call(middleware, method, path, headers=()):
+    response = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] = message.get("body", b"")
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"", "headers": list(headers)}
+    try:
+        await middleware(scope, None, send)
+    except RuntimeError:
+        response["status"] = 500
+    return response
+
+
+def test_concurrent_identical_gets_share_one_computation(coalescing):
+    middleware, downstream = coalescing
+
+    async def scenario():
+        return await asyncio.gather(*[call(middleware, "GET", "/courses/") for _ in range(5)])
+
+    responses = asyncio.run(scenario())
+    assert downstream.calls[("GET", "/courses/")] == 1
+    assert {r["body"] for r in responses} == {b'{"n":1}'}
+
+
+def test_successful_write_drops_the_cached_response(coalescing):
+    middleware, downstream = coalescing
+
+    async def scenario():
+        await call(middleware, "GET", "/courses/")
+        await call(middleware, "GET", "/courses/")
+        await call(middleware, "POST", "/courses/")
+        return await call(middleware, "GET", "/courses/")
+
+    assert asyncio.run(scenario())["body"] == b'{"n":2}'
+    assert downstream.calls[("GET", "/courses/")] == 2
+
+
+@pytest.mark.parametrize("method, path, status", [
+    ("POST", "/courses/batch", 200),
+    ("PUT", "/courses/1", 404),
+    ("PUT", "/courses/1", None),
+    ("OPTIONS", "/courses/", 200),
+])
+def test_lookups_and_failed_writes_keep_the_cache(coalescing, method, path, status):
+    middleware, downstream = coalescing
+    downstream.status[(method, path)] = status
+
+    async def scenario():
+        await call(middleware, "GET", "/courses/")
+        await call(middleware, method, path)
+        return await call(middleware, "GET", "/courses/")
+
+    assert asyncio.run(scenario())["body"] == b'{"n":1}'
+
+
+def test_remote_writes_and_unlisted_paths(coalescing):
+    middleware, downstream = coalescing
+
+    async def scenario():
+        await call(middleware, "GET", "/courses/")
+        # Another worker wrote to /enrollments, which affects course counts
+        invalidator.deliver({"origin": "other-worker", "topic": "http.write", "arg": "/enrollments/"})
+        await call(middleware, "GET", "/courses/")
+        await call(middleware, "GET", "/courses/", headers=[(b"x-read-primary", b"1")])
+        await call(middleware, "GET", "/users/batch")
+        await call(middleware, "GET", "/users/batch")
+
+    asyncio.run(scenario())
+    assert downstream.calls[("GET", "/courses/")] == 3
+    assert downstream.calls[("GET", "/users/batch")] == 2
+
+
+@pytest.fixture
+def published(monkeypatch):
+    seen = []
+    monkeypatch.setattr("backend.app.middleware.publish_invalidation", lambda topic, arg=None: seen.append(arg))
+    return seen
+
+
+def test_only_writes_that_can_affect_a_coalesced_path_publish(coalescing, published):
+    middleware, downstream = coalescing
+
+    async def scenario():
+        for path in ("/notifications/", "/announcements/", "/enrollments/", "/assignments/submissions/"):
+            await call(middleware, "POST", path)
+
+    asyncio.run(scenario())
+    # coalesce_paths is ["/courses/"]: notifications and announcements cannot change it
+    assert published == ["/enrollments/", "/assignments/submissions/"]
+
+
+def test_writes_marked_unchanged_do_not_publish(coalescing, published):
+    middleware, downstream = coalescing
+
+    async def unchanged(scope, receive, send):
+        scope.setdefault("state", {})["write_unchanged"] = True
+        await downstream(scope, receive, send)
+
+    middleware.app = unchanged
+    asyncio.run(call(middleware, "POST", "/users/resolve"))
+    assert downstream.calls[("POST", "/users/resolve")] == 1
+    assert published == []
+
+
+def test_resolve_publishes_only_when_it_creates_a_user(client, published):
+    client.post("/users/resolve", json={"email": "estudiante@semillero.digital"})
+    assert published == ["/users/resolve"]
+    for _ in range(3):
+        client.post("/users/resolve", json={"email": "estudiante@semillero.digital"})
+    assert published == ["/users/resolve"]
+
+
+def test_users_me_still_returns_existing_users(client):
+    first = client.get("/users/me", params={"email": "estudiante@semillero.digital"})
+    again = client.get("/users/me", params={"email": "estudiante@semillero.digital"})
+    assert again.status_code == 200 and again.json() == first.json()
@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.app import compression
+from backend.app.compression import StreamCompressor, encode_body, negotiate_encoding
+from backend.app.config import settings
+from backend.app.middleware import CapturedResponse, CompressionMiddleware
+
+ROWS = [{"id": i, "name": f"Programación Web {i}"} for i in range(200)]
+
+
+def _big(request):
+    return JSONResponse(ROWS)
+
+
+def _small(request):
+    return JSONResponse({"ok": True})
+
+
+def _tagged(request):
+    return JSONResponse(ROWS, headers={"ETag": '"v1"'})
+
+
+def _png(request):
+    return Response(b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+
+def _precompressed(request):
+    body = gzip.compress(json.dumps(ROWS).encode())
+    return Response(body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+def _stream(request):
+    return StreamingResponse((json.dumps(row).encode() + b"\n" for row in ROWS), media_type="application/x-ndjson")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    inner = Starlette(routes=[
+        Route("/big", _big), Route("/small", _small), Route("/png", _png),
+        Route("/pre", _precompressed), Route("/stream", _stream), Route("/tagged", _tagged),
+    ])
+    return TestClient(CompressionMiddleware(inner))
+
+
+def test_large_json_is_gzipped(client):
+    r = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert int(r.headers["content-length"]) < len(json.dumps(ROWS))
+    assert r.json() == ROWS
+
+
+def test_identity_when_not_accepted(client):
+    r = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert r.json() == ROWS
+
+
+@pytest.mark.parametrize("path", ["/small", "/png"])
+def test_small_or_binary_bodies_pass_through(client, path):
+    r = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+
+
+def test_already_encoded_bodies_are_not_compressed_twice(client):
+    r = client.get("/pre", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json() == ROWS
+
+
+def test_streamed_responses_are_compressed_incrementally(client):
+    r = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert [json.loads(line) for line in r.text.splitlines()] == ROWS
+
+
+@pytest.mark.parametrize("path,accept", [("/big", "identity"), ("/small", "gzip"), ("/big", "gzip")])
+def test_compressible_responses_always_vary_on_accept_encoding(client, path, accept):
+    assert client.get(path, headers={"Accept-Encoding": accept}).headers["vary"] == "Accept-Encoding"
+
+
+def test_binary_responses_do_not_vary(client):
+    assert "vary" not in client.get("/png", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_compressed_responses_get_a_weak_etag(client):
+    assert client.get("/tagged", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"v1"'
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"v1"'
+
+
+def test_disabled_setting_leaves_responses_alone(client, monkeypatch):
+    monkeypatch.setattr(settings, "response_compression_enabled", False)
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("gzip;q=0, *") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("") is None
+    monkeypatch.setattr(compression, "brotli", object())
+    assert negotiate_encoding("gzip, br") == "br"
+
+
+def test_stream_compressor_matches_whole_body():
+    chunks = [json.dumps(row).encode() for row in ROWS]
+    stream = StreamCompressor("gzip")
+    data = b"".join(stream.compress(chunk) for chunk in chunks) + stream.finish()
+    assert zlib.decompress(data, 31) == b"".join(chunks)
+    assert gzip.decompress(encode_body(b"".join(chunks), "gzip")) == b"".join(chunks)
+
+
+def test_captured_responses_compress_each_encoding_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr("backend.app.middleware.encode_body", lambda body, enc: calls.append(enc) or gzip.compress(body))
+    captured = CapturedResponse()
+    captured.headers = [(b"content-type", b"application/json"), (b"etag", b'"v1"')]
+    captured.body = json.dumps(ROWS).encode()
+
+    def replay(accept):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(captured.replay(send, accept))
+        return dict(sent[0]["headers"]), sent[1]["body"]
+
+    for _ in range(3):
+        headers, body = replay("gzip")
+        assert (headers[b"content-encoding"], headers[b"etag"], headers[b"vary"]) == (b"gzip", b'W/"v1"', b"Accept-Encoding")
+        assert json.loads(gzip.decompress(body)) == ROWS
+    headers, body = replay("")
+    assert b"content-encoding" not in headers and body == captured.body
+    assert (headers[b"etag"], headers[b"vary"]) == (b'"v1"', b"Accept-Encoding")
+    assert calls == ["gzip"]
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+DUE = datetime(2025, 4, 10, 23, 59)
+
+
+@pytest.fixture
+def sources(client, teacher, course, make_user, enroll):
+    second = client.post("/courses/", json={"name": "Bases de Datos", "teacher_id": teacher["id"]}).json()
+    client.post("/assignments/", json={"title": "TP1", "course_id": course["id"], "due_date": DUE.isoformat(), "max_score": 10})
+    client.post("/assignments/", json={"title": "TP2", "course_id": course["id"], "max_score": 20})
+    old = client.post("/assignments/", json={"title": "Viejo", "course_id": course["id"]}).json()
+    client.put(f"/assignments/{old['id']}", json={"is_active": False})
+    enroll(make_user("estudiante@semillero.digital"), course)
+    return course, second
+
+
+def _assignments(client, course_id):
+    return sorted(client.get("/assignments/", params={"course_id": course_id}).json(), key=lambda a: a["title"])
+
+
+def test_courses_and_active_assignments_are_copied(client, teacher, sources):
+    course, second = sources
+    r = client.post("/courses/clone", json={
+        "course_ids": [second["id"], course["id"], course["id"]], "due_date_offset_days": 182, "name_suffix": " (2026-2)",
+    })
+    assert r.status_code == 200
+    results = r.json()
+    assert [(x["source_course_id"], x["assignments"]) for x in results] == [(course["id"], 2), (second["id"], 0)]
+    new_ids = [x["course_id"] for x in results]
+    assert not set(new_ids) & {course["id"], second["id"]}
+
+    copy = client.get(f"/courses/{new_ids[0]}").json()
+    assert (copy["name"], copy["teacher_id"], copy["is_active"]) == ("Programación Web (2026-2)", teacher["id"], True)
+    assert client.get(f"/courses/{new_ids[1]}").json()["name"] == "Bases de Datos (2026-2)"
+
+    tp1, tp2 = _assignments(client, new_ids[0])
+    assert (tp1["title"], tp1["max_score"]) == ("TP1", 10)
+    assert datetime.fromisoformat(tp1["due_date"]) == DUE + timedelta(days=182)
+    assert (tp2["title"], tp2["due_date"], tp2["max_score"]) == ("TP2", None, 20)
+    # The source course is untouched and nobody is enrolled in the copy
+    assert [a["title"] for a in _assignments(client, course["id"])] == ["TP1", "TP2"]
+    assert client.get("/enrollments/", params={"course_id": new_ids[0]}).json() == []
+
+
+def test_teacher_override(client, make_user, sources):
+    course, _ = sources
+    other = make_user("otra.docente@semillero.digital")
+    [result] = client.post("/courses/clone", json={"course_ids": [course["id"]], "teacher_id": other["id"]}).json()
+    copy = client.get(f"/courses/{result['course_id']}").json()
+    assert (copy["name"], copy["teacher_id"]) == ("Programación Web", other["id"])
+
+
+def test_unknown_courses_or_teacher_clone_nothing(client, sources):
+    course, _ = sources
+    before = len(client.get("/courses/").json())
+    r = client.post("/courses/clone", json={"course_ids": [course["id"], 999]})
+    assert r.status_code == 404 and "999" in r.json()["detail"]
+    assert client.post("/courses/clone", json={"course_ids": [course["id"]], "teacher_id": 999}).status_code == 404
+    assert len(client.get("/courses/").json()) == before
+    assert client.post("/courses/clone", json={"course_ids": []}).json() == []
+
+
+def test_each_copy_gets_its_own_source_assignments(client, teacher, sources):
+    course, second = sources
+    client.post("/assignments/", json={"title": "Consultas", "course_id": second["id"]})
+    results = client.post("/courses/clone", json={"course_ids": [second["id"], course["id"]]}).json()
+    for result in results:
+        source_titles = [a["title"] for a in _assignments(client, result["source_course_id"])]
+        assert [a["title"] for a in _assignments(client, result["course_id"])] == source_titles
+        assert client.get(f"/courses/{result['course_id']}").json()["name"] == \
+            client.get(f"/courses/{result['source_course_id']}").json()["name"]
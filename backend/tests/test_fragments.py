@@ -0,0 +1,72 @@
+import json
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from backend.app import models
+from backend.app.config import settings
+from backend.app.fragments import (
+    COURSE_FRAGMENT,
+    ENROLLMENT_ROW,
+    FRAGMENT_CACHE,
+    SUBMISSION_SUMMARY_ROW,
+    render_list,
+)
+from backend.app.schemas import CourseRead, EnrollmentRead, SubmissionSummary
+
+
+@pytest.fixture
+def rows(client, make_user, course, enroll):
+    students = [make_user(f"estudiante{i}@semillero.digital") for i in range(3)]
+    assignment = client.post("/assignments/", json={"title": "TP1", "course_id": course["id"], "max_score": 10}).json()
+    for student in students:
+        enroll(student, course)
+        client.post("/assignments/submissions/", json={"assignment_id": assignment["id"], "student_id": student["id"]})
+    return students
+
+
+@pytest.mark.parametrize("spec,schema,model", [
+    (COURSE_FRAGMENT, CourseRead, models.Course),
+    (ENROLLMENT_ROW, EnrollmentRead, models.Enrollment),
+    (SUBMISSION_SUMMARY_ROW, SubmissionSummary, models.Submission),
+])
+def test_same_json_as_the_response_model(db, rows, spec, schema, model):
+    objects = db.query(model).all()
+    adapter = TypeAdapter(List[schema])
+    expected = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    # Cold, then warm from the fragment cache
+    assert json.loads(render_list(spec, objects)) == expected
+    assert json.loads(render_list(spec, objects)) == expected
+
+
+def test_embedded_objects_are_reused_from_the_cache(client, course, rows):
+    FRAGMENT_CACHE.invalidate()
+    client.get("/enrollments/", params={"course_id": course["id"]})
+    # One course, its teacher and three students, however many rows embed them
+    assert len(FRAGMENT_CACHE._data) == 5
+
+
+def test_changed_rows_and_counts_are_not_served_stale(client, db, make_user, course, rows, enroll):
+    client.get("/courses/")
+    client.get("/enrollments/", params={"course_id": course["id"]})
+
+    other = make_user("otra.docente@semillero.digital")
+    db.get(models.Course, course["id"]).teacher_id = other["id"]
+    db.get(models.User, rows[0]["id"]).email = "ana.perez@semillero.digital"
+    db.commit()
+    enroll(make_user("nuevo@semillero.digital"), course)
+
+    [listed] = client.get("/courses/").json()
+    assert (listed["teacher"]["email"], listed["enrollment_count"]) == ("otra.docente@semillero.digital", 4)
+    enrollments = client.get("/enrollments/", params={"course_id": course["id"]}).json()
+    assert {e["course"]["teacher_id"] for e in enrollments} == {other["id"]}
+    assert {e["student"]["id"]: e["student"]["email"] for e in enrollments}[rows[0]["id"]] == "ana.perez@semillero.digital"
+
+
+def test_disabled_cache_renders_the_same(client, course, rows, monkeypatch):
+    warm = client.get("/enrollments/", params={"course_id": course["id"]}).json()
+    monkeypatch.setattr(settings, "fragment_cache_enabled", False)
+    FRAGMENT_CACHE.invalidate()
+    assert client.get("/enrollments/", params={"course_id": course["id"]}).json() == warm
+    assert len(FRAGMENT_CACHE._data) == 0
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import models
+
+START = datetime(2025, 3, 3, 9, 0, 0)
+
+
+@pytest.fixture
+def queue(db, make_user, teacher, course):
+    other = make_user("otra.docente@semillero.digital")
+    students = [make_user(f"estudiante{i}@semillero.digital")["id"] for i in range(5)]
+    archived = models.Course(name="Archivado", teacher_id=teacher["id"], is_active=False)
+    foreign = models.Course(name="Ajeno", teacher_id=other["id"])
+    db.add_all([archived, foreign])
+    db.flush()
+    assignments = {
+        name: models.Assignment(title=name, course_id=course_id, is_active=active)
+        for name, course_id, active in (
+            ("a1", course["id"], True), ("a2", course["id"], True), ("oculta", course["id"], False),
+            ("archivada", archived.id, True), ("ajena", foreign.id, True),
+        )
+    }
+    db.add_all(assignments.values())
+    db.flush()
+    expected = []
+    for i, student_id in enumerate(students):
+        # Pairs of submissions share a timestamp, so pages must break ties by id
+        at = START + timedelta(minutes=i // 2)
+        for name in ("a1", "a2"):
+            submission = models.Submission(assignment_id=assignments[name].id, student_id=student_id, submitted_at=at)
+            db.add(submission)
+            db.flush()
+            expected.append(submission.id)
+        for name in ("oculta", "archivada", "ajena"):
+            db.add(models.Submission(assignment_id=assignments[name].id, student_id=student_id, submitted_at=at))
+        db.add(models.Submission(assignment_id=assignments["a1"].id, student_id=student_id, submitted_at=at, score=7))
+    db.commit()
+    return expected
+
+
+def test_pages_cover_the_queue_once_in_order(client, teacher, queue):
+    ids, params = [], {"teacher_id": teacher["id"], "limit": 3}
+    while True:
+        page = client.get("/assignments/grading-queue", params=params).json()
+        ids.extend(item["id"] for item in page["items"])
+        if page["next_after_id"] is None:
+            break
+        params.update(after_submitted_at=page["next_after_submitted_at"], after_id=page["next_after_id"])
+    # Four rows share each timestamp, so a page of three ends inside a tie
+    assert ids == queue
+
+
+def test_course_filter_and_other_teachers(client, teacher, course, queue):
+    page = client.get("/assignments/grading-queue", params={"teacher_id": teacher["id"], "course_id": course["id"]}).json()
+    assert {item["id"] for item in page["items"]} == set(queue)
+    assert page["items"][0]["assignment"]["title"] in ("a1", "a2")
+    nobody = client.get("/assignments/grading-queue", params={"teacher_id": 999}).json()
+    assert nobody == {"items": [], "next_after_submitted_at": None, "next_after_id": None}
+
+
+def test_grading_removes_a_submission_from_the_queue(client, teacher, queue):
+    client.put(f"/assignments/submissions/{queue[0]}", json={"score": 9})
+    page = client.get("/assignments/grading-queue", params={"teacher_id": teacher["id"], "limit": 500}).json()
+    assert [item["id"] for item in page["items"]] == queue[1:]
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import jobs, models
+from backend.app.config import settings
+from backend.app.jobs import claim_next, enqueue, run_next
+
+WORKER = "tests:worker"
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+
+    def echo(db, payload):
+        calls.append(payload)
+        return {"echo": payload.get("value")}
+
+    def broken(db, payload):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs.HANDLERS, "tests.echo", echo)
+    monkeypatch.setitem(jobs.HANDLERS, "tests.broken", broken)
+    return calls
+
+
+def test_job_runs_and_stores_its_result(client, handlers):
+    job = client.post("/jobs/", json={"kind": "tests.echo", "payload": {"value": 7}}).json()
+    assert job["status"] == "queued"
+    assert run_next(WORKER) is True
+    done = client.get(f"/jobs/{job['id']}").json()
+    assert (done["status"], done["attempts"], done["result"]) == ("done", 1, {"echo": 7})
+    assert run_next(WORKER) is False
+
+
+def test_unknown_kind_is_rejected(client):
+    assert client.post("/jobs/", json={"kind": "tests.nope"}).status_code == 400
+
+
+def test_failures_back_off_then_fail_and_manual_retry_runs_now(client, db, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "job_retry_base_seconds", 600)
+    job = client.post("/jobs/", json={"kind": "tests.broken", "max_attempts": 2}).json()
+
+    run_next(WORKER)
+    queued = client.get(f"/jobs/{job['id']}").json()
+    assert queued["status"] == "queued" and "boom" in queued["last_error"]
+    assert datetime.fromisoformat(queued["run_at"]) > datetime.utcnow() + timedelta(seconds=500)
+    assert run_next(WORKER) is False  # still backing off
+
+    db.query(models.Job).filter(models.Job.id == job["id"]).update({models.Job.run_at: datetime.utcnow()})
+    db.commit()
+    run_next(WORKER)
+    assert client.get(f"/jobs/{job['id']}").json()["status"] == "failed"
+
+    # A retry must not inherit a pending backoff
+    db.query(models.Job).filter(models.Job.id == job["id"]).update({models.Job.run_at: datetime.utcnow() + timedelta(hours=1)})
+    db.commit()
+    monkeypatch.setitem(jobs.HANDLERS, "tests.broken", lambda db, payload: {"fixed": True})
+    retried = client.post(f"/jobs/{job['id']}/retry").json()
+    assert (retried["status"], retried["attempts"]) == ("queued", 0)
+    assert run_next(WORKER) is True
+    assert client.get(f"/jobs/{job['id']}").json()["result"] == {"fixed": True}
+
+
+def test_only_failed_jobs_can_be_retried(client, handlers):
+    job = client.post("/jobs/", json={"kind": "tests.echo"}).json()
+    assert client.post(f"/jobs/{job['id']}/retry").status_code == 400
+
+
+def test_unique_key_keeps_one_pending_job(db, handlers):
+    assert enqueue(db, "tests.echo", unique_key="k") is not None
+    assert enqueue(db, "tests.echo", unique_key="k") is None
+    db.commit()
+    assert db.query(models.Job).count() == 1
+
+
+def test_jobs_of_dead_workers_are_reclaimed(db, handlers, monkeypatch):
+    enqueue(db, "tests.echo")
+    db.commit()
+    assert claim_next(db, "dead:worker") is not None
+    assert claim_next(db, WORKER) is None
+    monkeypatch.setattr(settings, "job_lock_timeout_seconds", -1)
+    reclaimed = claim_next(db, WORKER)
+    assert reclaimed.locked_by == WORKER and reclaimed.attempts == 2
+
+
+def test_periodic_job_schedules_its_next_run(db, handlers, monkeypatch):
+    monkeypatch.setattr(jobs, "PERIODIC", {"tests.echo": lambda: 60})
+    jobs.ensure_periodic_jobs(db)
+    jobs.ensure_periodic_jobs(db)
+    assert db.query(models.Job).filter(models.Job.kind == "tests.echo").count() == 1
+    run_next(WORKER)
+    db.expire_all()
+    pending = db.query(models.Job).filter(models.Job.kind == "tests.echo", models.Job.status == "queued").one()
+    assert pending.run_at > datetime.utcnow() + timedelta(seconds=30)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.app.config import settings
+from backend.app.middleware import LoadSheddingMiddleware
+
+
+def _ok(request):
+    return PlainTextResponse("ok")
+
+
+@pytest.fixture
+def shedding(monkeypatch):
+    monkeypatch.setattr(settings, "load_shedding_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_per_second", 0.01)
+    monkeypatch.setattr(settings, "rate_limit_burst", 2)
+    inner = Starlette(routes=[Route("/courses/", _ok), Route("/health", _ok)])
+    return TestClient(LoadSheddingMiddleware(inner))
+
+
+def test_empty_bucket_gets_429_with_retry_after(shedding):
+    assert [shedding.get("/courses/").status_code for _ in range(2)] == [200, 200]
+    r = shedding.get("/courses/")
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) >= 1
+    assert shedding.get("/health").status_code == 200
+
+
+def test_client_chosen_ids_do_not_get_their_own_bucket(shedding):
+    statuses = [
+        shedding.get("/courses/", params={"user_id": i}, headers={"X-User-Id": str(i), "X-Forwarded-For": f"10.1.0.{i}"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_forwarded_for_is_used_behind_a_trusted_proxy(shedding, monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_ips", ["testclient"])
+    statuses = [
+        shedding.get("/courses/", headers={"X-Forwarded-For": f"10.1.0.{i}"}).status_code for i in range(3)
+    ]
+    assert statuses == [200, 200, 200]
+
+
+def test_disabled_by_default():
+    assert settings.load_shedding_enabled is False
+
+
+def test_route_group_waits_then_sheds_with_503(monkeypatch):
+    monkeypatch.setattr(settings, "load_shedding_enabled", True)
+    monkeypatch.setattr(settings, "route_concurrency_limits", {"/reports": 1})
+    monkeypatch.setattr(settings, "shed_queue_timeout_ms", 20)
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = LoadSheddingMiddleware(slow_app)
+
+    async def request(address):
+        statuses = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        scope = {"type": "http", "method": "GET", "path": "/reports/progress", "headers": [], "client": (address, 1)}
+        await middleware(scope, None, send)
+        return statuses[0]
+
+    async def scenario():
+        first = asyncio.ensure_future(request("10.0.0.1"))
+        await asyncio.sleep(0)
+        second = await request("10.0.0.2")
+        release.set()
+        return await first, second
+
+    assert asyncio.run(scenario()) == (200, 503)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app.routers.reports import MISSING_CACHE
+
+
+@pytest.fixture
+def setup(client, make_user, course, enroll):
+    students = [make_user(f"estudiante{i}@semillero.digital") for i in range(3)]
+    for student in students:
+        enroll(student, course)
+    past = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    overdue = client.post("/assignments/", json={"title": "vencida", "course_id": course["id"], "due_date": past}).json()
+    upcoming = client.post("/assignments/", json={"title": "abierta", "course_id": course["id"]}).json()
+    client.post("/assignments/submissions/", json={"assignment_id": overdue["id"], "student_id": students[0]["id"]})
+    return students, overdue, upcoming
+
+
+def _pairs(page):
+    return {(i["assignment_id"], i["student_id"]) for i in page["items"]}
+
+
+def test_assignment_report_lists_students_without_a_submission(client, setup):
+    students, overdue, _ = setup
+    page = client.get(f"/reports/assignments/{overdue['id']}/missing").json()
+    assert page["total"] == 2
+    assert _pairs(page) == {(overdue["id"], s["id"]) for s in students[1:]}
+    assert all(i["is_overdue"] for i in page["items"])
+
+
+def test_course_report_and_overdue_filter(client, setup, course):
+    students, overdue, upcoming = setup
+    page = client.get(f"/reports/courses/{course['id']}/missing").json()
+    assert page["total"] == 5
+    overdue_only = client.get(f"/reports/courses/{course['id']}/missing", params={"overdue_only": True}).json()
+    assert {i["assignment_id"] for i in overdue_only["items"]} == {overdue["id"]}
+    limited = client.get(f"/reports/courses/{course['id']}/missing", params={"skip": 4, "limit": 10}).json()
+    assert (limited["total"], len(limited["items"])) == (5, 1)
+
+
+def test_cached_reports_follow_submissions_enrollments_and_assignments(client, setup, course, make_user, enroll):
+    students, overdue, upcoming = setup
+    url = f"/reports/courses/{course['id']}/missing"
+    assert client.get(url).json()["total"] == 5
+
+    client.post("/assignments/submissions/", json={"assignment_id": upcoming["id"], "student_id": students[1]["id"]})
+    assert client.get(url).json()["total"] == 4
+
+    enroll(make_user("nuevo@semillero.digital"), course)
+    assert client.get(url).json()["total"] == 6
+
+    client.delete(f"/assignments/{upcoming['id']}")
+    assert client.get(url).json()["total"] == 3
+
+
+def test_unknown_ids_are_404(client):
+    assert client.get("/reports/assignments/999/missing").status_code == 404
+    assert client.get("/reports/courses/999/missing").status_code == 404
+
+
+def test_reports_are_read_from_the_primary(client, setup, course, replica):
+    students, overdue, _ = setup
+    # The replica has replayed nothing; caching its answer would hide every write for minutes
+    assert client.get(f"/reports/assignments/{overdue['id']}/missing").json()["total"] == 2
+    client.post("/assignments/submissions/", json={"assignment_id": overdue["id"], "student_id": students[1]["id"]})
+    assert client.get(f"/reports/courses/{course['id']}/missing").json()["total"] == 4
+
+
+def test_cached_rows_are_bounded(client, setup, course, monkeypatch):
+    _, overdue, _ = setup
+    monkeypatch.setattr(MISSING_CACHE, "max_weight", 4)
+    client.get(f"/reports/assignments/{overdue['id']}/missing")
+    # The course-wide report (5 rows) is over the budget and is not kept
+    client.get(f"/reports/courses/{course['id']}/missing")
+    assert ("course", course["id"], None) not in MISSING_CACHE._data
+    assert ("assignment", course["id"], overdue["id"]) in MISSING_CACHE._data
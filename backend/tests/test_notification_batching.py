@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from backend.app import batching
+from backend.app.batching import NotificationBatcher
+from backend.app.config import settings
+from backend.app.schemas import NotificationRead
+
+
+@pytest.fixture
+def commits():
+    # SQLite gets one INSERT per row (no ordered multi-row RETURNING there),
+    # so count transactions rather than statements
+    seen = []
+
+    def capture(conn):
+        seen.append(conn)
+
+    event.listen(Engine, "commit", capture)
+    yield seen
+    event.remove(Engine, "commit", capture)
+
+
+def _run(batcher, rows):
+    # Queue everything before the writer starts so it lands in one batch
+    futures = [batcher.submit(values) for values in rows]
+    batcher.start()
+    try:
+        return [f.exception(timeout=5) or f.result() for f in futures]
+    finally:
+        batcher.stop()
+
+
+def test_a_burst_is_written_in_one_transaction(make_user, commits):
+    user = make_user("estudiante@semillero.digital")
+    commits.clear()
+    results = _run(NotificationBatcher(flush_ms=50), [{"user_id": user["id"], "title": f"n{i}"} for i in range(20)])
+    assert [r.title for r in results] == [f"n{i}" for i in range(20)]
+    assert len({r.id for r in results}) == 20
+    assert len(commits) == 1
+
+
+def test_max_rows_splits_batches(make_user, commits):
+    user = make_user("estudiante@semillero.digital")
+    commits.clear()
+    _run(NotificationBatcher(max_rows=8, flush_ms=50), [{"user_id": user["id"], "title": "n"}] * 20)
+    assert len(commits) == 3
+
+
+def test_each_caller_gets_its_own_outcome(make_user):
+    user = make_user("estudiante@semillero.digital")
+    ok, missing, broken = _run(NotificationBatcher(flush_ms=50), [
+        {"user_id": user["id"], "title": "ok"},
+        {"user_id": 999, "title": "nadie"},
+        {"user_id": user["id"], "title": None},
+    ])
+    assert ok.title == "ok"
+    assert isinstance(missing, LookupError)
+    assert isinstance(broken, IntegrityError)
+
+
+def test_submit_after_stop_fails():
+    batcher = NotificationBatcher()
+    batcher.start()
+    batcher.stop()
+    with pytest.raises(RuntimeError):
+        batcher.submit({"user_id": 1, "title": "tarde"}).result(timeout=1)
+
+
+def test_endpoint_with_batching_enabled(client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "notification_batching_enabled", True)
+    user = make_user("estudiante@semillero.digital")
+    try:
+        r = client.post("/notifications/", json={"user_id": user["id"], "title": "hola"})
+        assert r.status_code == 200 and r.json()["id"] > 0
+        assert client.post("/notifications/", json={"user_id": 999, "title": "hola"}).status_code == 404
+    finally:
+        batching.stop_notification_batcher()
+    assert [n["title"] for n in client.get("/notifications/", params={"user_id": user["id"]}).json()] == ["hola"]
+
+
+def test_cancelled_rows_are_never_written(client, make_user):
+    user = make_user("estudiante@semillero.digital")
+    batcher = NotificationBatcher(flush_ms=50)
+    kept = batcher.submit({"user_id": user["id"], "title": "queda"})
+    dropped = batcher.submit({"user_id": user["id"], "title": "cancelada"})
+    assert dropped.cancel()
+    batcher.start()
+    try:
+        assert kept.result(timeout=5).title == "queda"
+    finally:
+        batcher.stop()
+    assert [n["title"] for n in client.get("/notifications/", params={"user_id": user["id"]}).json()] == ["queda"]
+
+
+class StalledBatcher:
+    """Hands out futures the test resolves itself."""
+
+    def __init__(self, running=False, outcome=None):
+        self.running, self.outcome = running, outcome
+        self.futures = []
+
+    def submit(self, values):
+        future = Future()
+        self.futures.append(future)
+        if self.running:
+            future.set_running_or_notify_cancel()
+            threading.Timer(0.1, self.outcome, args=(future,)).start()
+        return future
+
+
+@pytest.fixture
+def batched(monkeypatch):
+    monkeypatch.setattr(settings, "notification_batching_enabled", True)
+    monkeypatch.setattr(settings, "notification_batch_timeout_seconds", 0.05)
+
+    def use(batcher):
+        monkeypatch.setattr("backend.app.routers.notifications.get_notification_batcher", lambda: batcher)
+    return use
+
+
+def test_timeout_while_queued_is_503_and_cancels_the_row(client, make_user, batched):
+    user = make_user("estudiante@semillero.digital")
+    batcher = StalledBatcher()
+    batched(batcher)
+    r = client.post("/notifications/", json={"user_id": user["id"], "title": "hola"})
+    assert r.status_code == 503
+    assert batcher.futures[0].cancelled()
+
+
+def test_timeout_while_being_written_waits_for_the_outcome(client, make_user, batched):
+    user = make_user("estudiante@semillero.digital")
+    row = NotificationRead(id=41, user_id=user["id"], title="hola", category="general", is_read=False,
+                           created_at=datetime.utcnow(), updated_at=datetime.utcnow())
+    batched(StalledBatcher(running=True, outcome=lambda f: f.set_result(row)))
+    r = client.post("/notifications/", json={"user_id": user["id"], "title": "hola"})
+    assert (r.status_code, r.json()["id"]) == (200, 41)
+
+
+def test_constraint_failures_are_409(client, make_user, batched):
+    user = make_user("estudiante@semillero.digital")
+    error = IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+    batched(StalledBatcher(running=True, outcome=lambda f: f.set_exception(error)))
+    assert client.post("/notifications/", json={"user_id": user["id"], "title": "hola"}).status_code == 409
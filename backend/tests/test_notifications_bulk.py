@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.fixture
+def inbox(client, make_user):
+    owner = make_user("estudiante@semillero.digital")
+    other = make_user("otro@semillero.digital")
+    ids = [
+        client.post("/notifications/", json={"user_id": owner["id"], "title": f"n{i}", "category": category}).json()["id"]
+        for i, category in enumerate(["general", "general", "deadline"])
+    ]
+    foreign = client.post("/notifications/", json={"user_id": other["id"], "title": "other"}).json()["id"]
+    return owner, ids, foreign
+
+
+def _read_flags(client, user_id):
+    return {n["id"]: n["is_read"] for n in client.get("/notifications/", params={"user_id": user_id}).json()}
+
+
+def test_bulk_mark_read_by_ids_only_touches_the_owner(client, inbox):
+    owner, ids, foreign = inbox
+    r = client.patch("/notifications/bulk/read", json={"user_id": owner["id"], "ids": [ids[0], foreign]})
+    assert r.json() == {"affected": 1}
+    assert _read_flags(client, owner["id"]) == {ids[0]: True, ids[1]: False, ids[2]: False}
+    assert client.get(f"/notifications/batch?ids={foreign}").json()[0]["is_read"] is False
+
+
+def test_bulk_mark_read_skips_rows_already_in_that_state(client, inbox):
+    owner, ids, _ = inbox
+    client.patch("/notifications/bulk/read", json={"user_id": owner["id"], "category": "deadline"})
+    r = client.patch("/notifications/bulk/read", json={"user_id": owner["id"]})
+    assert r.json() == {"affected": 2}
+    assert client.patch("/notifications/bulk/read", json={"user_id": owner["id"], "ids": []}).json() == {"affected": 0}
+
+
+def test_bulk_delete_filters_by_read_state(client, inbox):
+    owner, ids, _ = inbox
+    client.patch("/notifications/bulk/read", json={"user_id": owner["id"], "ids": [ids[1]]})
+    r = client.post("/notifications/bulk/delete", json={"user_id": owner["id"], "is_read": True})
+    assert r.json() == {"affected": 1}
+    assert sorted(_read_flags(client, owner["id"])) == [ids[0], ids[2]]
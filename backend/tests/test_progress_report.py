@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def students(client, make_user, course, enroll):
+    students = [make_user(f"estudiante{i}@semillero.digital") for i in range(3)]
+    for student in students:
+        enroll(student, course)
+    past = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    overdue = client.post("/assignments/", json={"title": "a1", "course_id": course["id"], "due_date": past, "max_score": 10}).json()
+    open_ = client.post("/assignments/", json={"title": "a2", "course_id": course["id"], "max_score": 10}).json()
+    for assignment, score in ((overdue, 5), (open_, 10)):
+        client.post("/assignments/submissions/", json={
+            "assignment_id": assignment["id"], "student_id": students[0]["id"], "score": score,
+        })
+    return students
+
+
+def test_counts_per_student_and_course(client, students, course):
+    r = client.get("/reports/progress", params={"course_id": course["id"]})
+    assert r.status_code == 200
+    items = {i["student_id"]: i for i in r.json()["items"]}
+    first, second = items[students[0]["id"]], items[students[1]["id"]]
+    assert (first["assigned"], first["submitted"], first["graded"], first["missing"]) == (2, 2, 2, 0)
+    assert first["average_score"] == pytest.approx(0.75)
+    assert (second["submitted"], second["missing"], second["average_score"]) == (0, 1, None)
+    assert r.json()["next_after_student_id"] is None
+
+
+def test_pages_by_student_id(client, students):
+    first = client.get("/reports/progress", params={"limit": 2}).json()
+    assert [i["student_id"] for i in first["items"]] == [s["id"] for s in students[:2]]
+    assert first["next_after_student_id"] == students[1]["id"]
+    rest = client.get("/reports/progress", params={"limit": 2, "after_student_id": first["next_after_student_id"]}).json()
+    assert [i["student_id"] for i in rest["items"]] == [students[2]["id"]]
+    assert rest["next_after_student_id"] is None
+
+
+def test_empty_report_is_valid_json(client):
+    assert client.get("/reports/progress").json() == {"items": [], "next_after_student_id": None}
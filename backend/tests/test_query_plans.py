@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.app import models
+from backend.app.main import app
+from backend.scripts import query_plans
+from backend.scripts.query_plans import StatementRecorder, diff_against, plan_flags, plan_shape
+
+PLAN = {
+    "Node Type": "Sort",
+    "Sort Space Type": "Disk",
+    "Sort Space Used": 5120,
+    "Plans": [
+        {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "notifications", "Filter": "(user_id = 7)"},
+                {
+                    "Node Type": "Hash",
+                    "Hash Batches": 4,
+                    "Plans": [{"Node Type": "Index Scan", "Relation Name": "users", "Index Name": "users_pkey"}],
+                },
+            ],
+        }
+    ],
+}
+
+
+def test_plan_shape_keeps_only_stable_parts():
+    assert plan_shape(PLAN) == [
+        "Sort",
+        "  Hash Join",
+        "    Seq Scan on notifications",
+        "    Hash",
+        "      Index Scan on users using users_pkey",
+    ]
+
+
+def test_plan_flags_only_count_large_tables():
+    assert plan_flags(PLAN, {"notifications": 50000}, large_rows=10000) == [
+        "sort spilled to disk (5120 kB)",
+        "missing index? seq scan on notifications filtered by (user_id = 7)",
+        "hash spilled to disk (4 batches)",
+    ]
+    assert plan_flags(PLAN, {"notifications": 50}, large_rows=10000) == [
+        "sort spilled to disk (5120 kB)",
+        "hash spilled to disk (4 batches)",
+    ]
+
+
+def test_diff_against_reports_new_gone_changed_and_flagged():
+    entry = {"sql": "SELECT 1", "plan": ["Index Scan on users"], "flags": []}
+    baseline = {"GET /a #1": entry, "GET /b #1": entry, "GET /c #1": entry}
+    current = {
+        "GET /a #1": entry,
+        "GET /b #1": {"sql": "SELECT 1", "plan": ["Seq Scan on users"], "flags": ["seq scan on large table users"]},
+        "GET /d #1": entry,
+    }
+    lines = diff_against(baseline, current)
+    assert "~ plan changed GET /b #1" in lines
+    assert "    -Index Scan on users" in lines and "    +Seq Scan on users" in lines
+    assert "! new flag GET /b #1: seq scan on large table users" in lines
+    assert "- query gone GET /c #1: SELECT 1" in lines
+    assert "+ new query GET /d #1: SELECT 1" in lines
+    assert not any("GET /a" in line for line in lines)
+    assert diff_against(baseline, baseline) == []
+
+
+def test_statement_recorder_keeps_selects_while_recording(db):
+    recorder = StatementRecorder()
+    try:
+        db.query(models.User).all()
+        recorder.recording = True
+        db.add(models.User(email="docente@semillero.digital", role="teacher"))
+        db.commit()
+        db.query(models.Course).all()
+        recorder.recording = False
+        statements = [statement for statement, _ in recorder.take()]
+    finally:
+        event.remove(Engine, "before_cursor_execute", recorder._capture)
+    assert len(statements) == 1 and "FROM courses" in statements[0]
+    assert recorder.take() == []
+
+
+def test_route_queries_name_existing_get_routes():
+    paths = {r.path for r in app.routes if isinstance(r, APIRoute) and "GET" in r.methods}
+    assert set(query_plans.ROUTE_QUERIES) <= paths
+
+
+def test_flags_do_not_change_with_the_constants_of_a_run():
+    def scan(since):
+        return {"Node Type": "Seq Scan", "Relation Name": "enrollments",
+                "Filter": f"((updated_at > '{since}'::timestamp) AND (course_id = ANY ('{{1,2}}'::integer[])))"}
+
+    rows = {"enrollments": 50000}
+    first = plan_flags(scan("2026-10-12 13:52:13"), rows, large_rows=10000)
+    assert first == plan_flags(scan("2026-10-19 08:00:00"), rows, large_rows=10000)
+    assert first == ["missing index? seq scan on enrollments filtered by ((updated_at > ?::timestamp) AND (course_id = ANY (?::integer[])))"]
+
+
+def test_missing_baseline_fails(monkeypatch, tmp_path):
+    engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    monkeypatch.setattr(query_plans, "get_engine", lambda: engine)
+    monkeypatch.setattr(query_plans, "init_db", lambda: None)
+    monkeypatch.setattr(query_plans, "snapshot", lambda large_rows, only=None: {})
+    with pytest.raises(SystemExit) as exc:
+        query_plans.main(["--baseline", str(tmp_path / "missing.json")])
+    assert exc.value.code == 2
@@ -0,0 +1,45 @@
+from backend.app import db as db_module
+from backend.app.config import settings
+from backend.app.db import ReadSessionLocal, get_engine, mark_replica_down
+
+
+def test_reads_go_to_the_replica_unless_the_client_asks_for_the_primary(client, replica, course):
+    assert client.get("/courses/").json() == []
+    r = client.get("/courses/", headers={"X-Read-Primary": "1"})
+    assert [c["id"] for c in r.json()] == [course["id"]]
+
+
+def test_unreachable_replica_falls_back_to_the_primary(tmp_path, monkeypatch, replica):
+    monkeypatch.setattr(settings, "read_database_url", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    session = ReadSessionLocal()
+    try:
+        assert session.get_bind() is get_engine()
+    finally:
+        session.close()
+
+
+def test_marked_down_replica_is_skipped_until_the_next_check(replica):
+    first = ReadSessionLocal()
+    assert first.get_bind() is not get_engine()
+    first.close()
+    mark_replica_down()
+    second = ReadSessionLocal()
+    try:
+        assert second.get_bind() is get_engine()
+    finally:
+        second.close()
+
+
+def test_visible_announcements_cache_is_filled_from_the_primary(client, replica):
+    client.post("/announcements/", json={"title": "Bienvenida"})
+    assert [a["title"] for a in client.get("/announcements/visible").json()] == ["Bienvenida"]
+
+
+def test_replica_engine_is_not_created_without_a_url():
+    assert not settings.read_database_url
+    session = ReadSessionLocal()
+    try:
+        assert session.get_bind() is get_engine()
+    finally:
+        session.close()
+    assert db_module._read_engine is None
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import models
+from backend.app.retention import purge_read_notifications
+
+
+@pytest.fixture
+def notifications(db, make_user):
+    user_id = make_user("estudiante@semillero.digital")["id"]
+    old = datetime.utcnow() - timedelta(days=120)
+    recent = datetime.utcnow() - timedelta(days=5)
+    rows = [
+        models.Notification(user_id=user_id, title="old read", is_read=True, created_at=old),
+        models.Notification(user_id=user_id, title="old read 2", is_read=True, created_at=old),
+        models.Notification(user_id=user_id, title="old unread", is_read=False, created_at=old),
+        models.Notification(user_id=user_id, title="recent read", is_read=True, created_at=recent),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _titles(db, model):
+    return sorted(title for (title,) in db.query(model.title))
+
+
+def test_archive_moves_only_old_read_notifications(db, notifications):
+    removed = purge_read_notifications(db, older_than_days=90, batch_size=1, mode="archive")
+
+    assert removed == 2
+    assert _titles(db, models.Notification) == ["old unread", "recent read"]
+    assert _titles(db, models.NotificationArchive) == ["old read", "old read 2"]
+    archived = db.query(models.NotificationArchive).first()
+    assert archived.archived_at is not None
+
+
+def test_delete_mode_does_not_archive(db, notifications):
+    assert purge_read_notifications(db, older_than_days=90, mode="delete") == 2
+    assert db.query(models.NotificationArchive).count() == 0
+    assert db.query(models.Notification).count() == 2
+
+
+def test_max_batches_bounds_one_run(db, notifications):
+    assert purge_read_notifications(db, older_than_days=90, batch_size=1, max_batches=1) == 1
+    assert purge_read_notifications(db, older_than_days=90, batch_size=1) == 1
+
+
+def test_unknown_mode_is_rejected(db):
+    with pytest.raises(ValueError):
+        purge_read_notifications(db, mode="shred")
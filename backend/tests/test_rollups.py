@@ -0,0 +1,116 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend.app import models
+from backend.app.config import settings
+from backend.app.rollups import refresh_activity_rollups
+
+TODAY = datetime.utcnow().date()
+MONDAY = TODAY - timedelta(days=TODAY.weekday()) - timedelta(weeks=1)
+# Two days of last week, so both land in the same weekly bucket
+DAY1, DAY2 = MONDAY + timedelta(days=1), MONDAY + timedelta(days=2)
+
+
+def at(day: date, hour: int) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+
+
+@pytest.fixture(autouse=True)
+def no_safety_margin(monkeypatch):
+    monkeypatch.setattr(settings, "rollup_safety_seconds", 0)
+
+
+@pytest.fixture
+def submissions(db, make_user, course):
+    students = [make_user(f"estudiante{i}@semillero.digital")["id"] for i in range(3)]
+    assignment = models.Assignment(title="Proyecto", course_id=course["id"], due_date=at(DAY1, 12), max_score=10)
+    db.add(assignment)
+    db.flush()
+    rows = [
+        models.Submission(assignment_id=assignment.id, student_id=students[0], submitted_at=at(DAY1, 9), score=8),
+        models.Submission(assignment_id=assignment.id, student_id=students[1], submitted_at=at(DAY1, 18)),
+        models.Submission(assignment_id=assignment.id, student_id=students[2], submitted_at=at(DAY2, 9)),
+    ]
+    db.add_all(rows)
+    db.commit()
+    refresh_activity_rollups(db)
+    return rows
+
+
+def _series(client, course, granularity="day", since=DAY1, until=DAY2):
+    r = client.get(f"/reports/courses/{course['id']}/activity", params={
+        "granularity": granularity, "since": since.isoformat(), "until": until.isoformat(),
+    })
+    assert r.status_code == 200
+    return r.json()["points"]
+
+
+def _counts(point):
+    return point["submissions"], point["on_time"], point["late"], point["graded"], point["active_students"]
+
+
+def test_first_refresh_builds_daily_and_weekly_rows(client, course, submissions):
+    day1, day2 = _series(client, course)
+    assert (day1["start"], _counts(day1)) == (DAY1.isoformat(), (2, 1, 1, 1, 2))
+    assert _counts(day2) == (1, 0, 1, 0, 1)
+    [week] = _series(client, course, "week", MONDAY, MONDAY)
+    assert (week["start"], _counts(week)) == (MONDAY.isoformat(), (3, 1, 2, 1, 3))
+
+
+def test_empty_buckets_are_zero_filled(client, course, submissions):
+    points = _series(client, course, since=DAY1 - timedelta(days=2))
+    assert [p["start"] for p in points] == [(DAY1 + timedelta(days=i)).isoformat() for i in range(-2, 2)]
+    assert [p["submissions"] for p in points] == [0, 0, 2, 1]
+
+
+def test_incremental_refresh_picks_up_new_and_graded_rows(client, db, course, submissions):
+    submissions[1].score = 5
+    db.add(models.Submission(assignment_id=submissions[0].assignment_id, student_id=submissions[0].student_id,
+                             submitted_at=at(DAY2, 10)))
+    db.commit()
+    result = refresh_activity_rollups(db)
+    assert (result["full"], result["days"]) == (False, 2)
+    day1, day2 = _series(client, course)
+    assert _counts(day1) == (2, 1, 1, 2, 2)
+    assert _counts(day2) == (2, 0, 2, 0, 2)
+
+
+def test_moving_a_submission_recomputes_the_day_it_left(client, db, course, submissions):
+    submissions[0].submitted_at = at(DAY2, 11)
+    db.commit()
+    refresh_activity_rollups(db)
+    day1, day2 = _series(client, course)
+    assert _counts(day1) == (1, 0, 1, 0, 1)
+    assert _counts(day2) == (2, 0, 2, 1, 2)
+    assert db.query(models.RollupDirtyKey).count() == 0
+
+
+def test_deleting_submissions_recomputes_their_day(client, db, course, submissions):
+    assert client.delete(f"/assignments/submissions/{submissions[2].id}").status_code == 200
+    refresh_activity_rollups(db)
+    day1, day2 = _series(client, course)
+    assert _counts(day1) == (2, 1, 1, 1, 2)
+    assert _counts(day2) == (0, 0, 0, 0, 0)
+
+
+def test_a_new_due_date_reclassifies_late_submissions(client, db, course, submissions):
+    db.get(models.Assignment, submissions[0].assignment_id).due_date = at(DAY2, 23)
+    db.commit()
+    refresh_activity_rollups(db)
+    assert [p["late"] for p in _series(client, course)] == [0, 0]
+
+
+def test_full_rebuild_matches_incremental(client, db, course, submissions):
+    submissions[0].submitted_at = at(DAY2, 11)
+    db.commit()
+    refresh_activity_rollups(db)
+    incremental = _series(client, course, "week", MONDAY, MONDAY) + _series(client, course)
+    assert refresh_activity_rollups(db, full=True)["full"] is True
+    assert _series(client, course, "week", MONDAY, MONDAY) + _series(client, course) == incremental
+
+
+def test_range_validation(client, course):
+    base = f"/reports/courses/{course['id']}/activity"
+    assert client.get(base, params={"since": DAY2.isoformat(), "until": DAY1.isoformat()}).status_code == 422
+    assert client.get(base, params={"since": "2000-01-01"}).status_code == 422
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.app.config import settings
+
+EPOCH = "2000-01-01T00:00:00"
+
+
+@pytest.fixture
+def students(make_user):
+    return [make_user(f"estudiante{i}@semillero.digital")["id"] for i in range(4)]
+
+
+def _roster(client, course):
+    enrollments = client.get("/enrollments/", params={"course_id": course["id"]}).json()
+    return sorted(e["student_id"] for e in enrollments)
+
+
+def _put(client, course, student_ids):
+    return client.put(f"/courses/{course['id']}/roster", json={"student_ids": student_ids})
+
+
+def test_only_the_difference_is_applied(client, course, students, enroll):
+    for student_id in students[:2]:
+        enroll({"id": student_id}, course)
+    before = {e["student_id"]: e["id"] for e in client.get("/enrollments/", params={"course_id": course["id"]}).json()}
+
+    r = _put(client, course, students[1:])
+    assert r.json() == {"added": 2, "removed": 1, "unchanged": 1}
+    assert _roster(client, course) == sorted(students[1:])
+    # The kept enrollment is the same row
+    kept = client.get("/enrollments/", params={"course_id": course["id"], "student_id": students[1]}).json()
+    assert [e["id"] for e in kept] == [before[students[1]]]
+
+
+def test_reconciling_twice_changes_nothing(client, course, students):
+    assert _put(client, course, students).json() == {"added": 4, "removed": 0, "unchanged": 0}
+    assert _put(client, course, students + students[:1]).json() == {"added": 0, "removed": 0, "unchanged": 4}
+
+
+def test_empty_roster_removes_everyone_with_tombstones(client, course, students, monkeypatch):
+    monkeypatch.setattr(settings, "change_feed_safety_seconds", 0)
+    _put(client, course, students)
+    assert _put(client, course, []).json() == {"added": 0, "removed": 4, "unchanged": 0}
+    assert _roster(client, course) == []
+    deleted = client.get("/changes/", params={"since": EPOCH}).json()["deleted"]
+    assert sum(d["entity"] == "enrollment" for d in deleted) == 4
+
+
+def test_unknown_students_or_course_change_nothing(client, course, students):
+    r = _put(client, course, [students[0], 999])
+    assert r.status_code == 404 and "999" in r.json()["detail"]
+    assert _roster(client, course) == []
+    assert client.put("/courses/999/roster", json={"student_ids": students}).status_code == 404
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.app import models
+from backend.app.config import settings
+from backend.app.db import SCHEMA_VERSION, get_engine, verify_schema
+from backend.app.main import app
+from backend.app.manage import main as manage
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _store_version(db, version):
+    db.get(models.SchemaVersion, 1).version = version
+    db.commit()
+
+
+def test_importing_the_app_does_not_create_an_engine():
+    code = "import sys, backend.app.main, backend.app.db as db; print(db._engine is None, 'psycopg' in sys.modules)"
+    # An unreachable database: importing must not even load the driver for it
+    env = dict(os.environ, DATABASE_URL="postgresql+psycopg://nobody@127.0.0.1:1/none")
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["True", "False"]
+
+
+def test_verify_schema_checks_the_stored_version(db):
+    verify_schema()
+    _store_version(db, SCHEMA_VERSION - 1)
+    with pytest.raises(RuntimeError, match="does not match"):
+        verify_schema()
+
+
+def test_verify_mode_refuses_to_start_on_an_old_schema(db, monkeypatch):
+    _store_version(db, SCHEMA_VERSION - 1)
+    monkeypatch.setattr(settings, "startup_schema_mode", "verify")
+    with pytest.raises(RuntimeError):
+        with TestClient(app):
+            pass
+
+
+def test_skip_mode_runs_no_ddl(monkeypatch):
+    with get_engine().begin() as conn:
+        conn.execute(text("DROP TABLE announcements"))
+    monkeypatch.setattr(settings, "startup_schema_mode", "skip")
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+    with get_engine().connect() as conn:
+        tables = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    assert "announcements" not in tables
+
+
+def test_manage_init_db_and_check_db(db, capsys):
+    _store_version(db, SCHEMA_VERSION - 1)
+    with pytest.raises(SystemExit):
+        manage(["check-db"])
+    manage(["init-db"])
+    manage(["check-db"])
+    assert f"version {SCHEMA_VERSION}" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event, inspect
+
+from backend.app import models
+from backend.app.compression import compress_text, decompress_text
+from backend.app.config import settings
+from backend.app.db import get_engine
+
+
+@pytest.fixture
+def assignment(client, course):
+    return client.post("/assignments/", json={"title": "Ensayo", "course_id": course["id"]}).json()
+
+
+@pytest.fixture
+def submit(client, assignment, make_user):
+    student = make_user("estudiante@semillero.digital")
+
+    def submit_content(content):
+        return client.post("/assignments/submissions/", json={
+            "assignment_id": assignment["id"], "student_id": student["id"], "content": content,
+        }).json()
+    return submit_content
+
+
+def test_large_content_is_stored_compressed(client, db, submit):
+    content = "párrafo largo " * (settings.submission_compress_min_chars // 10)
+    submission = submit(content)
+
+    row = db.get(models.Submission, submission["id"])
+    assert row._content is None
+    assert row.body.codec == "zlib" and len(row.body.data) < len(content)
+    assert client.get(f"/assignments/submissions/{submission['id']}/body").json()["content"] == content
+
+
+def test_small_content_stays_inline_and_can_grow(client, db, submit):
+    submission = submit("corto")
+    row = db.get(models.Submission, submission["id"])
+    assert row.body is None and row._content == "corto"
+
+    large = "x" * settings.submission_compress_min_chars
+    client.put(f"/assignments/submissions/{submission['id']}", json={"content": large})
+    db.expire_all()
+    row = db.get(models.Submission, submission["id"])
+    assert row._content is None and row.content == large
+
+
+def test_list_queries_do_not_load_bodies(client, db, submit):
+    submit("contenido")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        assert "content" not in client.get("/assignments/submissions/").json()[0]
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+    assert not any("submissions.content" in s or "submission_bodies" in s for s in statements)
+    assert "_content" in inspect(models.Submission).attrs and inspect(models.Submission).attrs["_content"].deferred
+
+
+def test_codec_round_trip():
+    codec, data = compress_text("texto ñ" * 100)
+    assert decompress_text(codec, data) == "texto ñ" * 100
+    with pytest.raises(ValueError):
+        decompress_text("lz4", data)
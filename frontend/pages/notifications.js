@@ -32,7 +32,7 @@ export default function NotificationsCenter() {
           notificationsAPI.getAll({ user_id: userId }),
           notificationsAPI.upcomingAlerts(userId, 72),
           notificationsAPI.overdueAlerts(userId),
-          announcementsAPI.getAll({ is_active: true }),
+          announcementsAPI.getVisible(),
           fetch("/api/calendar/events").then((r) => r.json()),
         ]);
         setNotifications(notifs || []);
@@ -58,6 +58,25 @@ export default function NotificationsCenter() {
     }
   };
 
+  const handleMarkAllRead = async () => {
+    try {
+      await notificationsAPI.markReadBulk({ user_id: userId, is_read: true });
+      setNotifications((items) => items.map((n) => ({ ...n, is_read: true })));
+    } catch (e) {
+      setError(e?.response?.data?.detail || "No se pudieron actualizar las notificaciones");
+    }
+  };
+
+  const handleDeleteRead = async () => {
+    if (!confirm("¿Eliminar todas las notificaciones leídas?")) return;
+    try {
+      await notificationsAPI.deleteBulk({ user_id: userId, is_read: true });
+      setNotifications((items) => items.filter((n) => !n.is_read));
+    } catch (e) {
+      setError(e?.response?.data?.detail || "No se pudieron eliminar las notificaciones");
+    }
+  };
+
   const handleDelete = async (id) => {
     if (!confirm("¿Eliminar notificación?")) return;
     try {
@@ -172,6 +191,12 @@ export default function NotificationsCenter() {
 
       <section>
         <h2>Mis Notificaciones</h2>
+        {notifications.length > 0 && (
+          <div style={{ display: "flex", gap: 8, marginBottom: 8 }}>
+            <button onClick={handleMarkAllRead}>Marcar todas como leídas</button>
+            <button onClick={handleDeleteRead}>Eliminar leídas</button>
+          </div>
+        )}
         {notifications.length === 0 ? (
           <p>No tienes notificaciones</p>
         ) : (
@@ -16,6 +16,12 @@ export const coursesAPI = {
     return response.data;
   },
 
+  // Get several courses by id in one request (misses come back as null)
+  getMany: async (ids) => {
+    const response = await axios.get(`${API_BASE}/courses/batch`, { params: { ids: ids.join(",") } });
+    return response.data;
+  },
+
   // Create course
   create: async (courseData) => {
     const response = await axios.post(`${API_BASE}/courses`, courseData);
@@ -33,6 +39,28 @@ export const coursesAPI = {
     const response = await axios.delete(`${API_BASE}/courses/${id}`);
     return response.data;
   },
+
+  // Copy courses and their active assignments for a new term
+  // ({ course_ids, due_date_offset_days?, name_suffix?, teacher_id? }) -> [{ source_course_id, course_id, assignments }]
+  clone: async (payload) => {
+    const response = await axios.post(`${API_BASE}/courses/clone`, payload);
+    return response.data;
+  },
+
+  // Replace the course roster with exactly these students ({ added, removed, unchanged })
+  setRoster: async (id, studentIds) => {
+    const response = await axios.put(`${API_BASE}/courses/${id}/roster`, { student_ids: studentIds });
+    return response.data;
+  },
+};
+
+// Users API
+export const usersAPI = {
+  // Get several users by id in one request (misses come back as null)
+  getMany: async (ids) => {
+    const response = await axios.get(`${API_BASE}/users/batch`, { params: { ids: ids.join(",") } });
+    return response.data;
+  },
 };
 
 // Enrollments API
@@ -76,6 +104,12 @@ export const assignmentsAPI = {
     return response.data;
   },
 
+  // Get several assignments by id in one request (misses come back as null)
+  getMany: async (ids) => {
+    const response = await axios.get(`${API_BASE}/assignments/batch`, { params: { ids: ids.join(",") } });
+    return response.data;
+  },
+
   // Create assignment
   create: async (assignmentData) => {
     const response = await axios.post(`${API_BASE}/assignments`, assignmentData);
@@ -118,6 +152,12 @@ export const submissionsAPI = {
     return response.data;
   },
 
+  // Get several submissions by id in one request (misses come back as null)
+  getMany: async (ids) => {
+    const response = await axios.get(`${API_BASE}/assignments/submissions/batch`, { params: { ids: ids.join(",") } });
+    return response.data;
+  },
+
   // Create submission
   create: async (submissionData) => {
     const response = await axios.post(`${API_BASE}/assignments/submissions`, submissionData);
@@ -135,6 +175,13 @@ export const submissionsAPI = {
     const response = await axios.delete(`${API_BASE}/assignments/submissions/${id}`);
     return response.data;
   },
+
+  // Ungraded submissions of a teacher's courses, oldest first
+  // Pass next_after_submitted_at / next_after_id back as after_submitted_at / after_id for the next page
+  gradingQueue: async (params = {}) => {
+    const response = await axios.get(`${API_BASE}/assignments/grading-queue`, { params });
+    return response.data;
+  },
 };
 
 // Notifications API
@@ -144,6 +191,11 @@ export const notificationsAPI = {
     const response = await axios.get(`${API_BASE}/notifications`, { params });
     return response.data;
   },
+  // Get several notifications by id in one request (misses come back as null)
+  getMany: async (ids) => {
+    const response = await axios.get(`${API_BASE}/notifications/batch`, { params: { ids: ids.join(",") } });
+    return response.data;
+  },
   // Create notification
   create: async (payload) => {
     const response = await axios.post(`${API_BASE}/notifications`, payload);
@@ -164,6 +216,16 @@ export const notificationsAPI = {
     const response = await axios.delete(`${API_BASE}/notifications/${id}`);
     return response.data;
   },
+  // Mark many as read/unread in one request ({ user_id, ids?, category?, is_read })
+  markReadBulk: async (payload) => {
+    const response = await axios.patch(`${API_BASE}/notifications/bulk/read`, payload);
+    return response.data;
+  },
+  // Delete many in one request ({ user_id, ids?, category?, is_read? })
+  deleteBulk: async (payload) => {
+    const response = await axios.post(`${API_BASE}/notifications/bulk/delete`, payload);
+    return response.data;
+  },
   // Upcoming alerts (non-persistent)
   upcomingAlerts: async (user_id, within_hours = 48) => {
     const response = await axios.get(`${API_BASE}/notifications/alerts/upcoming`, {
@@ -178,6 +240,19 @@ export const notificationsAPI = {
     });
     return response.data;
   },
+  // Alerts for many students at once ({ user_ids: [..] } or { course_id }, kind, within_hours)
+  // The backend streams NDJSON; returns [{ user_id, alerts: [...] }]
+  batchAlerts: async ({ user_ids, ...params } = {}) => {
+    if (user_ids) params.user_ids = user_ids.join(",");
+    const response = await axios.get(`${API_BASE}/notifications/alerts/batch`, {
+      params,
+      responseType: "text",
+    });
+    return response.data
+      .split("\n")
+      .filter((line) => line.trim())
+      .map((line) => JSON.parse(line));
+  },
 };
 
 // Announcements API
@@ -186,6 +261,11 @@ export const announcementsAPI = {
     const response = await axios.get(`${API_BASE}/announcements`, { params });
     return response.data;
   },
+  // Announcements whose start/end window includes now
+  getVisible: async () => {
+    const response = await axios.get(`${API_BASE}/announcements/visible`);
+    return response.data;
+  },
   getById: async (id) => {
     const response = await axios.get(`${API_BASE}/announcements/${id}`);
     return response.data;